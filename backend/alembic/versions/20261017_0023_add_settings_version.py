@@ -0,0 +1,30 @@
+"""Add settings_version table for feature toggle cache invalidation
+
+Revision ID: 20261017_0023
+Revises: 20260109_0022, 20260110_0021
+Create Date: 2026-10-17
+
+Also merges the two open heads (leave/holiday/timesheet/geofence tables and
+the performance indexes) back into a single line of history.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '20261017_0023'
+down_revision = ('20260109_0022', '20260110_0021')
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('settings_version',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+    )
+    op.execute("INSERT INTO settings_version (id, version) VALUES (1, 1)")
+
+
+def downgrade() -> None:
+    op.drop_table('settings_version')
@@ -0,0 +1,81 @@
+"""Add attendance_daily_rollup table
+
+Revision ID: 20261017_0024
+Revises: 20261017_0023
+Create Date: 2026-10-17
+
+Per-day attendance totals by work location and department, maintained
+incrementally by the attendance endpoints. The table is backfilled here
+from existing attendance_records.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '20261017_0024'
+down_revision = '20261017_0023'
+branch_labels = None
+depends_on = None
+
+
+COUNT_COLUMNS = (
+    'record_count', 'present_count', 'late_count', 'early_departure_count',
+    'on_leave_count', 'wfh_count', 'compliance_issue_count', 'food_allowance_count',
+)
+
+
+def upgrade() -> None:
+    op.create_table('attendance_daily_rollup',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('attendance_date', sa.Date(), nullable=False),
+        sa.Column('work_location', sa.String(100), nullable=False),
+        sa.Column('department', sa.String(100), nullable=False),
+        *[sa.Column(name, sa.Integer(), nullable=False, server_default='0') for name in COUNT_COLUMNS],
+        sa.Column('total_hours', sa.Numeric(12, 2), nullable=False, server_default='0'),
+        sa.Column('regular_hours', sa.Numeric(12, 2), nullable=False, server_default='0'),
+        sa.Column('overtime_hours', sa.Numeric(12, 2), nullable=False, server_default='0'),
+        sa.Column('night_overtime_hours', sa.Numeric(12, 2), nullable=False, server_default='0'),
+        sa.Column('holiday_overtime_hours', sa.Numeric(12, 2), nullable=False, server_default='0'),
+        sa.Column('overtime_amount', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('food_allowance_amount', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint('attendance_date', 'work_location', 'department', name='uq_attendance_rollup_key'),
+    )
+    op.create_index('ix_attendance_daily_rollup_attendance_date', 'attendance_daily_rollup', ['attendance_date'])
+
+    op.execute("""
+        INSERT INTO attendance_daily_rollup (
+            attendance_date, work_location, department,
+            record_count, present_count, late_count, early_departure_count,
+            on_leave_count, wfh_count, compliance_issue_count, food_allowance_count,
+            total_hours, regular_hours, overtime_hours, night_overtime_hours,
+            holiday_overtime_hours, overtime_amount, food_allowance_amount
+        )
+        SELECT
+            a.attendance_date,
+            COALESCE(a.work_location, 'Unspecified'),
+            COALESCE(e.department, 'Unspecified'),
+            COUNT(a.id),
+            SUM(CASE WHEN a.status IN ('present', 'late') THEN 1 ELSE 0 END),
+            SUM(CASE WHEN a.is_late THEN 1 ELSE 0 END),
+            SUM(CASE WHEN a.is_early_departure THEN 1 ELSE 0 END),
+            SUM(CASE WHEN a.status = 'on-leave' THEN 1 ELSE 0 END),
+            SUM(CASE WHEN a.work_type = 'wfh' THEN 1 ELSE 0 END),
+            SUM(CASE WHEN a.exceeds_daily_limit OR a.exceeds_overtime_limit THEN 1 ELSE 0 END),
+            SUM(CASE WHEN a.food_allowance_eligible THEN 1 ELSE 0 END),
+            COALESCE(SUM(a.total_hours), 0),
+            COALESCE(SUM(a.regular_hours), 0),
+            COALESCE(SUM(a.overtime_hours), 0),
+            COALESCE(SUM(CASE WHEN a.is_night_overtime THEN a.overtime_hours ELSE 0 END), 0),
+            COALESCE(SUM(CASE WHEN a.is_holiday_overtime THEN a.overtime_hours ELSE 0 END), 0),
+            COALESCE(SUM(a.overtime_amount), 0),
+            COALESCE(SUM(a.food_allowance_amount), 0)
+        FROM attendance_records a
+        LEFT JOIN employees e ON e.id = a.employee_id
+        GROUP BY a.attendance_date, COALESCE(a.work_location, 'Unspecified'), COALESCE(e.department, 'Unspecified')
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attendance_daily_rollup_attendance_date', table_name='attendance_daily_rollup')
+    op.drop_table('attendance_daily_rollup')
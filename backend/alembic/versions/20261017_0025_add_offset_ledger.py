@@ -0,0 +1,73 @@
+"""Add offset_ledger table
+
+Revision ID: 20261017_0025
+Revises: 20261017_0024
+Create Date: 2026-10-17
+
+Append-only offset hours ledger with running totals per row. Existing
+offset hours are backfilled from attendance_records: an earn entry for every
+record with offset_hours_earned, and a use entry where offset_day_reference
+marks the hours as used. These are the same figures the balance endpoint
+previously derived on every request.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '20261017_0025'
+down_revision = '20261017_0024'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('offset_ledger',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('employee_id', sa.Integer(), sa.ForeignKey('employees.id'), nullable=False),
+        sa.Column('entry_type', sa.String(20), nullable=False),
+        sa.Column('hours', sa.Numeric(6, 2), nullable=False),
+        sa.Column('entry_date', sa.Date(), nullable=False),
+        sa.Column('attendance_record_id', sa.Integer(), sa.ForeignKey('attendance_records.id'), nullable=True),
+        sa.Column('reference', sa.String(200), nullable=True),
+        sa.Column('balance_after', sa.Numeric(8, 2), nullable=False),
+        sa.Column('earned_to_date', sa.Numeric(8, 2), nullable=False),
+        sa.Column('used_to_date', sa.Numeric(8, 2), nullable=False),
+        sa.Column('expired_to_date', sa.Numeric(8, 2), nullable=False),
+        sa.Column('created_by', sa.Integer(), sa.ForeignKey('employees.id'), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index('ix_offset_ledger_employee_id_id', 'offset_ledger', ['employee_id', 'id'])
+    op.create_index('ix_offset_ledger_attendance_record_id', 'offset_ledger', ['attendance_record_id'])
+
+    op.execute("""
+        WITH events AS (
+            SELECT employee_id, id AS record_id, attendance_date, 0 AS seq, 'earn' AS entry_type,
+                   offset_hours_earned AS hours, 'Overtime on ' || attendance_date AS reference
+            FROM attendance_records
+            WHERE offset_hours_earned > 0
+            UNION ALL
+            SELECT employee_id, id, attendance_date, 1, 'use',
+                   -offset_hours_earned, offset_day_reference
+            FROM attendance_records
+            WHERE offset_hours_earned > 0 AND offset_day_reference LIKE '%Used%'
+        )
+        INSERT INTO offset_ledger (
+            employee_id, entry_type, hours, entry_date, attendance_record_id, reference,
+            balance_after, earned_to_date, used_to_date, expired_to_date
+        )
+        SELECT
+            employee_id, entry_type, hours, attendance_date, record_id, reference,
+            SUM(hours) OVER w,
+            SUM(CASE WHEN entry_type = 'earn' THEN hours ELSE 0 END) OVER w,
+            SUM(CASE WHEN entry_type = 'use' THEN -hours ELSE 0 END) OVER w,
+            0
+        FROM events
+        WINDOW w AS (PARTITION BY employee_id ORDER BY attendance_date, record_id, seq ROWS UNBOUNDED PRECEDING)
+        ORDER BY employee_id, attendance_date, record_id, seq
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_offset_ledger_attendance_record_id', table_name='offset_ledger')
+    op.drop_index('ix_offset_ledger_employee_id_id', table_name='offset_ledger')
+    op.drop_table('offset_ledger')
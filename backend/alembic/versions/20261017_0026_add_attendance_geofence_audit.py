@@ -0,0 +1,29 @@
+"""Add geofence audit columns to attendance_records
+
+Revision ID: 20261017_0026
+Revises: 20261017_0025
+Create Date: 2026-10-17
+
+Flag, distance and timestamp columns written by the batch geofence audit.
+They stay NULL until a record has been audited.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '20261017_0026'
+down_revision = '20261017_0025'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('attendance_records', sa.Column('geofence_flagged', sa.Boolean(), nullable=True))
+    op.add_column('attendance_records', sa.Column('geofence_distance_meters', sa.Numeric(10, 1), nullable=True))
+    op.add_column('attendance_records', sa.Column('geofence_audited_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('attendance_records', 'geofence_audited_at')
+    op.drop_column('attendance_records', 'geofence_distance_meters')
+    op.drop_column('attendance_records', 'geofence_flagged')
@@ -0,0 +1,36 @@
+"""Add attendance_sync_events table
+
+Revision ID: 20261017_0027
+Revises: 20261017_0026
+Create Date: 2026-10-17
+
+Outcome of each offline attendance event, unique per employee and client
+idempotency key, so retried syncs are answered from here.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '20261017_0027'
+down_revision = '20261017_0026'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('attendance_sync_events',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('employee_id', sa.Integer(), sa.ForeignKey('employees.id'), nullable=False),
+        sa.Column('idempotency_key', sa.String(100), nullable=False),
+        sa.Column('event_type', sa.String(20), nullable=False),
+        sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('attendance_record_id', sa.Integer(), sa.ForeignKey('attendance_records.id'), nullable=True),
+        sa.Column('detail', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint('employee_id', 'idempotency_key', name='uq_attendance_sync_employee_key'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('attendance_sync_events')
@@ -0,0 +1,38 @@
+"""Add idempotency_keys table
+
+Revision ID: 20261017_0028
+Revises: 20261017_0027
+Create Date: 2026-10-17
+
+Responses stored per user and Idempotency-Key header so retried writes
+are replayed instead of re-executed. Rows expire and are purged daily.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '20261017_0028'
+down_revision = '20261017_0027'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('idempotency_keys',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('scope', sa.String(64), nullable=False),
+        sa.Column('key', sa.String(255), nullable=False),
+        sa.Column('request_hash', sa.String(64), nullable=False),
+        sa.Column('status_code', sa.Integer(), nullable=True),
+        sa.Column('content_type', sa.String(100), nullable=True),
+        sa.Column('response_body', sa.LargeBinary(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint('scope', 'key', name='uq_idempotency_keys_scope_key'),
+    )
+    op.create_index('ix_idempotency_keys_expires_at', 'idempotency_keys', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_idempotency_keys_expires_at', table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
@@ -0,0 +1,24 @@
+"""Add (attendance_date, id) index on attendance_records
+
+Revision ID: 20261017_0029
+Revises: 20261017_0028
+Create Date: 2026-10-17
+
+Matches the keyset pagination order of /attendance/records, so each page
+is an index range scan instead of a sort over the filtered rows.
+"""
+from alembic import op
+
+
+revision = '20261017_0029'
+down_revision = '20261017_0028'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_attendance_records_date_id', 'attendance_records', ['attendance_date', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attendance_records_date_id', table_name='attendance_records')
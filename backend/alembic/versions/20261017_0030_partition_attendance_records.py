@@ -0,0 +1,154 @@
+"""Partition attendance_records by month and add attendance_records_archive
+
+Revision ID: 20261017_0030
+Revises: 20261017_0029
+Create Date: 2026-10-17
+
+On PostgreSQL, attendance_records becomes a range-partitioned table on
+attendance_date with one partition per month, from the oldest record's
+month to three months ahead, plus a default partition for anything outside
+them. The primary key becomes (id, attendance_date) because a partitioned
+table's unique constraints must include the partition key. Foreign keys
+that pointed at attendance_records.id (offset ledger, sync events) are
+dropped. Their columns keep the record id as a plain integer, because
+archived months are removed from the live table. Existing indexes and
+outgoing foreign keys are recreated on the partitioned table. Later
+partitions are created by the attendance scheduler.
+
+Other databases keep the plain table. The archive table is created
+everywhere.
+"""
+import re
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+revision = '20261017_0030'
+down_revision = '20261017_0029'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _table_definitions(conn, table: str):
+    """(index definitions, outgoing foreign key definitions) of ``table``, excluding its primary key."""
+    indexes = conn.execute(sa.text(
+        "SELECT indexdef FROM pg_indexes WHERE tablename = :table "
+        "AND indexname NOT IN (SELECT conname FROM pg_constraint "
+        "WHERE conrelid = to_regclass(:table) AND contype = 'p')"
+    ), {"table": table}).scalars().all()
+    foreign_keys = conn.execute(sa.text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass(:table) AND contype = 'f'"
+    ), {"table": table}).all()
+    return indexes, foreign_keys
+
+
+def _recreate(conn, indexes, foreign_keys, source: str) -> None:
+    for indexdef in indexes:
+        conn.execute(sa.text(
+            re.sub(rf" ON (ONLY )?(\w+\.)?{source} ", " ON attendance_records ", indexdef)
+        ))
+    for name, definition in foreign_keys:
+        conn.execute(sa.text(f'ALTER TABLE attendance_records ADD CONSTRAINT "{name}" {definition}'))
+
+
+def _drop_incoming_foreign_keys(conn) -> None:
+    rows = conn.execute(sa.text(
+        "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+        "WHERE confrelid = 'attendance_records'::regclass AND contype = 'f'"
+    )).all()
+    for table, name in rows:
+        conn.execute(sa.text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'))
+
+
+def upgrade() -> None:
+    op.create_table('attendance_records_archive',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('archive_month', sa.Date(), nullable=False),
+        sa.Column('employee_id', sa.Integer(), sa.ForeignKey('employees.id'), nullable=False),
+        sa.Column('record_count', sa.Integer(), nullable=False),
+        sa.Column('records', sa.JSON().with_variant(JSONB(), 'postgresql'), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint('archive_month', 'employee_id', name='uq_attendance_archive_month_employee'),
+    )
+    op.create_index('ix_attendance_records_archive_archive_month', 'attendance_records_archive', ['archive_month'])
+    op.create_index('ix_attendance_records_archive_employee_id', 'attendance_records_archive', ['employee_id'])
+
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+
+    _drop_incoming_foreign_keys(conn)
+    conn.execute(sa.text("ALTER TABLE attendance_records RENAME TO attendance_records_unpartitioned"))
+    indexes, foreign_keys = _table_definitions(conn, 'attendance_records_unpartitioned')
+    sequence = conn.execute(sa.text(
+        "SELECT pg_get_serial_sequence('attendance_records_unpartitioned', 'id')"
+    )).scalar()
+
+    conn.execute(sa.text(
+        "CREATE TABLE attendance_records "
+        "(LIKE attendance_records_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (attendance_date)"
+    ))
+    oldest = conn.execute(sa.text("SELECT min(attendance_date) FROM attendance_records_unpartitioned")).scalar()
+    current = date.today().replace(day=1)
+    month = min(oldest.replace(day=1), current) if oldest else current
+    last = _add_months(current, MONTHS_AHEAD)
+    while month <= last:
+        conn.execute(sa.text(
+            f"CREATE TABLE attendance_records_y{month.year}m{month.month:02d} "
+            f"PARTITION OF attendance_records "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        ))
+        month = _add_months(month, 1)
+    conn.execute(sa.text("CREATE TABLE attendance_records_default PARTITION OF attendance_records DEFAULT"))
+
+    conn.execute(sa.text("INSERT INTO attendance_records SELECT * FROM attendance_records_unpartitioned"))
+    if sequence:
+        conn.execute(sa.text(f"ALTER SEQUENCE {sequence} OWNED BY attendance_records.id"))
+    conn.execute(sa.text("DROP TABLE attendance_records_unpartitioned"))
+
+    conn.execute(sa.text(
+        "ALTER TABLE attendance_records ADD CONSTRAINT attendance_records_pkey PRIMARY KEY (id, attendance_date)"
+    ))
+    _recreate(conn, indexes, foreign_keys, 'attendance_records_unpartitioned')
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name == 'postgresql':
+        # Rows already moved to the archive are not restored
+        conn.execute(sa.text("ALTER TABLE attendance_records RENAME TO attendance_records_partitioned"))
+        indexes, foreign_keys = _table_definitions(conn, 'attendance_records_partitioned')
+        sequence = conn.execute(sa.text(
+            "SELECT pg_get_serial_sequence('attendance_records_partitioned', 'id')"
+        )).scalar()
+        conn.execute(sa.text(
+            "CREATE TABLE attendance_records "
+            "(LIKE attendance_records_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        conn.execute(sa.text("INSERT INTO attendance_records SELECT * FROM attendance_records_partitioned"))
+        if sequence:
+            conn.execute(sa.text(f"ALTER SEQUENCE {sequence} OWNED BY attendance_records.id"))
+        conn.execute(sa.text("DROP TABLE attendance_records_partitioned"))
+        conn.execute(sa.text("ALTER TABLE attendance_records ADD CONSTRAINT attendance_records_pkey PRIMARY KEY (id)"))
+        _recreate(conn, indexes, foreign_keys, 'attendance_records_partitioned')
+        for table in ('offset_ledger', 'attendance_sync_events'):
+            conn.execute(sa.text(
+                f"ALTER TABLE {table} ADD CONSTRAINT {table}_attendance_record_id_fkey "
+                f"FOREIGN KEY (attendance_record_id) REFERENCES attendance_records (id) NOT VALID"
+            ))
+
+    op.drop_index('ix_attendance_records_archive_employee_id', table_name='attendance_records_archive')
+    op.drop_index('ix_attendance_records_archive_archive_month', table_name='attendance_records_archive')
+    op.drop_table('attendance_records_archive')
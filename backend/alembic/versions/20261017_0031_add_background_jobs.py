@@ -0,0 +1,36 @@
+"""Add background_jobs table
+
+Revision ID: 20261017_0031
+Revises: 20261017_0030
+Create Date: 2026-10-17
+
+Bulk timesheet, geofence audit and overtime recompute jobs store their
+progress here, so a status poll that reaches another worker process still
+finds the job.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+revision = '20261017_0031'
+down_revision = '20261017_0030'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('background_jobs',
+        sa.Column('id', sa.String(32), primary_key=True),
+        sa.Column('kind', sa.String(40), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('state', sa.JSON().with_variant(JSONB(), 'postgresql'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index('ix_background_jobs_kind_created_at', 'background_jobs', ['kind', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_background_jobs_kind_created_at', table_name='background_jobs')
+    op.drop_table('background_jobs')
@@ -3,10 +3,10 @@ from typing import Any, List, Optional
 from fastapi import Depends, Header, HTTPException, status
 import jwt
 from jwt.exceptions import PyJWTError
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.jwt import decode_jwt
+from app.auth.principal import Principal, resolve_principal
 from app.auth.roles import ALLOWED_ROLES, resolve_role_from_claims
 from app.core.config import get_settings
 from app.database import get_session
@@ -39,8 +39,10 @@ async def authenticate_token(authorization: Optional[str] = Header(default=None)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
 
 
-def get_employee_id_from_token(authorization: Optional[str] = Header(default=None)) -> str:
-    """Extract employee ID from JWT token using HS256 (local auth)."""
+def get_token_identity(
+    authorization: Optional[str] = Header(default=None),
+) -> tuple[str, Optional[int]]:
+    """Extract (employee ID, issued-at) from a local HS256 token."""
     if authorization is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authorization header missing")
     
@@ -51,25 +53,27 @@ def get_employee_id_from_token(authorization: Optional[str] = Header(default=Non
     try:
         settings = get_settings()
         payload = jwt.decode(token.strip(), settings.auth_secret_key, algorithms=["HS256"])
-        employee_id = payload.get("sub")
-        if not employee_id:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        return employee_id
     except PyJWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
+    
+    employee_id = payload.get("sub")
+    if not employee_id:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return employee_id, payload.get("iat")
+
+
+def get_employee_id_from_token(authorization: Optional[str] = Header(default=None)) -> str:
+    """Extract employee ID from JWT token using HS256 (local auth)."""
+    return get_token_identity(authorization)[0]
 
 
 async def require_auth(
-    employee_id: str = Depends(get_employee_id_from_token),
+    identity: tuple[str, Optional[int]] = Depends(get_token_identity),
     session: AsyncSession = Depends(get_session),
-):
+) -> Principal:
     """Get current authenticated employee."""
-    from app.models import Employee
-    
-    result = await session.execute(
-        select(Employee).where(Employee.employee_id == employee_id)
-    )
-    employee = result.scalar_one_or_none()
+    employee_id, issued_at = identity
+    employee = await resolve_principal(session, employee_id, issued_at)
     
     if not employee:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Employee not found")
@@ -80,24 +84,8 @@ async def require_auth(
     return employee
 
 
-async def require_hr(
-    employee_id: str = Depends(get_employee_id_from_token),
-    session: AsyncSession = Depends(get_session),
-):
+async def require_hr(employee: Principal = Depends(require_auth)) -> Principal:
     """Get current employee and verify HR/admin role."""
-    from app.models import Employee
-    
-    result = await session.execute(
-        select(Employee).where(Employee.employee_id == employee_id)
-    )
-    employee = result.scalar_one_or_none()
-    
-    if not employee:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Employee not found")
-    
-    if not employee.is_active:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account inactive")
-    
     if employee.role not in ["hr", "admin"]:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="HR access required")
     
@@ -0,0 +1,155 @@
+"""Cached resolution of the authenticated caller.
+
+Every authenticated request used to decode the JWT and then load the full
+Employee row just to learn who the caller is. Identity rarely changes, so the
+dependencies now share a small LRU of compact principals keyed by the token's
+subject and ``iat``. Entries expire after a short TTL and are dropped
+immediately when the employee is updated, deactivated or has their role
+changed, so a revoked account stops working on this worker at once and on
+other workers within the TTL.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.employee import Employee
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Compact projection of the authenticated employee.
+
+    Attribute names match Employee so routers can use either interchangeably.
+    The work settings fields are included because the attendance endpoints
+    derive standard hours and overtime policy from the caller; department
+    keys the attendance rollup bucket.
+    """
+
+    id: int
+    employee_id: str
+    name: str
+    role: str
+    is_active: bool
+    line_manager_id: Optional[int]
+    location: Optional[str]
+    work_schedule: Optional[str]
+    overtime_type: Optional[str]
+    department: Optional[str] = None
+
+
+_PRINCIPAL_COLUMNS = (
+    Employee.id,
+    Employee.employee_id,
+    Employee.name,
+    Employee.role,
+    Employee.is_active,
+    Employee.line_manager_id,
+    Employee.location,
+    Employee.work_schedule,
+    Employee.overtime_type,
+    Employee.department,
+)
+
+CacheKey = Tuple[str, Optional[int]]
+
+
+class PrincipalCache:
+    """LRU of principals keyed by (subject, iat) with a per-entry TTL."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Principal]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, key: CacheKey) -> Optional[Principal]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, principal = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return principal
+
+    def put(self, key: CacheKey, principal: Principal) -> None:
+        if not self.enabled:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, principal)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, employee_id: str) -> None:
+        """Drop every cached token for the given employee."""
+        for key in [k for k in self._entries if k[0] == employee_id]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Singleton instance
+_principal_cache: Optional[PrincipalCache] = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Get or create the principal cache singleton."""
+    global _principal_cache
+    if _principal_cache is None:
+        settings = get_settings()
+        _principal_cache = PrincipalCache(
+            max_size=settings.principal_cache_size,
+            ttl_seconds=settings.principal_cache_ttl_seconds,
+        )
+    return _principal_cache
+
+
+def invalidate_principal(employee_id: str) -> None:
+    """Forget cached identity for an employee after their record changes."""
+    get_principal_cache().invalidate(employee_id)
+
+
+async def resolve_principal(
+    session: AsyncSession, employee_id: str, issued_at: Optional[int] = None
+) -> Optional[Principal]:
+    """Return the principal for a token subject, loading it on a cache miss."""
+    cache = get_principal_cache()
+    key = (employee_id, issued_at)
+    principal = cache.get(key)
+    if principal is not None:
+        return principal
+
+    result = await session.execute(
+        select(*_PRINCIPAL_COLUMNS).where(Employee.employee_id == employee_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+
+    principal = Principal(*row)
+    cache.put(key, principal)
+    return principal
@@ -0,0 +1,107 @@
+"""Connection pool telemetry for the async engines.
+
+QueuePool already tracks checked-out and overflow connections; what it does
+not record is how long callers wait for a connection, which is the first
+signal of pool exhaustion during the morning clock-in spike. The pool class
+below times every checkout into a small fixed-bucket histogram.
+"""
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Upper bounds (ms) of the checkout wait-time histogram buckets
+WAIT_BUCKETS_MS: Tuple[float, ...] = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolWaitHistogram:
+    """Fixed-bucket histogram of connection checkout wait times."""
+
+    def __init__(self, buckets_ms: Tuple[float, ...] = WAIT_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts: List[int] = [0] * (len(buckets_ms) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.timeouts = 0
+
+    def observe(self, wait_ms: float) -> None:
+        for i, bound in enumerate(self.buckets_ms):
+            if wait_ms <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += 1
+        self.sum_ms += wait_ms
+        self.max_ms = max(self.max_ms, wait_ms)
+
+    def as_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{int(b)}ms" for b in self.buckets_ms]
+        labels.append(f"gt_{int(self.buckets_ms[-1])}ms")
+        return {
+            "count": self.total,
+            "avg_ms": round(self.sum_ms / self.total, 2) if self.total else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "timeouts": self.timeouts,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout wait times."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.wait_histogram = PoolWaitHistogram()
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_histogram.timeouts += 1
+            raise
+        self.wait_histogram.observe((time.perf_counter() - started_at) * 1000)
+        return conn
+
+    def recreate(self) -> "InstrumentedAsyncQueuePool":
+        # Keep accumulated wait stats when the pool is recreated after invalidation
+        new_pool = super().recreate()
+        new_pool.wait_histogram = self.wait_histogram
+        return new_pool
+
+
+_engines: Dict[str, AsyncEngine] = {}
+
+
+def register_engine(name: str, engine: AsyncEngine) -> None:
+    """Expose an engine's pool on the diagnostics endpoint under ``name``."""
+    _engines[name] = engine
+
+
+def pool_stats(engine: AsyncEngine) -> Dict[str, Any]:
+    """Current gauges for one engine's pool."""
+    pool = engine.sync_engine.pool
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    for gauge in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, gauge, None)
+        if callable(method):
+            stats[gauge] = method()
+    if "overflow" in stats:
+        # QueuePool reports unused base capacity as negative overflow
+        stats["overflow"] = max(stats["overflow"], 0)
+    timeout = getattr(pool, "timeout", None)
+    if callable(timeout):
+        stats["timeout_seconds"] = timeout()
+    histogram: Optional[PoolWaitHistogram] = getattr(pool, "wait_histogram", None)
+    if histogram is not None:
+        stats["checkout_wait"] = histogram.as_dict()
+    return stats
+
+
+def all_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Gauges for every registered engine."""
+    return {name: pool_stats(engine) for name, engine in _engines.items()}
@@ -0,0 +1,116 @@
+"""Bounded executor for CPU-bound password hashing.
+
+PBKDF2 with 100,000 iterations takes tens of milliseconds per call. Running it
+inline inside a request handler blocks the event loop for every other request,
+so all login/password paths hand the work to a small thread pool instead.
+hashlib releases the GIL while deriving keys, which lets throughput scale with
+the number of workers (and cores) rather than serializing behind one loop.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.core.config import get_settings
+
+T = TypeVar("T")
+
+
+class HashingExecutor:
+    """Thread pool with queue-depth and latency counters for password hashing."""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="pwhash"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_wait_ms = 0.0
+        self._total_run_ms = 0.0
+        self._max_wait_ms = 0.0
+        self._max_run_ms = 0.0
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run ``func(*args)`` on the hashing pool without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        submitted_at = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+        try:
+            return await loop.run_in_executor(
+                self._executor, self._timed_call, func, args, submitted_at
+            )
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _timed_call(self, func: Callable[..., T], args: tuple, submitted_at: float) -> T:
+        started_at = time.perf_counter()
+        wait_ms = (started_at - submitted_at) * 1000
+        with self._lock:
+            self._in_flight += 1
+        ok = False
+        try:
+            result = func(*args)
+            ok = True
+            return result
+        finally:
+            run_ms = (time.perf_counter() - started_at) * 1000
+            with self._lock:
+                self._in_flight -= 1
+                if ok:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+                self._total_wait_ms += wait_ms
+                self._total_run_ms += run_ms
+                self._max_wait_ms = max(self._max_wait_ms, wait_ms)
+                self._max_run_ms = max(self._max_run_ms, run_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool usage for the diagnostics endpoint."""
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                "workers": self.max_workers,
+                "queue_depth": max(self._pending - self._in_flight, 0),
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "failed": self._failed,
+                "avg_wait_ms": round(self._total_wait_ms / finished, 2) if finished else 0.0,
+                "avg_run_ms": round(self._total_run_ms / finished, 2) if finished else 0.0,
+                "max_wait_ms": round(self._max_wait_ms, 2),
+                "max_run_ms": round(self._max_run_ms, 2),
+            }
+
+    def shutdown(self) -> None:
+        """Stop accepting work and release the worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Singleton instance
+_hashing_executor: Optional[HashingExecutor] = None
+
+
+def get_hashing_executor() -> HashingExecutor:
+    """Get or create the password hashing executor singleton."""
+    global _hashing_executor
+    if _hashing_executor is None:
+        settings = get_settings()
+        workers = settings.password_hash_workers or min(os.cpu_count() or 1, 8)
+        _hashing_executor = HashingExecutor(max_workers=max(workers, 1))
+    return _hashing_executor
+
+
+def shutdown_hashing_executor() -> None:
+    """Shut down the hashing executor (call from app shutdown)."""
+    global _hashing_executor
+    if _hashing_executor is not None:
+        _hashing_executor.shutdown()
+        _hashing_executor = None
@@ -0,0 +1,283 @@
+"""Idempotency-Key support for retried writes.
+
+Mobile clients retry clock and approval calls on flaky networks. When a
+request to one of IDEMPOTENT_ROUTES carries an ``Idempotency-Key`` header,
+the middleware claims the key for the calling employee before the endpoint
+runs and stores the response once it finishes. A retry with the same key
+and body is answered from the stored response without reaching the
+endpoint or the domain tables. A retry that arrives while the first call
+is still running gets 409, and reusing a key for a different request gets
+422. Server errors, 401 and 429 are not stored, so the client can retry
+those with the same key. Stored responses expire after
+``idempotency_key_ttl_hours`` and are purged by the attendance scheduler.
+"""
+import hashlib
+import logging
+import re
+from datetime import timedelta
+from typing import Optional, Pattern, Tuple
+
+import jwt
+from jwt.exceptions import PyJWTError
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.time import get_utc_now
+from app.models.idempotency import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# How long a claimed key blocks retries if its request never finishes
+PENDING_TTL = timedelta(minutes=1)
+
+# Statuses that say nothing about the request itself, so they are not replayed
+UNSTORED_STATUSES = frozenset({401, 429})
+
+# Writes that honour the header, matched against the end of the request path
+IDEMPOTENT_ROUTES: Tuple[Pattern[str], ...] = tuple(
+    re.compile(pattern)
+    for pattern in (
+        r"/attendance/(clock-in|clock-out|sync)$",
+        r"/attendance/\d+/(approve-overtime|approve-wfh)$",
+        r"/attendance/(approve-correction|approve-overtime|approve-wfh)/bulk$",
+        r"/leave/\d+/approve$",
+        r"/timesheets/payroll-export/\d+/\d+$",
+        r"/timesheets/(manager-approve|hr-approve)/bulk$",
+    )
+)
+
+
+def idempotency_scope(authorization: Optional[str]) -> Optional[str]:
+    """Employee id of a valid local bearer token, or None."""
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = jwt.decode(token.strip(), get_settings().auth_secret_key, algorithms=["HS256"])
+    except PyJWTError:
+        return None
+    employee_id = payload.get("sub")
+    return str(employee_id) if employee_id else None
+
+
+def request_fingerprint(method: str, path: str, body: bytes) -> str:
+    """Hash that tells a retry apart from a different request under the same key."""
+    digest = hashlib.sha256(f"{method} {path}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+class IdempotencyStore:
+    """Claims, completes and purges rows in ``idempotency_keys``."""
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+
+    async def claim(self, scope: str, key: str, request_hash: str) -> Optional[IdempotencyKey]:
+        """Reserve ``key`` for a new request.
+
+        Returns None once the key is reserved, or the live row that already
+        holds it.
+        """
+        now = get_utc_now()
+        async with self.session_factory() as session:
+            for _ in range(2):
+                # An expired row no longer holds its key
+                await session.execute(
+                    delete(IdempotencyKey).where(
+                        IdempotencyKey.scope == scope,
+                        IdempotencyKey.key == key,
+                        IdempotencyKey.expires_at <= now,
+                    )
+                )
+                session.add(IdempotencyKey(
+                    scope=scope, key=key, request_hash=request_hash, expires_at=now + PENDING_TTL
+                ))
+                try:
+                    await session.commit()
+                    return None
+                except IntegrityError:
+                    await session.rollback()
+                result = await session.execute(
+                    select(IdempotencyKey).where(
+                        IdempotencyKey.scope == scope, IdempotencyKey.key == key
+                    )
+                )
+                existing = result.scalar_one_or_none()
+                if existing is not None:
+                    return existing
+        raise RuntimeError("Could not claim idempotency key")
+
+    async def complete(
+        self, scope: str, key: str, status_code: int, content_type: Optional[str], body: bytes
+    ) -> None:
+        """Store the response for a claimed key and start its TTL."""
+        ttl = timedelta(hours=get_settings().idempotency_key_ttl_hours)
+        async with self.session_factory() as session:
+            await session.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+                .values(
+                    status_code=status_code,
+                    content_type=content_type,
+                    response_body=body,
+                    expires_at=get_utc_now() + ttl,
+                )
+            )
+            await session.commit()
+
+    async def release(self, scope: str, key: str) -> None:
+        """Drop a claim whose response is not stored, so the key can be retried."""
+        async with self.session_factory() as session:
+            await session.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.scope == scope,
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.status_code.is_(None),
+                )
+            )
+            await session.commit()
+
+    async def purge_expired(self) -> int:
+        """Delete expired rows and return how many were removed."""
+        async with self.session_factory() as session:
+            result = await session.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.expires_at <= get_utc_now())
+            )
+            await session.commit()
+            return result.rowcount or 0
+
+
+# Singleton instance
+_idempotency_store: Optional[IdempotencyStore] = None
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """Get or create the idempotency store singleton."""
+    global _idempotency_store
+    if _idempotency_store is None:
+        from app.database import AsyncSessionLocal
+
+        _idempotency_store = IdempotencyStore(AsyncSessionLocal)
+    return _idempotency_store
+
+
+async def _buffer_body(receive: Receive) -> Tuple[bytes, Receive]:
+    """Read the whole request body and return it with a receive that replays it."""
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    body = b"".join(chunks)
+    replayed = False
+
+    async def replay() -> Message:
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return body, replay
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware that replays stored responses for repeated Idempotency-Keys."""
+
+    def __init__(self, app: ASGIApp, store: Optional[IdempotencyStore] = None):
+        self.app = app
+        self._store = store
+
+    @property
+    def store(self) -> IdempotencyStore:
+        return self._store or get_idempotency_store()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not any(route.search(scope["path"]) for route in IDEMPOTENT_ROUTES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_HEADER)
+        owner = idempotency_scope(headers.get("authorization")) if key else None
+        if not key or owner is None:
+            # No key, or a token the endpoint will reject anyway
+            await self.app(scope, receive, send)
+            return
+        if len(key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                status_code=400,
+                content={"detail": f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters"},
+            )
+            await response(scope, receive, send)
+            return
+
+        body, receive = await _buffer_body(receive)
+        request_hash = request_fingerprint(scope["method"], scope["path"], body)
+        existing = await self.store.claim(owner, key, request_hash)
+        if existing is not None:
+            await self._answer_retry(existing, request_hash)(scope, receive, send)
+            return
+
+        status_code: Optional[int] = None
+        content_type: Optional[str] = None
+        chunks = []
+
+        async def capture(message: Message) -> None:
+            nonlocal status_code, content_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = Headers(raw=message.get("headers", [])).get("content-type")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        except BaseException:
+            await self.store.release(owner, key)
+            raise
+
+        if status_code is not None and status_code < 500 and status_code not in UNSTORED_STATUSES:
+            await self.store.complete(owner, key, status_code, content_type, b"".join(chunks))
+        else:
+            await self.store.release(owner, key)
+
+    @staticmethod
+    def _answer_retry(existing: IdempotencyKey, request_hash: str) -> Response:
+        if existing.request_hash != request_hash:
+            return JSONResponse(
+                status_code=422,
+                content={"detail": f"{IDEMPOTENCY_HEADER} was already used for a different request"},
+            )
+        if existing.status_code is None:
+            return JSONResponse(
+                status_code=409,
+                content={"detail": "A request with this Idempotency-Key is still in progress"},
+            )
+        logger.info("Replayed idempotent response", extra={"status_code": existing.status_code})
+        return Response(
+            content=existing.response_body or b"",
+            status_code=existing.status_code,
+            media_type=existing.content_type,
+            headers={REPLAYED_HEADER: "true"},
+        )
@@ -1,36 +1,86 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from uuid import uuid4
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import get_settings
+from app.core.db_metrics import InstrumentedAsyncQueuePool, register_engine
 from app.core.db_utils import clean_database_url_for_asyncpg
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
 # Track database type for configuration
 is_sqlite = settings.database_url.startswith("sqlite://")
 
-# Configure engine based on database type
-if is_sqlite:
-    # SQLite for easy local development (no PostgreSQL required)
-    db_url = settings.database_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
-    engine = create_async_engine(
-        db_url,
-        echo=False,
-        future=True,
-        connect_args={"check_same_thread": False}
-    )
-else:
+
+def _pool_kwargs() -> dict:
+    """Pool sizing from Settings, with checkout wait-time instrumentation."""
+    return {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def _statement_cache_args() -> dict:
+    """asyncpg prepared statement cache settings.
+
+    PgBouncer in transaction mode may hand each transaction a different
+    server connection, so fixed statement names collide. There, asyncpg's
+    own statement cache is disabled and SQLAlchemy's cache uses random
+    names (PgBouncer >= 1.21 with max_prepared_statements tracks them per
+    server connection).
+    """
+    args = {"prepared_statement_cache_size": settings.db_statement_cache_size}
+    if settings.db_pgbouncer:
+        args["statement_cache_size"] = 0
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    return args
+
+
+def _build_engine(database_url: str) -> AsyncEngine:
+    """Create an async engine for a SQLite or PostgreSQL URL."""
+    if database_url.startswith("sqlite://"):
+        # SQLite for easy local development (no PostgreSQL required)
+        db_url = database_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+        return create_async_engine(
+            db_url,
+            echo=False,
+            future=True,
+            connect_args={"check_same_thread": False}
+        )
+
     # PostgreSQL - clean URL and detect SSL requirement
-    db_url, ssl_required = clean_database_url_for_asyncpg(settings.database_url)
+    db_url, ssl_required = clean_database_url_for_asyncpg(database_url)
     
     if ssl_required:
-        engine = create_async_engine(
+        return create_async_engine(
             db_url,
             echo=False,
             future=True,
-            connect_args={"ssl": "require"}
+            connect_args={"ssl": "require"} | _statement_cache_args(),
+            **_pool_kwargs(),
         )
-    else:
-        engine = create_async_engine(db_url, echo=False, future=True)
+    return create_async_engine(
+        db_url,
+        echo=False,
+        future=True,
+        connect_args=_statement_cache_args(),
+        **_pool_kwargs(),
+    )
+
+
+engine = _build_engine(settings.database_url)
+register_engine("primary", engine)
 
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
@@ -39,7 +89,87 @@ AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=As
 # then remove this alias
 async_session_maker = AsyncSessionLocal
 
+# Optional read replica for reporting/analytics queries
+replica_engine: Optional[AsyncEngine] = None
+ReadSessionLocal: Optional[async_sessionmaker] = None
+
+if settings.read_replica_url:
+    replica_engine = _build_engine(settings.read_replica_url)
+    register_engine("replica", replica_engine)
+    ReadSessionLocal = async_sessionmaker(replica_engine, expire_on_commit=False, class_=AsyncSession)
+
 
 async def get_session() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         yield session
+
+
+# Replication lag in seconds; 0 when the replica has replayed everything it received
+_REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaLagGuard:
+    """Caches whether the replica is healthy and within the allowed lag."""
+
+    def __init__(self, max_lag_seconds: float, check_interval_seconds: float):
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.last_lag_seconds: Optional[float] = None
+        self._usable = False
+        self._checked_at: Optional[float] = None
+
+    async def is_usable(self, session: AsyncSession) -> bool:
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval_seconds:
+            return self._usable
+        self._checked_at = now
+        try:
+            result = await session.execute(_REPLICA_LAG_SQL)
+            self.last_lag_seconds = float(result.scalar() or 0)
+            self._usable = self.last_lag_seconds <= self.max_lag_seconds
+            if not self._usable:
+                logger.warning(
+                    "Read replica lagging, routing reads to primary",
+                    extra={"lag_seconds": self.last_lag_seconds},
+                )
+        except Exception as e:
+            logger.warning(f"Read replica unavailable, routing reads to primary: {e}")
+            self.last_lag_seconds = None
+            self._usable = False
+        return self._usable
+
+
+replica_guard = ReplicaLagGuard(
+    max_lag_seconds=settings.read_replica_max_lag_seconds,
+    check_interval_seconds=settings.read_replica_lag_check_seconds,
+)
+
+
+@asynccontextmanager
+async def read_session_scope() -> AsyncIterator[AsyncSession]:
+    """Session for read-only reporting queries.
+
+    Uses the read replica when configured, reachable and within
+    READ_REPLICA_MAX_LAG_SECONDS; otherwise falls back to the primary.
+    """
+    if ReadSessionLocal is not None:
+        async with ReadSessionLocal() as session:
+            if await replica_guard.is_usable(session):
+                yield session
+                return
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+async def get_read_session() -> AsyncIterator[AsyncSession]:
+    """Request dependency form of read_session_scope()."""
+    async with read_session_scope() as session:
+        yield session
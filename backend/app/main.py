@@ -8,6 +8,7 @@ from fastapi.staticfiles import StaticFiles
 from slowapi.errors import RateLimitExceeded
 
 from app.core.config import get_settings
+from app.core.idempotency import IdempotencyMiddleware
 from app.core.logging import configure_logging, get_logger
 from app.core.rate_limit import limiter
 from app.routers import admin, attendance, auth, employees, health, onboarding, passes, renewals
@@ -40,6 +41,12 @@ async def lifespan(app: FastAPI):
         logger.info("Attendance scheduler stopped")
     except Exception as e:
         logger.warning(f"Could not stop attendance scheduler: {e}")
+
+    from app.services.clock_ingest import shutdown_clock_ingest_queue
+    await shutdown_clock_ingest_queue()
+
+    from app.core.hashing import shutdown_hashing_executor
+    shutdown_hashing_executor()
     
     logger.info("Application shutdown")
 
@@ -53,12 +60,16 @@ def create_app() -> FastAPI:
     async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
         return JSONResponse(status_code=429, content={"detail": "Rate limit exceeded"})
 
+    # Replays stored responses for retried writes; added first so CORS wraps it
+    app.add_middleware(IdempotencyMiddleware)
+
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.get_allowed_origins_list(),
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
-        allow_headers=["Content-Type", "Authorization"]
+        allow_headers=["Content-Type", "Authorization", "Idempotency-Key"],
+        expose_headers=["Idempotent-Replayed", "X-Next-Cursor"]
     )
 
     app.include_router(health.router, prefix=settings.api_prefix)
@@ -4,7 +4,7 @@ from app.models.employee_compliance import EmployeeCompliance
 from app.models.employee_bank import EmployeeBank
 from app.models.employee_document import EmployeeDocument, DocumentType, DocumentStatus
 from app.models.onboarding_token import OnboardingToken
-from app.models.system_settings import SystemSetting, DEFAULT_FEATURE_TOGGLES
+from app.models.system_settings import SystemSetting, SettingsVersion, DEFAULT_FEATURE_TOGGLES
 from app.models.passes import Pass, PASS_TYPES
 from app.models.attendance import (
     AttendanceRecord, WORK_TYPES, ATTENDANCE_STATUSES, OVERTIME_TYPES,
@@ -15,6 +15,12 @@ from app.models.attendance import (
     FRIDAY_CLOCK_OUT, FRIDAY_WORK_HOURS, STANDARD_BREAK_MINUTES,
     OVERTIME_RATE_REGULAR, OVERTIME_RATE_NIGHT, OVERTIME_RATE_HOLIDAY
 )
+from app.models.attendance_rollup import AttendanceDailyRollup, ROLLUP_UNSPECIFIED
+from app.models.offset_ledger import OffsetLedgerEntry, OFFSET_ENTRY_TYPES
+from app.models.attendance_sync import AttendanceSyncEvent, SYNC_EVENT_TYPES, SYNC_EVENT_STATUSES
+from app.models.idempotency import IdempotencyKey
+from app.models.background_job import BackgroundJob
+from app.models.attendance_archive import AttendanceRecordArchive
 from app.models.interview import InterviewSetup, InterviewSlot, PassMessage, RecruitmentDocument, PassFeedback
 from app.models.performance import PerformanceCycle, PerformanceReview, PerformanceRating
 from app.models.activity_log import ActivityLog
@@ -29,7 +35,7 @@ __all__ = [
     "Employee", "EmployeeProfile", "EmployeeCompliance", "EmployeeBank", 
     "EmployeeDocument", "DocumentType", "DocumentStatus",
     "OnboardingToken",
-    "SystemSetting", "DEFAULT_FEATURE_TOGGLES",
+    "SystemSetting", "SettingsVersion", "DEFAULT_FEATURE_TOGGLES",
     "Pass", "PASS_TYPES",
     "AttendanceRecord", "WORK_TYPES", "ATTENDANCE_STATUSES", "OVERTIME_TYPES",
     "WORK_LOCATIONS", "EMPLOYEE_OVERTIME_POLICIES", "WORK_SCHEDULES",
@@ -38,6 +44,12 @@ __all__ = [
     "STANDARD_CLOCK_IN", "STANDARD_CLOCK_OUT", "RAMADAN_CLOCK_OUT", "GRACE_PERIOD_MINUTES",
     "FRIDAY_CLOCK_OUT", "FRIDAY_WORK_HOURS", "STANDARD_BREAK_MINUTES",
     "OVERTIME_RATE_REGULAR", "OVERTIME_RATE_NIGHT", "OVERTIME_RATE_HOLIDAY",
+    "AttendanceDailyRollup", "ROLLUP_UNSPECIFIED",
+    "OffsetLedgerEntry", "OFFSET_ENTRY_TYPES",
+    "AttendanceSyncEvent", "SYNC_EVENT_TYPES", "SYNC_EVENT_STATUSES",
+    "IdempotencyKey",
+    "BackgroundJob",
+    "AttendanceRecordArchive",
     "InterviewSetup", "InterviewSlot", "PassMessage", "RecruitmentDocument", "PassFeedback",
     "PerformanceCycle", "PerformanceReview", "PerformanceRating",
     "ActivityLog",
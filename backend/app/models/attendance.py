@@ -1,8 +1,8 @@
 from datetime import date, datetime, time
 from decimal import Decimal
-from typing import Optional
+from typing import Optional, Tuple
 
-from sqlalchemy import Boolean, Date, DateTime, ForeignKey, Integer, Numeric, String, Text, Time, func
+from sqlalchemy import Boolean, Date, DateTime, ForeignKey, Index, Integer, Numeric, String, Text, Time, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.renewal import Base
@@ -26,6 +26,15 @@ class AttendanceRecord(Base):
     """
 
     __tablename__ = "attendance_records"
+    # On PostgreSQL the table is range-partitioned by month of attendance_date
+    # (migration 0030), so its primary key there is (id, attendance_date)
+    __table_args__ = (
+        # One record per employee per day (created in migration 0006); concurrent
+        # clock-ins for the same day fail here rather than creating a duplicate
+        Index("ix_attendance_records_employee_date", "employee_id", "attendance_date", unique=True),
+        # Keyset pagination order for /attendance/records
+        Index("ix_attendance_records_date_id", "attendance_date", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     employee_id: Mapped[int] = mapped_column(ForeignKey("employees.id"), nullable=False, index=True)
@@ -125,6 +134,11 @@ class AttendanceRecord(Base):
     exceeds_daily_limit: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     exceeds_overtime_limit: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     
+    # Geofence audit (set by the batch audit job; None until audited)
+    geofence_flagged: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+    geofence_distance_meters: Mapped[Optional[Decimal]] = mapped_column(Numeric(10, 1), nullable=True)
+    geofence_audited_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    
     # Manual correction tracking
     is_manual_entry: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     manual_entry_reason: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -216,3 +230,22 @@ STANDARD_BREAK_MINUTES = 60  # 1 hour break (not counted in work hours)
 OVERTIME_RATE_REGULAR = Decimal("1.25")  # 125% for regular overtime
 OVERTIME_RATE_NIGHT = Decimal("1.50")  # 150% for night hours (9 PM - 4 AM)
 OVERTIME_RATE_HOLIDAY = Decimal("1.50")  # 150% for holidays/rest days
+
+
+def exceptional_overtime_pay(
+    overtime_hours: Optional[Decimal],
+    basic_salary: Optional[Decimal],
+    is_night: bool,
+    is_holiday: bool,
+) -> Tuple[Decimal, Optional[Decimal]]:
+    """Rate and amount for overtime HR has marked as exceptional.
+
+    Night or holiday overtime is paid at 150%, anything else at 125%, on an
+    hourly rate of (basic salary / 30 days) / 8 hours. The amount is None
+    when there is no salary or no overtime to pay.
+    """
+    rate = OVERTIME_RATE_HOLIDAY if is_night or is_holiday else OVERTIME_RATE_REGULAR
+    if not basic_salary or not overtime_hours:
+        return rate, None
+    hourly_rate = (basic_salary / Decimal("30")) / Decimal("8")
+    return rate, overtime_hours * hourly_rate * rate
@@ -0,0 +1,29 @@
+from datetime import date, datetime
+
+from sqlalchemy import JSON, Date, DateTime, ForeignKey, Integer, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.renewal import Base
+
+
+class AttendanceRecordArchive(Base):
+    """One employee's attendance records for an archived month.
+
+    ``records`` holds the month's rows as a JSON array, oldest first. On
+    PostgreSQL it is JSONB, which TOAST stores compressed.
+    """
+
+    __tablename__ = "attendance_records_archive"
+    __table_args__ = (
+        UniqueConstraint("archive_month", "employee_id", name="uq_attendance_archive_month_employee"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    archive_month: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    employee_id: Mapped[int] = mapped_column(ForeignKey("employees.id"), nullable=False, index=True)
+    record_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    records: Mapped[list] = mapped_column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -0,0 +1,53 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Date, DateTime, Integer, Numeric, String, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.renewal import Base
+
+# Stored in place of a NULL work_location / department
+ROLLUP_UNSPECIFIED = "Unspecified"
+
+
+class AttendanceDailyRollup(Base):
+    """Per-day attendance totals by work location and department.
+
+    Maintained incrementally by the attendance write paths (clock-in/out,
+    manual entries, corrections and approvals) so month-level analytics read
+    ~30 rows per location/department instead of every AttendanceRecord.
+    Rebuild with scripts/rebuild_attendance_rollup.py after bulk imports.
+    """
+
+    __tablename__ = "attendance_daily_rollup"
+    __table_args__ = (
+        UniqueConstraint("attendance_date", "work_location", "department", name="uq_attendance_rollup_key"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    attendance_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    # Normalised keys: NULLs are stored as ROLLUP_UNSPECIFIED so the unique key holds
+    work_location: Mapped[str] = mapped_column(String(100), nullable=False)
+    department: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    record_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    present_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    late_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    early_departure_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    on_leave_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    wfh_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    compliance_issue_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    food_allowance_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    total_hours: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+    regular_hours: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+    overtime_hours: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+    night_overtime_hours: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+    holiday_overtime_hours: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+    overtime_amount: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0, nullable=False)
+    food_allowance_amount: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
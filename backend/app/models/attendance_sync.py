@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.renewal import Base
+
+SYNC_EVENT_TYPES = ["clock_in", "clock_out", "break_start", "break_end"]
+
+# applied: the event changed the attendance record; rejected: a rule refused it
+SYNC_EVENT_STATUSES = ["applied", "rejected"]
+
+
+class AttendanceSyncEvent(Base):
+    """Outcome of one offline attendance event, keyed by the client's idempotency key.
+
+    A retried sync finds its earlier outcome here instead of applying the
+    event a second time.
+    """
+
+    __tablename__ = "attendance_sync_events"
+    __table_args__ = (
+        UniqueConstraint("employee_id", "idempotency_key", name="uq_attendance_sync_employee_key"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    employee_id: Mapped[int] = mapped_column(ForeignKey("employees.id"), nullable=False)
+    idempotency_key: Mapped[str] = mapped_column(String(100), nullable=False)
+    event_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    # Not a foreign key: attendance_records is partitioned and archived by month
+    attendance_record_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    detail: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
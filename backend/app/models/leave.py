@@ -29,6 +29,9 @@ LEAVE_TYPES = [
     "emergency"         # Emergency leave
 ]
 
+# Statutory leave counted in calendar days; all other types count working days
+CALENDAR_DAY_LEAVE_TYPES = ["sick", "maternity"]
+
 # Leave status workflow
 LEAVE_STATUSES = [
     "pending",          # Awaiting approval
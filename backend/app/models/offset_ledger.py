@@ -0,0 +1,46 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, Numeric, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.renewal import Base
+
+# earn: approved offset overtime; use: hours taken as time off;
+# expire: hours forfeited; adjust: correction to an earlier earn entry
+OFFSET_ENTRY_TYPES = ["earn", "use", "expire", "adjust"]
+
+
+class OffsetLedgerEntry(Base):
+    """Append-only ledger of offset hours per employee.
+
+    Each row carries the running totals after it is applied, so an
+    employee's current balance is their latest row.
+    """
+
+    __tablename__ = "offset_ledger"
+    __table_args__ = (
+        Index("ix_offset_ledger_employee_id_id", "employee_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    employee_id: Mapped[int] = mapped_column(ForeignKey("employees.id"), nullable=False)
+    entry_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    # Signed: positive for earn, negative for use/expire, either for adjust
+    hours: Mapped[Decimal] = mapped_column(Numeric(6, 2), nullable=False)
+    entry_date: Mapped[date] = mapped_column(Date, nullable=False)
+    # Not a foreign key: attendance_records is partitioned and archived by month
+    attendance_record_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
+    reference: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+
+    # Running totals after this entry
+    balance_after: Mapped[Decimal] = mapped_column(Numeric(8, 2), nullable=False)
+    earned_to_date: Mapped[Decimal] = mapped_column(Numeric(8, 2), nullable=False)
+    used_to_date: Mapped[Decimal] = mapped_column(Numeric(8, 2), nullable=False)
+    expired_to_date: Mapped[Decimal] = mapped_column(Numeric(8, 2), nullable=False)
+
+    created_by: Mapped[Optional[int]] = mapped_column(ForeignKey("employees.id"), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
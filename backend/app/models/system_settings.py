@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, DateTime, String, Text, func
+from sqlalchemy import Boolean, DateTime, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.renewal import Base
@@ -26,6 +26,21 @@ class SystemSetting(Base):
     )
 
 
+class SettingsVersion(Base):
+    """Single-row counter bumped on every feature toggle write.
+
+    Workers poll this row to know when their cached toggle snapshot is stale.
+    """
+
+    __tablename__ = "settings_version"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
 # Default feature toggles to be inserted on first run
 DEFAULT_FEATURE_TOGGLES = [
     # Core Features
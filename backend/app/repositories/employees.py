@@ -4,6 +4,7 @@ from typing import Optional, Sequence
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.principal import invalidate_principal
 from app.models.employee import Employee
 
 
@@ -97,6 +98,7 @@ class EmployeeRepository:
             .where(Employee.employee_id == employee_id)
             .values(is_active=False)
         )
+        invalidate_principal(employee_id)
         return result.rowcount > 0
 
     async def exists(self, session: AsyncSession, employee_id: str) -> bool:
@@ -120,6 +122,7 @@ class EmployeeRepository:
         
         await session.flush()
         await session.refresh(employee)
+        invalidate_principal(employee_id)
         return employee
 
     async def get_all_active_for_compliance(
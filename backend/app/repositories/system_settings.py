@@ -1,9 +1,9 @@
-from typing import List, Optional, Sequence
+from typing import Dict, List, Optional, Sequence
 
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.system_settings import SystemSetting, DEFAULT_FEATURE_TOGGLES
+from app.models.system_settings import SystemSetting, SettingsVersion, DEFAULT_FEATURE_TOGGLES
 
 
 class SystemSettingsRepository:
@@ -41,6 +41,8 @@ class SystemSettingsRepository:
             .where(SystemSetting.key == key)
             .values(is_enabled=is_enabled, value=str(is_enabled).lower())
         )
+        if result.rowcount > 0:
+            await self.bump_version(session)
         return result.rowcount > 0
 
     async def is_feature_enabled(self, session: AsyncSession, key: str) -> bool:
@@ -78,6 +80,7 @@ class SystemSettingsRepository:
         
         if created > 0:
             await session.flush()
+            await self.bump_version(session)
         
         return created
 
@@ -86,6 +89,7 @@ class SystemSettingsRepository:
         result = await session.execute(
             update(SystemSetting).values(is_enabled=False, value="false")
         )
+        await self.bump_version(session)
         return result.rowcount
 
     async def enable_core_only(self, session: AsyncSession) -> int:
@@ -100,4 +104,30 @@ class SystemSettingsRepository:
             .where(SystemSetting.category == "core")
             .values(is_enabled=True, value="true")
         )
+        await self.bump_version(session)
         return result.rowcount
+
+    async def get_toggle_map(self, session: AsyncSession) -> Dict[str, bool]:
+        """Load every toggle as a key -> is_enabled mapping."""
+        result = await session.execute(
+            select(SystemSetting.key, SystemSetting.is_enabled)
+        )
+        return {key: is_enabled for key, is_enabled in result.all()}
+
+    async def get_version(self, session: AsyncSession) -> int:
+        """Get the current settings version (0 if never bumped)."""
+        result = await session.execute(
+            select(SettingsVersion.version).where(SettingsVersion.id == 1)
+        )
+        return result.scalar_one_or_none() or 0
+
+    async def bump_version(self, session: AsyncSession) -> None:
+        """Increment the settings version so other workers reload toggles."""
+        result = await session.execute(
+            update(SettingsVersion)
+            .where(SettingsVersion.id == 1)
+            .values(version=SettingsVersion.version + 1)
+        )
+        if result.rowcount == 0:
+            session.add(SettingsVersion(id=1, version=1))
+            await session.flush()
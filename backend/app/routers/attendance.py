@@ -1,16 +1,18 @@
-from datetime import date, datetime
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
-import jwt
-from jwt.exceptions import PyJWTError
-from sqlalchemy import and_, func, select
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, func, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.dependencies import get_token_identity
+from app.auth.principal import Principal, resolve_principal
 from app.core.config import get_settings
 from app.core.time import get_utc_now, get_uae_today, get_uae_today_from_utc, to_uae
-from app.database import get_session
+from app.database import async_session_maker, get_read_session, get_session
 from app.models.employee import Employee
 from app.models.attendance import (
     AttendanceRecord, 
@@ -19,70 +21,67 @@ from app.models.attendance import (
     RAMADAN_WORK_HOURS, GRACE_PERIOD_MINUTES, 
     FRIDAY_WORK_HOURS,
     OVERTIME_RATE_REGULAR, OVERTIME_RATE_HOLIDAY,
-    WORK_LOCATIONS, WORK_LOCATIONS_REQUIRE_REMARKS
+    WORK_LOCATIONS, WORK_LOCATIONS_REQUIRE_REMARKS,
+    exceptional_overtime_pay
 )
-from app.models.system_settings import SystemSetting
+from app.models.attendance_sync import AttendanceSyncEvent
 from app.schemas.attendance import (
     ClockInRequest, ClockOutRequest, BreakRequest,
-    AttendanceResponse, AttendanceDashboard, EmployeeWorkSettings,
+    AttendanceResponse, AttendanceRecordPage, AttendanceDashboard, EmployeeWorkSettings,
     WFHApprovalRequest, OvertimeApprovalRequest, TodayAttendanceStatus,
     ManualAttendanceRequest, AttendanceCorrectionRequest, CorrectionApprovalRequest,
-    ExceptionalOvertimeRequest, OffsetBalanceSummary, OffsetDayRecord,
+    ExceptionalOvertimeRequest, OffsetBalanceSummary, OffsetLedgerEntryResponse, OffsetLedgerPage, OffsetUsageRequest,
     PaidOvertimeSummary, PaidOvertimeRecord,
-    ManagerDailySummary, ManagerDailySummaryRow
+    ManagerDailySummary,
+    AttendanceSyncEventRequest, AttendanceSyncRequest, AttendanceSyncEventResult, AttendanceSyncResponse,
+    OvertimeRecomputeRequest, OvertimeRecomputeJobResponse,
+    BulkApprovalRequest, BulkApprovalResponse
+)
+from app.services.attendance_dashboard import get_dashboard_cache
+from app.services.attendance_export import EXPORT_MEDIA_TYPES, stream_attendance_records
+from app.services.attendance_rollup import apply_rollup_change, rollup_snapshot
+from app.services.bulk_approval import approval_results, may_decide, triage, unique_ids
+from app.services.clock_ingest import ClockWork, get_clock_ingest_queue
+from app.services.feature_flags import get_feature_flags
+from app.services.manager_summary import load_team_rows, summarise_team
+from app.services.overtime_recompute import (
+    OvertimeRecomputeJob, get_overtime_recompute_jobs, run_overtime_recompute
+)
+from app.services.offset_ledger import (
+    HOURS_PER_OFFSET_DAY, append_entry, get_latest_entry, list_entries, sync_record_credit,
+    sync_record_credits
 )
 
 router = APIRouter(prefix="/attendance", tags=["Attendance"])
 
+# How far ahead of the server clock an offline event's timestamp may be
+SYNC_CLOCK_SKEW = timedelta(minutes=5)
+
+# Largest page /attendance/records returns
+MAX_RECORDS_PAGE_SIZE = 500
+
+# Rows fetched per round trip when streaming /attendance/records/export
+RECORDS_EXPORT_BATCH_SIZE = 1000
+
 
 async def check_feature_enabled(session: AsyncSession, feature_key: str) -> bool:
-    """Check if a feature toggle is enabled."""
-    result = await session.execute(
-        select(SystemSetting).where(SystemSetting.key == feature_key)
-    )
-    setting = result.scalar_one_or_none()
-    if not setting:
-        return True  # Default to enabled if setting doesn't exist
-    return setting.is_enabled
+    """Check if a feature toggle is enabled (defaults to enabled if the setting doesn't exist)."""
+    return await get_feature_flags().is_enabled(session, feature_key, default=True)
 
 
 async def get_current_employee(
     authorization: str = Header(...),
     session: AsyncSession = Depends(get_session)
-) -> Employee:
+) -> Principal:
     """Extract and validate employee from JWT token."""
-    try:
-        scheme, _, token = authorization.partition(" ")
-        if scheme.lower() != "bearer" or not token:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authorization header",
-            )
-        settings = get_settings()
-        payload = jwt.decode(token, settings.auth_secret_key, algorithms=["HS256"])
-        employee_id = payload.get("sub")
-        if not employee_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token",
-            )
-        
-        # Get employee from database
-        result = await session.execute(
-            select(Employee).where(Employee.employee_id == employee_id)
-        )
-        employee = result.scalar_one_or_none()
-        if not employee:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Employee not found",
-            )
-        return employee
-    except PyJWTError:
+    employee_id, issued_at = get_token_identity(authorization)
+    employee = await resolve_principal(session, employee_id, issued_at)
+    if not employee:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
+            detail="Employee not found",
         )
+    return employee
 
 
 def get_employee_work_settings(employee: Employee, is_ramadan: bool = False) -> EmployeeWorkSettings:
@@ -291,6 +290,8 @@ def build_response(record: AttendanceRecord, employee_name: str) -> AttendanceRe
         is_rest_day=record.is_rest_day,
         exceeds_daily_limit=record.exceeds_daily_limit,
         exceeds_overtime_limit=record.exceeds_overtime_limit,
+        geofence_flagged=record.geofence_flagged,
+        geofence_distance_meters=record.geofence_distance_meters,
         is_manual_entry=record.is_manual_entry,
         manual_entry_reason=record.manual_entry_reason,
         correction_approved=record.correction_approved,
@@ -419,29 +420,14 @@ async def get_today_status(
     )
 
 
-@router.post("/clock-in", response_model=AttendanceResponse)
-async def clock_in(
-    request: ClockInRequest,
-    current_user: Employee = Depends(get_current_employee),
-    session: AsyncSession = Depends(get_session)
-):
-    """Clock in for the day with work location dropdown.
-    
-    Work Location dropdown values (locked):
-    - Head Office, KEZAD, Safario, Sites, Meeting, Event, Work From Home
-    
-    For Sites, Meeting, Event, Work From Home:
-    - location_remarks field is required
-    
-    For Work From Home:
-    - wfh_approval_confirmed should be True if employee has obtained Line Manager approval
-    """
-    # Check if attendance feature is enabled
-    if not await check_feature_enabled(session, "feature_attendance"):
-        raise HTTPException(status_code=403, detail="Attendance feature is disabled")
-    
+def resolve_clock_in_location(
+    current_user: Principal,
+    work_location: Optional[str],
+    location_remarks: Optional[str],
+) -> str:
+    """Default and validate the work location for a clock-in (raises 400)."""
     # Validate work location is in allowed list
-    work_location = request.work_location or current_user.location or "Head Office"
+    work_location = work_location or current_user.location or "Head Office"
     if work_location not in WORK_LOCATIONS:
         raise HTTPException(
             status_code=400, 
@@ -450,31 +436,44 @@ async def clock_in(
     
     # Validate remarks are provided for locations that require them
     if work_location in WORK_LOCATIONS_REQUIRE_REMARKS:
-        if not request.location_remarks or not request.location_remarks.strip():
+        if not location_remarks or not location_remarks.strip():
             raise HTTPException(
                 status_code=400,
                 detail=f"Details/Remarks are required for work location: {work_location}"
             )
-    
-    # Validate WFH request if feature is disabled
-    if work_location == "Work From Home":
-        if not await check_feature_enabled(session, "feature_attendance_wfh"):
-            raise HTTPException(status_code=403, detail="WFH feature is disabled")
-    
-    now_utc = get_utc_now()
+    return work_location
+
+
+async def _commit_clock_event(session: AsyncSession, work: ClockWork) -> AttendanceRecord:
+    """Apply a clock-in/out and commit it, group-committed when batching is enabled."""
+    if get_settings().clock_ingest_batching:
+        # Give the request's connection back while the event waits for its batch
+        await session.close()
+        return await get_clock_ingest_queue().submit(work)
+    try:
+        record = await work(session)
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise
+    await session.refresh(record)
+    return record
+
+
+async def _apply_clock_in(
+    session: AsyncSession,
+    current_user: Principal,
+    request: ClockInRequest,
+    work_location: str,
+    now_utc: datetime,
+    gps_enabled: bool,
+) -> AttendanceRecord:
+    """Create (or fill in) today's record for a validated clock-in. Does not commit."""
     uae_now = to_uae(now_utc)
     today = get_uae_today_from_utc(now_utc)
     
     # Check if already clocked in today
-    result = await session.execute(
-        select(AttendanceRecord).where(
-            and_(
-                AttendanceRecord.employee_id == current_user.id,
-                AttendanceRecord.attendance_date == today
-            )
-        )
-    )
-    existing = result.scalar_one_or_none()
+    existing = await _todays_record(session, current_user.id, now_utc)
     
     if existing and existing.clock_in:
         raise HTTPException(status_code=400, detail="Already clocked in today")
@@ -502,19 +501,11 @@ async def clock_in(
     else:
         work_type = "office"
     
-    # Store GPS coordinates if GPS feature is enabled
-    gps_enabled = await check_feature_enabled(session, "feature_attendance_gps")
-    lat = request.latitude if gps_enabled else None
-    lng = request.longitude if gps_enabled else None
-    addr = request.address if gps_enabled else None
-    
-    record = AttendanceRecord(
-        employee_id=current_user.id,
-        attendance_date=today,
+    fields = dict(
         clock_in=now_utc,
-        clock_in_latitude=lat,
-        clock_in_longitude=lng,
-        clock_in_address=addr,
+        clock_in_latitude=request.latitude if gps_enabled else None,
+        clock_in_longitude=request.longitude if gps_enabled else None,
+        clock_in_address=request.address if gps_enabled else None,
         work_type=work_type,
         work_location=work_location,
         location_remarks=request.location_remarks,
@@ -526,43 +517,34 @@ async def clock_in(
         notes=request.notes
     )
     
-    session.add(record)
-    await session.commit()
-    await session.refresh(record)
+    if existing:
+        # A placeholder row for today (no clock-in yet) is filled in, not duplicated
+        rollup_before = rollup_snapshot(existing)
+        record = existing
+        for name, value in fields.items():
+            setattr(record, name, value)
+    else:
+        rollup_before = None
+        record = AttendanceRecord(employee_id=current_user.id, attendance_date=today, **fields)
+        session.add(record)
     
-    return build_response(record, current_user.name)
+    await apply_rollup_change(session, record, rollup_before, department=current_user.department)
+    return record
 
 
-@router.post("/clock-out", response_model=AttendanceResponse)
-async def clock_out(
+async def _apply_clock_out(
+    session: AsyncSession,
+    current_user: Principal,
     request: ClockOutRequest,
-    current_user: Employee = Depends(get_current_employee),
-    session: AsyncSession = Depends(get_session)
-):
-    """Clock out for the day with employee work settings integration.
-    
-    Calculates hours based on employee's work settings:
-    - Uses employee.work_schedule for standard hours
-    - Applies employee.overtime_type to determine overtime tracking (Offset, Paid, N/A)
-    - Enforces UAE Labor Law limits (max 2 hours overtime per day)
-    """
-    # Check if attendance feature is enabled
-    if not await check_feature_enabled(session, "feature_attendance"):
-        raise HTTPException(status_code=403, detail="Attendance feature is disabled")
-    
-    now_utc = get_utc_now()
+    now_utc: datetime,
+    gps_enabled: bool,
+    overtime_enabled: bool,
+) -> AttendanceRecord:
+    """Close today's record for a clock-out and compute its hours. Does not commit."""
     uae_now = to_uae(now_utc)
     today = get_uae_today_from_utc(now_utc)
     
-    result = await session.execute(
-        select(AttendanceRecord).where(
-            and_(
-                AttendanceRecord.employee_id == current_user.id,
-                AttendanceRecord.attendance_date == today
-            )
-        )
-    )
-    record = result.scalar_one_or_none()
+    record = await _todays_record(session, current_user.id, now_utc)
     
     if not record or not record.clock_in:
         raise HTTPException(status_code=400, detail="You haven't clocked in today")
@@ -570,6 +552,11 @@ async def clock_out(
     if record.clock_out:
         raise HTTPException(status_code=400, detail="Already clocked out today")
     
+    if now_utc <= record.clock_in:
+        raise HTTPException(status_code=400, detail="Clock-out must be after clock-in")
+    
+    rollup_before = rollup_snapshot(record)
+    
     # End break if on break (accumulate with previous breaks)
     if record.break_start and not record.break_end:
         previous_break_mins = record.break_duration_minutes or 0
@@ -578,7 +565,6 @@ async def clock_out(
         record.break_duration_minutes = previous_break_mins + this_break_mins
     
     # Store GPS coordinates if GPS feature is enabled
-    gps_enabled = await check_feature_enabled(session, "feature_attendance_gps")
     record.clock_out = now_utc
     record.clock_out_latitude = request.latitude if gps_enabled else None
     record.clock_out_longitude = request.longitude if gps_enabled else None
@@ -611,9 +597,6 @@ async def clock_out(
     # Get employee's overtime policy and apply it
     overtime_policy = current_user.overtime_type or "N/A"
     
-    # Check if overtime feature is enabled
-    overtime_enabled = await check_feature_enabled(session, "feature_attendance_overtime")
-    
     if overtime_hrs and overtime_hrs > 0 and overtime_enabled and overtime_policy.upper() != "N/A":
         record.overtime_type = "auto-calculated"
         record.overtime_approved = None  # Requires approval
@@ -636,35 +619,29 @@ async def clock_out(
         # Calculate minutes before expected end time
         record.early_departure_minutes = (expected_end_hour - uae_hour) * 60 - uae_now.minute
     
-    await session.commit()
-    await session.refresh(record)
-    
-    return build_response(record, current_user.name)
+    await apply_rollup_change(session, record, rollup_before, department=current_user.department)
+    return record
 
 
-@router.post("/break/start", response_model=AttendanceResponse)
-async def start_break(
-    request: BreakRequest,
-    current_user: Employee = Depends(get_current_employee),
-    session: AsyncSession = Depends(get_session)
-):
-    """Start break."""
-    # Check if attendance feature is enabled
-    if not await check_feature_enabled(session, "feature_attendance"):
-        raise HTTPException(status_code=403, detail="Attendance feature is disabled")
-    
-    now_utc = get_utc_now()
-    today = get_uae_today_from_utc(now_utc)
-    
+async def _todays_record(
+    session: AsyncSession, employee_id: int, now_utc: datetime
+) -> Optional[AttendanceRecord]:
     result = await session.execute(
         select(AttendanceRecord).where(
             and_(
-                AttendanceRecord.employee_id == current_user.id,
-                AttendanceRecord.attendance_date == today
+                AttendanceRecord.employee_id == employee_id,
+                AttendanceRecord.attendance_date == get_uae_today_from_utc(now_utc)
             )
         )
     )
-    record = result.scalar_one_or_none()
+    return result.scalar_one_or_none()
+
+
+async def _apply_break_start(
+    session: AsyncSession, current_user: Principal, now_utc: datetime
+) -> AttendanceRecord:
+    """Start a break on today's record. Does not commit."""
+    record = await _todays_record(session, current_user.id, now_utc)
     
     if not record or not record.clock_in:
         raise HTTPException(status_code=400, detail="You haven't clocked in today")
@@ -675,6 +652,9 @@ async def start_break(
     if record.break_start and not record.break_end:
         raise HTTPException(status_code=400, detail="Already on break")
     
+    if now_utc < record.clock_in:
+        raise HTTPException(status_code=400, detail="Break cannot start before clock-in")
+    
     # Accumulate break duration from previous breaks
     previous_break_mins = record.break_duration_minutes or 0
     
@@ -682,7 +662,123 @@ async def start_break(
     record.break_end = None
     # Store previous accumulated duration to add to when break ends
     record.break_duration_minutes = previous_break_mins
+    return record
+
+
+async def _apply_break_end(
+    session: AsyncSession, current_user: Principal, now_utc: datetime
+) -> AttendanceRecord:
+    """End the current break on today's record. Does not commit."""
+    record = await _todays_record(session, current_user.id, now_utc)
+    
+    if not record or not record.break_start:
+        raise HTTPException(status_code=400, detail="You're not on break")
+    
+    if record.break_end:
+        raise HTTPException(status_code=400, detail="Break already ended")
+    
+    if now_utc < record.break_start:
+        raise HTTPException(status_code=400, detail="Break cannot end before it started")
+    
+    # Calculate this break's duration and add to accumulated total
+    this_break_mins = int((now_utc - record.break_start).total_seconds() / 60)
+    previous_break_mins = record.break_duration_minutes or 0
+    
+    record.break_end = now_utc
+    record.break_duration_minutes = previous_break_mins + this_break_mins
+    return record
+
+
+@router.post("/clock-in", response_model=AttendanceResponse)
+async def clock_in(
+    request: ClockInRequest,
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session)
+):
+    """Clock in for the day with work location dropdown.
+    
+    Work Location dropdown values (locked):
+    - Head Office, KEZAD, Safario, Sites, Meeting, Event, Work From Home
+    
+    For Sites, Meeting, Event, Work From Home:
+    - location_remarks field is required
+    
+    For Work From Home:
+    - wfh_approval_confirmed should be True if employee has obtained Line Manager approval
+    """
+    # Check if attendance feature is enabled
+    if not await check_feature_enabled(session, "feature_attendance"):
+        raise HTTPException(status_code=403, detail="Attendance feature is disabled")
+    
+    work_location = resolve_clock_in_location(
+        current_user, request.work_location, request.location_remarks
+    )
+    
+    # Validate WFH request if feature is disabled
+    if work_location == "Work From Home":
+        if not await check_feature_enabled(session, "feature_attendance_wfh"):
+            raise HTTPException(status_code=403, detail="WFH feature is disabled")
+    
+    # Store GPS coordinates if GPS feature is enabled
+    gps_enabled = await check_feature_enabled(session, "feature_attendance_gps")
+    now_utc = get_utc_now()
+    
+    async def work(write_session: AsyncSession) -> AttendanceRecord:
+        return await _apply_clock_in(
+            write_session, current_user, request, work_location, now_utc, gps_enabled
+        )
+    
+    try:
+        record = await _commit_clock_event(session, work)
+    except IntegrityError:
+        # Lost a race with a concurrent clock-in for the same day
+        raise HTTPException(status_code=400, detail="Already clocked in today")
+    
+    return build_response(record, current_user.name)
+
+
+@router.post("/clock-out", response_model=AttendanceResponse)
+async def clock_out(
+    request: ClockOutRequest,
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session)
+):
+    """Clock out for the day with employee work settings integration.
+    
+    Calculates hours based on employee's work settings:
+    - Uses employee.work_schedule for standard hours
+    - Applies employee.overtime_type to determine overtime tracking (Offset, Paid, N/A)
+    - Enforces UAE Labor Law limits (max 2 hours overtime per day)
+    """
+    # Check if attendance feature is enabled
+    if not await check_feature_enabled(session, "feature_attendance"):
+        raise HTTPException(status_code=403, detail="Attendance feature is disabled")
+    
+    gps_enabled = await check_feature_enabled(session, "feature_attendance_gps")
+    overtime_enabled = await check_feature_enabled(session, "feature_attendance_overtime")
+    now_utc = get_utc_now()
+    
+    async def work(write_session: AsyncSession) -> AttendanceRecord:
+        return await _apply_clock_out(
+            write_session, current_user, request, now_utc, gps_enabled, overtime_enabled
+        )
     
+    record = await _commit_clock_event(session, work)
+    return build_response(record, current_user.name)
+
+
+@router.post("/break/start", response_model=AttendanceResponse)
+async def start_break(
+    request: BreakRequest,
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session)
+):
+    """Start break."""
+    # Check if attendance feature is enabled
+    if not await check_feature_enabled(session, "feature_attendance"):
+        raise HTTPException(status_code=403, detail="Attendance feature is disabled")
+    
+    record = await _apply_break_start(session, current_user, get_utc_now())
     await session.commit()
     await session.refresh(record)
     
@@ -700,36 +796,169 @@ async def end_break(
     if not await check_feature_enabled(session, "feature_attendance"):
         raise HTTPException(status_code=403, detail="Attendance feature is disabled")
     
+    record = await _apply_break_end(session, current_user, get_utc_now())
+    await session.commit()
+    await session.refresh(record)
+    
+    return build_response(record, current_user.name)
+
+
+def _check_sync_time(
+    occurred_at: datetime, now_utc: datetime, previous: Optional[datetime]
+) -> datetime:
+    """Validate an offline event's timestamp and return it in UTC (raises 400)."""
+    if occurred_at.tzinfo is None:
+        raise HTTPException(status_code=400, detail="occurred_at must include a timezone offset")
+    occurred_at = occurred_at.astimezone(timezone.utc)
+    if occurred_at > now_utc + SYNC_CLOCK_SKEW:
+        raise HTTPException(status_code=400, detail="Event time is in the future")
+    max_age_days = get_settings().attendance_sync_max_age_days
+    if occurred_at < now_utc - timedelta(days=max_age_days):
+        raise HTTPException(
+            status_code=400, detail=f"Event is older than {max_age_days} days and cannot be synced"
+        )
+    if previous is not None and occurred_at < previous:
+        raise HTTPException(status_code=400, detail="Event is earlier than the previous synced event")
+    return occurred_at
+
+
+@router.post("/sync", response_model=AttendanceSyncResponse)
+async def sync_offline_events(
+    request: AttendanceSyncRequest,
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session)
+):
+    """Apply clock and break events captured offline by the mobile app.
+    
+    Events are applied in the order sent, at their own timestamps, using the
+    same rules as the live clock-in, clock-out and break endpoints. Each event
+    runs in its own savepoint, so a rejected event does not stop the rest,
+    and the whole batch is committed once. The outcome of every event is
+    stored against its idempotency key; a retried key returns that stored
+    outcome with status "duplicate" instead of being applied again.
+    """
+    if not await check_feature_enabled(session, "feature_attendance"):
+        raise HTTPException(status_code=403, detail="Attendance feature is disabled")
+    
+    gps_enabled = await check_feature_enabled(session, "feature_attendance_gps")
+    overtime_enabled = await check_feature_enabled(session, "feature_attendance_overtime")
+    wfh_enabled = await check_feature_enabled(session, "feature_attendance_wfh")
     now_utc = get_utc_now()
-    today = get_uae_today_from_utc(now_utc)
     
     result = await session.execute(
-        select(AttendanceRecord).where(
-            and_(
-                AttendanceRecord.employee_id == current_user.id,
-                AttendanceRecord.attendance_date == today
-            )
+        select(AttendanceSyncEvent).where(
+            AttendanceSyncEvent.employee_id == current_user.id,
+            AttendanceSyncEvent.idempotency_key.in_({e.idempotency_key for e in request.events}),
         )
     )
-    record = result.scalar_one_or_none()
-    
-    if not record or not record.break_start:
-        raise HTTPException(status_code=400, detail="You're not on break")
-    
-    if record.break_end:
-        raise HTTPException(status_code=400, detail="Break already ended")
-    
-    # Calculate this break's duration and add to accumulated total
-    this_break_mins = int((now_utc - record.break_start).total_seconds() / 60)
-    previous_break_mins = record.break_duration_minutes or 0
-    
-    record.break_end = now_utc
-    record.break_duration_minutes = previous_break_mins + this_break_mins
-    
-    await session.commit()
-    await session.refresh(record)
+    outcomes = {row.idempotency_key: row for row in result.scalars().all()}
+    
+    results: List[tuple] = []
+    previous: Optional[datetime] = None
+    for event in request.events:
+        stored = outcomes.get(event.idempotency_key)
+        if stored is not None:
+            results.append((event, stored, True))
+            continue
+        
+        record = None
+        detail = None
+        try:
+            occurred_at = _check_sync_time(event.occurred_at, now_utc, previous)
+            async with session.begin_nested():
+                record = await _apply_sync_event(
+                    session, current_user, event, occurred_at, gps_enabled, overtime_enabled, wfh_enabled
+                )
+            previous = occurred_at
+        except HTTPException as e:
+            detail = str(e.detail)
+        except IntegrityError:
+            # A live clock-in for the same day was committed while this event applied
+            detail = "Conflicts with an existing attendance record"
+        
+        stored = AttendanceSyncEvent(
+            employee_id=current_user.id,
+            idempotency_key=event.idempotency_key,
+            event_type=event.event_type,
+            occurred_at=(
+                event.occurred_at if event.occurred_at.tzinfo
+                else event.occurred_at.replace(tzinfo=timezone.utc)
+            ),
+            status="applied" if record is not None else "rejected",
+            attendance_record_id=record.id if record is not None else None,
+            detail=detail,
+        )
+        session.add(stored)
+        outcomes[event.idempotency_key] = stored
+        results.append((event, stored, False))
     
-    return build_response(record, current_user.name)
+    try:
+        await session.commit()
+    except IntegrityError:
+        # A concurrent sync with the same keys committed first; the client retries
+        await session.rollback()
+        raise HTTPException(status_code=409, detail="These events are already being synced")
+    
+    # One SELECT reloads every touched record with server defaults populated
+    record_ids = {stored.attendance_record_id for _, stored, _ in results if stored.attendance_record_id}
+    records = {}
+    if record_ids:
+        loaded = await session.execute(
+            select(AttendanceRecord)
+            .where(AttendanceRecord.id.in_(record_ids))
+            .execution_options(populate_existing=True)
+        )
+        records = {record.id: record for record in loaded.scalars().all()}
+    
+    response = AttendanceSyncResponse()
+    for event, stored, duplicate in results:
+        if duplicate:
+            response.duplicates += 1
+        elif stored.status == "applied":
+            response.applied += 1
+        else:
+            response.rejected += 1
+        record = records.get(stored.attendance_record_id)
+        response.results.append(AttendanceSyncEventResult(
+            idempotency_key=event.idempotency_key,
+            event_type=stored.event_type,
+            status="duplicate" if duplicate else stored.status,
+            detail=stored.detail,
+            record=build_response(record, current_user.name) if record is not None else None,
+        ))
+    return response
+
+
+async def _apply_sync_event(
+    session: AsyncSession,
+    current_user: Principal,
+    event: AttendanceSyncEventRequest,
+    occurred_at: datetime,
+    gps_enabled: bool,
+    overtime_enabled: bool,
+    wfh_enabled: bool,
+) -> AttendanceRecord:
+    """Apply one offline event at its own timestamp. Does not commit."""
+    if event.event_type == "clock_in":
+        work_location = resolve_clock_in_location(
+            current_user, event.work_location, event.location_remarks
+        )
+        if work_location == "Work From Home" and not wfh_enabled:
+            raise HTTPException(status_code=403, detail="WFH feature is disabled")
+        record = await _apply_clock_in(
+            session, current_user, event, work_location, occurred_at, gps_enabled
+        )
+    elif event.event_type == "clock_out":
+        record = await _apply_clock_out(
+            session, current_user, event, occurred_at, gps_enabled, overtime_enabled
+        )
+    elif event.event_type == "break_start":
+        record = await _apply_break_start(session, current_user, occurred_at)
+    else:
+        record = await _apply_break_end(session, current_user, occurred_at)
+    # Assigns the id of a new record so the sync outcome can point at it
+    await session.flush()
+    return record
 
 
 @router.post("/manual-entry", response_model=AttendanceResponse)
@@ -818,6 +1047,7 @@ async def create_manual_entry(
         record.exceeds_overtime_limit = exceeds_overtime_limit
     
     session.add(record)
+    await apply_rollup_change(session, record, None, department=employee.department)
     await session.commit()
     await session.refresh(record)
     
@@ -944,8 +1174,7 @@ async def get_my_records(
     return [build_response(r, current_user.name) for r in records]
 
 
-@router.get("/records", response_model=List[AttendanceResponse])
-async def get_all_records(
+def attendance_record_filters(
     employee_id: Optional[int] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
@@ -954,54 +1183,173 @@ async def get_all_records(
     att_status: Optional[str] = Query(None, alias="status"),
     pending_corrections: Optional[bool] = Query(None),
     exceeds_limits: Optional[bool] = Query(None),
-    current_user: Employee = Depends(get_current_employee),
-    session: AsyncSession = Depends(get_session)
-):
-    """Get all attendance records (admin/HR only) with enhanced filtering."""
-    if current_user.role not in ["admin", "hr"]:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    query = select(AttendanceRecord, Employee.name).join(
-        Employee, AttendanceRecord.employee_id == Employee.id
-    )
-    
+    geofence_flagged: Optional[bool] = Query(None),
+) -> list:
+    """WHERE conditions shared by the records listing and its export."""
+    conditions = []
     if employee_id:
-        query = query.where(AttendanceRecord.employee_id == employee_id)
+        conditions.append(AttendanceRecord.employee_id == employee_id)
     if start_date:
-        query = query.where(AttendanceRecord.attendance_date >= start_date)
+        conditions.append(AttendanceRecord.attendance_date >= start_date)
     if end_date:
-        query = query.where(AttendanceRecord.attendance_date <= end_date)
+        conditions.append(AttendanceRecord.attendance_date <= end_date)
     if work_type:
-        query = query.where(AttendanceRecord.work_type == work_type)
+        conditions.append(AttendanceRecord.work_type == work_type)
     if work_location:
-        query = query.where(AttendanceRecord.work_location == work_location)
+        conditions.append(AttendanceRecord.work_location == work_location)
     if att_status:
-        query = query.where(AttendanceRecord.status == att_status)
+        conditions.append(AttendanceRecord.status == att_status)
     if pending_corrections:
-        query = query.where(
+        conditions.append(
             and_(
                 AttendanceRecord.is_manual_entry == True,
                 AttendanceRecord.correction_approved == None
             )
         )
     if exceeds_limits:
-        query = query.where(
+        conditions.append(
             (AttendanceRecord.exceeds_daily_limit == True) | 
             (AttendanceRecord.exceeds_overtime_limit == True)
         )
+    if geofence_flagged is not None:
+        conditions.append(AttendanceRecord.geofence_flagged == geofence_flagged)
+    return conditions
+
+
+def _records_query(conditions: list):
+    """Records with employee names, newest first with id as the tie-breaker."""
+    return (
+        select(AttendanceRecord, Employee.name)
+        .join(Employee, AttendanceRecord.employee_id == Employee.id)
+        .where(*conditions)
+        .order_by(AttendanceRecord.attendance_date.desc(), AttendanceRecord.id.desc())
+    )
+
+
+def encode_records_cursor(record: AttendanceRecord) -> str:
+    return f"{record.attendance_date.isoformat()}_{record.id}"
+
+
+def decode_records_cursor(cursor: str) -> tuple:
+    """(attendance_date, id) of the last record on the previous page (raises 400)."""
+    try:
+        day, _, record_id = cursor.partition("_")
+        return date.fromisoformat(day), int(record_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/records", response_model=AttendanceRecordPage)
+async def get_all_records(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=MAX_RECORDS_PAGE_SIZE),
+    conditions: list = Depends(attendance_record_filters),
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_read_session)
+):
+    """Page through attendance records (admin/HR only) with enhanced filtering.
     
-    query = query.order_by(AttendanceRecord.attendance_date.desc())
+    Records are ordered by date then id, newest first. Pages are keyset
+    based, so fetching page N costs the same as fetching the first.
+    """
+    if current_user.role not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Access denied")
     
-    result = await session.execute(query)
+    query = _records_query(conditions)
+    if cursor:
+        query = query.where(
+            tuple_(AttendanceRecord.attendance_date, AttendanceRecord.id)
+            < tuple_(*decode_records_cursor(cursor))
+        )
+    
+    # One extra row tells us whether another page exists
+    result = await session.execute(query.limit(limit + 1))
     rows = result.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
     
-    return [build_response(r[0], r[1]) for r in rows]
+    return AttendanceRecordPage(
+        records=[build_response(r[0], r[1]) for r in rows],
+        next_cursor=encode_records_cursor(rows[-1][0]) if has_more else None
+    )
+
+
+@router.get("/records/export")
+async def export_records(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    conditions: list = Depends(attendance_record_filters),
+    current_user: Employee = Depends(get_current_employee),
+):
+    """Stream every matching attendance record as NDJSON or CSV (admin/HR only).
+    
+    Takes the same filters as /records, without paging.
+    """
+    if current_user.role not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    filename = f"attendance_records_{get_utc_now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    return StreamingResponse(
+        stream_attendance_records(
+            _records_query(conditions), export_format, build_response, RECORDS_EXPORT_BATCH_SIZE
+        ),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+async def _run_recompute(job: OvertimeRecomputeJob) -> None:
+    """Run a recompute on its own session once the response has been sent."""
+    async with async_session_maker() as session:
+        await run_overtime_recompute(session, job)
+
+
+@router.post("/recompute", response_model=OvertimeRecomputeJobResponse, status_code=202)
+async def start_overtime_recompute(
+    request: OvertimeRecomputeRequest,
+    background_tasks: BackgroundTasks,
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session),
+):
+    """Recompute hours, overtime and overtime pay for a date range (HR/Admin only).
+    
+    Use after changing work-hour or overtime policy. Defaults to a dry run
+    that only reports the differences. Poll GET /attendance/recompute/{job_id}
+    for progress and the diff.
+    """
+    if current_user.role not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Only HR/Admin can recompute overtime")
+    if request.end_date < request.start_date:
+        raise HTTPException(status_code=400, detail="end_date must be on or after start_date")
+    if (request.ramadan_start is None) != (request.ramadan_end is None):
+        raise HTTPException(status_code=400, detail="ramadan_start and ramadan_end must be given together")
+    
+    job = await get_overtime_recompute_jobs().create(session, **request.model_dump())
+    background_tasks.add_task(_run_recompute, job)
+    
+    return OvertimeRecomputeJobResponse(**job.as_dict())
+
+
+@router.get("/recompute/{job_id}", response_model=OvertimeRecomputeJobResponse)
+async def get_overtime_recompute(
+    job_id: str,
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session),
+):
+    """Get progress and diff of an overtime recompute job (HR/Admin only)."""
+    if current_user.role not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Only HR/Admin can view overtime recomputes")
+    
+    job = await get_overtime_recompute_jobs().get(session, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return OvertimeRecomputeJobResponse(**job.as_dict())
 
 
 @router.get("/dashboard", response_model=AttendanceDashboard)
 async def get_dashboard(
     current_user: Employee = Depends(get_current_employee),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get attendance dashboard (admin/HR only) with location breakdown and compliance alerts."""
     # Check if attendance feature is enabled
@@ -1011,84 +1359,7 @@ async def get_dashboard(
     if current_user.role not in ["admin", "hr"]:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    today = get_uae_today()
-    
-    # Total active employees
-    total_emp = await session.execute(
-        select(func.count(Employee.id)).where(Employee.is_active == True)
-    )
-    total_employees = total_emp.scalar() or 0
-    
-    # Today's records
-    today_records = await session.execute(
-        select(AttendanceRecord).where(AttendanceRecord.attendance_date == today)
-    )
-    records = today_records.scalars().all()
-    
-    clocked_in = sum(1 for r in records if r.clock_in)
-    wfh = sum(1 for r in records if r.work_location == "Work From Home")
-    late = sum(1 for r in records if r.is_late)
-    on_leave = sum(1 for r in records if r.status == "on-leave")
-    
-    # Location breakdown (using new WORK_LOCATIONS values)
-    at_head_office = sum(1 for r in records if r.work_location == "Head Office")
-    at_kezad = sum(1 for r in records if r.work_location == "KEZAD")
-    at_safario = sum(1 for r in records if r.work_location == "Safario")
-    at_sites = sum(1 for r in records if r.work_location == "Sites")
-    at_meeting = sum(1 for r in records if r.work_location == "Meeting")
-    at_event = sum(1 for r in records if r.work_location == "Event")
-    at_wfh = sum(1 for r in records if r.work_location == "Work From Home")
-    
-    # UAE compliance alerts
-    exceeding_daily_limits = sum(1 for r in records if r.exceeds_daily_limit)
-    exceeding_overtime_limits = sum(1 for r in records if r.exceeds_overtime_limit)
-    
-    # Pending approvals
-    pending_wfh = await session.execute(
-        select(func.count(AttendanceRecord.id)).where(
-            and_(
-                AttendanceRecord.work_type == "wfh",
-                AttendanceRecord.wfh_approved == None
-            )
-        )
-    )
-    pending_overtime = await session.execute(
-        select(func.count(AttendanceRecord.id)).where(
-            and_(
-                AttendanceRecord.overtime_hours > 0,
-                AttendanceRecord.overtime_approved == None
-            )
-        )
-    )
-    pending_corrections = await session.execute(
-        select(func.count(AttendanceRecord.id)).where(
-            and_(
-                AttendanceRecord.is_manual_entry == True,
-                AttendanceRecord.correction_approved == None
-            )
-        )
-    )
-    
-    return AttendanceDashboard(
-        total_employees=total_employees,
-        clocked_in_today=clocked_in,
-        wfh_today=wfh,
-        absent_today=total_employees - clocked_in - on_leave,
-        late_today=late,
-        pending_wfh_approvals=pending_wfh.scalar() or 0,
-        pending_overtime_approvals=pending_overtime.scalar() or 0,
-        pending_corrections=pending_corrections.scalar() or 0,
-        on_leave_today=on_leave,
-        at_head_office=at_head_office,
-        at_kezad=at_kezad,
-        at_safario=at_safario,
-        at_sites=at_sites,
-        at_meeting=at_meeting,
-        at_event=at_event,
-        at_wfh=at_wfh,
-        exceeding_daily_limits=exceeding_daily_limits,
-        exceeding_overtime_limits=exceeding_overtime_limits
-    )
+    return await get_dashboard_cache().get(session)
 
 
 @router.post("/{record_id}/approve-wfh", response_model=AttendanceResponse)
@@ -1175,6 +1446,7 @@ async def approve_overtime(
     if not record.overtime_hours or record.overtime_hours <= 0:
         raise HTTPException(status_code=400, detail="No overtime to approve")
     
+    rollup_before = rollup_snapshot(record)
     record.overtime_approved = request.approved
     record.overtime_approved_by = current_user.id
     record.overtime_approved_at = get_utc_now()
@@ -1186,15 +1458,184 @@ async def approve_overtime(
         if emp_overtime_type and emp_overtime_type.upper() == "OFFSET":
             record.offset_hours_earned = request.hours
     
+    # Credit (or claw back) offset hours in the ledger
+    if emp_overtime_type and emp_overtime_type.upper() == "OFFSET":
+        credit = (record.offset_hours_earned or Decimal("0")) if request.approved else Decimal("0")
+        await sync_record_credit(
+            session, record.employee_id, record.id, record.attendance_date, credit,
+            created_by=current_user.id
+        )
+    
     if request.notes:
         record.notes = (record.notes or "") + f"\nOvertime {'Approved' if request.approved else 'Rejected'}: {request.notes}"
     
+    await apply_rollup_change(session, record, rollup_before)
     await session.commit()
     await session.refresh(record)
     
     return build_response(record, emp_name)
 
 
+def _decision_note(label: str, approved: bool, notes: Optional[str]):
+    """SQL expression appending the decision note to a record's notes."""
+    note = f"\n{label} {'Approved' if approved else 'Rejected'}: {notes}"
+    return func.coalesce(AttendanceRecord.notes, "") + note
+
+
+async def _bulk_decide_records(
+    session: AsyncSession,
+    record_ids: List[int],
+    current_user: Employee,
+    pending,
+    values: dict,
+) -> Tuple[List[int], Dict[int, str], Set[int]]:
+    """Apply ``values`` to every pending record the caller may decide. Does not commit.
+
+    Returns the requested ids without repeats, the outcome of each skipped
+    id, and the ids the UPDATE changed.
+    """
+    ids = unique_ids(record_ids)
+    result = await session.execute(
+        select(AttendanceRecord.id, Employee.line_manager_id, pending.label("pending"))
+        .join(Employee, AttendanceRecord.employee_id == Employee.id)
+        .where(AttendanceRecord.id.in_(ids))
+    )
+    eligible, skipped = triage(ids, {
+        row.id: (may_decide(current_user.role, current_user.id, row.line_manager_id), bool(row.pending))
+        for row in result.all()
+    })
+
+    decided: Set[int] = set()
+    if eligible:
+        result = await session.execute(
+            update(AttendanceRecord)
+            .where(AttendanceRecord.id.in_(eligible), pending)
+            .values(**values)
+            .returning(AttendanceRecord.id)
+            .execution_options(synchronize_session=False)
+        )
+        decided = set(result.scalars().all())
+    return ids, skipped, decided
+
+
+@router.post("/approve-correction/bulk", response_model=BulkApprovalResponse)
+async def bulk_approve_corrections(
+    request: BulkApprovalRequest,
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session)
+):
+    """Approve or reject many pending corrections with one decision (admin/HR/manager).
+
+    Managers can only decide for their direct reports. Each id gets an
+    outcome; ids that are missing, not allowed or already decided are skipped.
+    """
+    if current_user.role not in ["admin", "hr", "manager"]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    values = {
+        "correction_approved": request.approved,
+        "correction_approved_by": current_user.id,
+        "correction_approved_at": get_utc_now(),
+    }
+    if request.notes:
+        values["notes"] = _decision_note("Correction", request.approved, request.notes)
+    pending = and_(AttendanceRecord.is_manual_entry == True, AttendanceRecord.correction_approved.is_(None))
+
+    ids, skipped, decided = await _bulk_decide_records(session, request.record_ids, current_user, pending, values)
+    await session.commit()
+
+    return approval_results(ids, skipped, decided, request.approved)
+
+
+@router.post("/approve-wfh/bulk", response_model=BulkApprovalResponse)
+async def bulk_approve_wfh(
+    request: BulkApprovalRequest,
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session)
+):
+    """Approve or reject many pending WFH records with one decision (admin/HR/manager).
+
+    Managers can only decide for their direct reports. Each id gets an
+    outcome; ids that are missing, not allowed or already decided are skipped.
+    """
+    if not await check_feature_enabled(session, "feature_attendance"):
+        raise HTTPException(status_code=403, detail="Attendance feature is disabled")
+    if not await check_feature_enabled(session, "feature_attendance_wfh"):
+        raise HTTPException(status_code=403, detail="WFH feature is disabled")
+
+    if current_user.role not in ["admin", "hr", "manager"]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    values = {
+        "wfh_approved": request.approved,
+        "wfh_approved_by": current_user.id,
+        "wfh_approved_at": get_utc_now(),
+    }
+    if request.notes:
+        values["notes"] = _decision_note("WFH", request.approved, request.notes)
+    pending = and_(AttendanceRecord.work_type == "wfh", AttendanceRecord.wfh_approved.is_(None))
+
+    ids, skipped, decided = await _bulk_decide_records(session, request.record_ids, current_user, pending, values)
+    await session.commit()
+
+    return approval_results(ids, skipped, decided, request.approved)
+
+
+@router.post("/approve-overtime/bulk", response_model=BulkApprovalResponse)
+async def bulk_approve_overtime(
+    request: BulkApprovalRequest,
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session)
+):
+    """Approve or reject many pending overtime records with one decision (admin/HR only).
+
+    Recorded hours are approved as they are; use the single-record endpoint
+    to approve different hours. Offset hours of approved records are credited
+    to the ledger. Each id gets an outcome; ids that are missing or already
+    decided are skipped.
+    """
+    if not await check_feature_enabled(session, "feature_attendance"):
+        raise HTTPException(status_code=403, detail="Attendance feature is disabled")
+    if not await check_feature_enabled(session, "feature_attendance_overtime"):
+        raise HTTPException(status_code=403, detail="Overtime feature is disabled")
+
+    if current_user.role not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    values = {
+        "overtime_approved": request.approved,
+        "overtime_approved_by": current_user.id,
+        "overtime_approved_at": get_utc_now(),
+    }
+    if request.notes:
+        values["notes"] = _decision_note("Overtime", request.approved, request.notes)
+    pending = and_(AttendanceRecord.overtime_hours > 0, AttendanceRecord.overtime_approved.is_(None))
+
+    ids, skipped, decided = await _bulk_decide_records(session, request.record_ids, current_user, pending, values)
+
+    if decided:
+        result = await session.execute(
+            select(
+                AttendanceRecord.employee_id, AttendanceRecord.id,
+                AttendanceRecord.attendance_date, AttendanceRecord.offset_hours_earned
+            )
+            .join(Employee, AttendanceRecord.employee_id == Employee.id)
+            .where(AttendanceRecord.id.in_(decided), func.upper(Employee.overtime_type) == "OFFSET")
+            .order_by(AttendanceRecord.id)
+        )
+        await sync_record_credits(
+            session,
+            [
+                (employee_id, record_id, day, (hours or Decimal("0")) if request.approved else Decimal("0"))
+                for employee_id, record_id, day, hours in result.all()
+            ],
+            created_by=current_user.id,
+        )
+    await session.commit()
+
+    return approval_results(ids, skipped, decided, request.approved)
+
+
 @router.post("/{record_id}/exceptional-overtime", response_model=AttendanceResponse)
 async def set_exceptional_overtime(
     record_id: int,
@@ -1232,6 +1673,8 @@ async def set_exceptional_overtime(
     if not record.overtime_hours or record.overtime_hours <= 0:
         raise HTTPException(status_code=400, detail="No overtime hours to mark as exceptional")
     
+    rollup_before = rollup_snapshot(record)
+    
     # Mark as exceptional overtime
     record.exceptional_overtime = request.exceptional_overtime
     record.exceptional_overtime_reason = request.reason
@@ -1239,20 +1682,17 @@ async def set_exceptional_overtime(
     record.is_night_overtime = request.is_night_overtime
     record.is_holiday_overtime = request.is_holiday_overtime
     
-    # Calculate overtime rate based on type
-    if request.is_night_overtime or request.is_holiday_overtime:
-        record.overtime_rate = OVERTIME_RATE_HOLIDAY  # 1.50 (150%)
-    else:
-        record.overtime_rate = OVERTIME_RATE_REGULAR  # 1.25 (125%)
-    
-    # Calculate overtime amount if basic salary is available
-    if basic_salary and record.overtime_hours:
-        # Hourly rate = (Basic Salary / 30 days) / 8 hours
-        hourly_rate = (basic_salary / Decimal("30")) / Decimal("8")
-        record.overtime_amount = record.overtime_hours * hourly_rate * record.overtime_rate
+    # 150% for night or holiday overtime, 125% otherwise, on (basic salary / 30) / 8
+    rate, amount = exceptional_overtime_pay(
+        record.overtime_hours, basic_salary, request.is_night_overtime, request.is_holiday_overtime
+    )
+    record.overtime_rate = rate
+    if amount is not None:
+        record.overtime_amount = amount
     
     record.notes = (record.notes or "") + f"\n[Exceptional Overtime: {request.reason}]"
     
+    await apply_rollup_change(session, record, rollup_before)
     await session.commit()
     await session.refresh(record)
     
@@ -1268,73 +1708,111 @@ async def get_offset_balance(
     """Get the offset hours balance for an employee.
     
     For employees with overtime_type = "Offset", this returns:
-    - Total offset hours earned from overtime
-    - Total offset hours used as time-off
-    - Available balance (earned - used)
+    - Total offset hours earned from approved overtime
+    - Total offset hours used as time-off, and expired
+    - Available balance (earned - used - expired)
     - Balance converted to days (balance / 8 hours)
+    
+    Entry-level history is served by GET /attendance/offset-history/{employee_id}.
     """
     # Check if admin/HR or the employee themselves
     if current_user.role not in ["admin", "hr"] and current_user.id != employee_id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    # Get employee
     emp_result = await session.execute(
-        select(Employee).where(Employee.id == employee_id)
+        select(Employee.name).where(Employee.id == employee_id)
     )
-    employee = emp_result.scalar_one_or_none()
+    employee_name = emp_result.scalar_one_or_none()
     
-    if not employee:
+    if employee_name is None:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    # Get all attendance records with offset hours
-    records_result = await session.execute(
-        select(AttendanceRecord).where(
-            and_(
-                AttendanceRecord.employee_id == employee_id,
-                AttendanceRecord.offset_hours_earned > 0
-            )
-        ).order_by(AttendanceRecord.attendance_date.desc())
-    )
-    records = records_result.scalars().all()
+    return await build_offset_summary(session, employee_id, employee_name)
+
+
+async def build_offset_summary(
+    session: AsyncSession, employee_id: int, employee_name: str
+) -> OffsetBalanceSummary:
+    """Offset totals from the employee's latest ledger row.
     
-    total_earned = Decimal("0")
-    total_used = Decimal("0")
-    offset_records = []
+    A negative ledger balance (hours clawed back after they were used) is
+    reported as a deficit, with nothing available.
+    """
+    latest = await get_latest_entry(session, employee_id)
+    if not latest:
+        return OffsetBalanceSummary(employee_id=employee_id, employee_name=employee_name)
     
-    for record in records:
-        earned = record.offset_hours_earned or Decimal("0")
-        total_earned += earned
-        
-        # Check if offset was used (referenced in offset_day_reference)
-        used = Decimal("0")
-        status = "available"
-        if record.offset_day_reference and "Used" in record.offset_day_reference:
-            used = earned
-            total_used += used
-            status = "used"
-        
-        offset_records.append(OffsetDayRecord(
-            attendance_date=record.attendance_date,
-            hours_earned=earned,
-            hours_used=used,
-            reference=record.offset_day_reference,
-            status=status
-        ))
+    available = max(latest.balance_after, Decimal("0"))
+    return OffsetBalanceSummary(
+        employee_id=employee_id,
+        employee_name=employee_name,
+        total_offset_hours_earned=latest.earned_to_date,
+        total_offset_hours_used=latest.used_to_date,
+        total_offset_hours_expired=latest.expired_to_date,
+        offset_hours_balance=available,
+        offset_days_balance=(available / HOURS_PER_OFFSET_DAY).quantize(Decimal("0.01")),
+        offset_hours_deficit=max(-latest.balance_after, Decimal("0"))
+    )
+
+
+@router.get("/offset-history/{employee_id}", response_model=OffsetLedgerPage)
+async def get_offset_history(
+    employee_id: int,
+    before_id: Optional[int] = Query(None, description="Return entries older than this entry id"),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session)
+):
+    """Page through an employee's offset ledger, newest first."""
+    if current_user.role not in ["admin", "hr"] and current_user.id != employee_id:
+        raise HTTPException(status_code=403, detail="Access denied")
     
-    balance = total_earned - total_used
-    days_balance = balance / Decimal("8")  # Convert to days
+    entries = await list_entries(session, employee_id, limit, before_id)
     
-    return OffsetBalanceSummary(
+    return OffsetLedgerPage(
         employee_id=employee_id,
-        employee_name=employee.name,
-        total_offset_hours_earned=total_earned,
-        total_offset_hours_used=total_used,
-        offset_hours_balance=balance,
-        offset_days_balance=days_balance.quantize(Decimal("0.01")),
-        records=offset_records
+        entries=[OffsetLedgerEntryResponse.model_validate(entry) for entry in entries],
+        next_before_id=entries[-1].id if len(entries) == limit else None
     )
 
 
+@router.post("/offset-balance/{employee_id}/deduct", response_model=OffsetBalanceSummary)
+async def deduct_offset_hours(
+    employee_id: int,
+    request: OffsetUsageRequest,
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session)
+):
+    """Record offset hours taken as time off or expired (admin/HR only)."""
+    if current_user.role not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    emp_result = await session.execute(
+        select(Employee.name).where(Employee.id == employee_id)
+    )
+    employee_name = emp_result.scalar_one_or_none()
+    
+    if employee_name is None:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    
+    try:
+        await append_entry(
+            session,
+            employee_id,
+            request.entry_type,
+            -request.hours,
+            request.entry_date,
+            reference=request.reference,
+            created_by=current_user.id
+        )
+    except ValueError as e:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    await session.commit()
+    
+    return await build_offset_summary(session, employee_id, employee_name)
+
+
 @router.get("/paid-overtime-summary/{employee_id}", response_model=PaidOvertimeSummary)
 async def get_paid_overtime_summary(
     employee_id: int,
@@ -1469,102 +1947,16 @@ async def get_manager_daily_summary(
     
     # Get manager details
     manager_result = await session.execute(
-        select(Employee).where(Employee.id == manager_id)
+        select(Employee.name).where(Employee.id == manager_id)
     )
-    manager = manager_result.scalar_one_or_none()
+    manager_name = manager_result.scalar_one_or_none()
     
-    if not manager:
+    if manager_name is None:
         raise HTTPException(status_code=404, detail="Manager not found")
     
     # Default to today
     today = summary_date or get_uae_today()
     
-    # Get all employees who report to this manager
-    team_result = await session.execute(
-        select(Employee).where(
-            and_(
-                Employee.line_manager_id == manager_id,
-                Employee.is_active == True
-            )
-        )
-    )
-    team_members = team_result.scalars().all()
-    
-    if not team_members:
-        return ManagerDailySummary(
-            manager_id=manager_id,
-            manager_name=manager.name,
-            summary_date=today,
-            team_size=0,
-            present_count=0,
-            on_leave_count=0,
-            not_checked_in_count=0,
-            wfh_count=0,
-            employees=[]
-        )
-    
-    summary_rows = []
-    present_count = 0
-    on_leave_count = 0
-    not_checked_in_count = 0
-    wfh_count = 0
-    
-    for employee in team_members:
-        # Get today's attendance record for this employee
-        record_result = await session.execute(
-            select(AttendanceRecord).where(
-                and_(
-                    AttendanceRecord.employee_id == employee.id,
-                    AttendanceRecord.attendance_date == today
-                )
-            )
-        )
-        record = record_result.scalar_one_or_none()
-        
-        if not record or not record.clock_in:
-            # Check if on leave (would need Leave model integration)
-            status = "Not Checked In"
-            work_location = None
-            last_update = None
-            remarks = None
-            not_checked_in_count += 1
-        elif record.status == "on-leave":
-            status = "On Leave"
-            work_location = None
-            last_update = None
-            remarks = record.notes or "Leave"
-            on_leave_count += 1
-        else:
-            status = "Present"
-            work_location = record.work_location
-            last_update = record.clock_in.strftime("%H:%M") if record.clock_in else None
-            remarks = record.location_remarks
-            present_count += 1
-            
-            # WFH with approval status
-            if work_location == "Work From Home":
-                wfh_count += 1
-                if record.wfh_approval_confirmed:
-                    remarks = "Approved" if not remarks else f"Approved - {remarks}"
-                else:
-                    remarks = "Not Approved" if not remarks else f"Not Approved - {remarks}"
-        
-        summary_rows.append(ManagerDailySummaryRow(
-            employee_name=employee.name,
-            status=status,
-            work_location=work_location,
-            last_update=last_update,
-            remarks=remarks or "—"
-        ))
-    
-    return ManagerDailySummary(
-        manager_id=manager_id,
-        manager_name=manager.name,
-        summary_date=today,
-        team_size=len(team_members),
-        present_count=present_count,
-        on_leave_count=on_leave_count,
-        not_checked_in_count=not_checked_in_count,
-        wfh_count=wfh_count,
-        employees=summary_rows
-    )
+    # Team members joined to the day's attendance and approved leave in one query
+    rows_by_manager = await load_team_rows(session, today, manager_ids=[manager_id])
+    return summarise_team(manager_id, manager_name, today, rows_by_manager.get(manager_id, []))
@@ -1,24 +1,32 @@
 """Geofence management router."""
 from typing import List
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, status
 import jwt
 from jwt.exceptions import PyJWTError
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
-from app.database import get_session
+from app.database import async_session_maker, get_session
 from app.models.employee import Employee
-from app.models.geofence import Geofence, DEFAULT_GEOFENCES, is_within_geofence
+from app.models.geofence import Geofence, DEFAULT_GEOFENCES
 from app.schemas.geofence import (
     GeofenceCreate, GeofenceUpdate, GeofenceResponse,
-    GeofenceValidationRequest, GeofenceValidationResponse, NearbyGeofence
+    GeofenceValidationRequest, GeofenceValidationResponse, NearbyGeofence,
+    GeofenceAuditRequest, GeofenceAuditJobResponse
 )
 from app.services.attendance_service import AttendanceService
+from app.services.geofence_audit import (
+    GeofenceAuditJob, get_geofence_audit_jobs, run_geofence_audit
+)
+from app.services.geofence_index import get_geofence_cache, get_geofence_index
 
 router = APIRouter(prefix="/geofences", tags=["Geofences"])
 
+# Widest search /geofences/nearby accepts, in meters
+MAX_NEARBY_DISTANCE = 100_000
+
 
 async def get_current_employee(
     authorization: str = Header(...),
@@ -80,6 +88,29 @@ async def list_geofences(
     ]
 
 
+@router.get("/nearby", response_model=List[NearbyGeofence])
+async def get_nearby_geofences(
+    latitude: float = Query(..., ge=-90, le=90, description="Current latitude"),
+    longitude: float = Query(..., ge=-180, le=180, description="Current longitude"),
+    max_distance: int = Query(5000, ge=0, le=MAX_NEARBY_DISTANCE, description="Maximum distance in meters"),
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session)
+):
+    """Get geofences near a location, sorted by distance."""
+    index = await get_geofence_index(session)
+    return [
+        NearbyGeofence(
+            name=gf.name,
+            distance_meters=distance,
+            within_radius=distance <= gf.radius_meters,
+            latitude=gf.latitude,
+            longitude=gf.longitude,
+            radius_meters=gf.radius_meters
+        )
+        for gf, distance in index.within(latitude, longitude, max_distance)
+    ]
+
+
 @router.get("/{geofence_id}", response_model=GeofenceResponse)
 async def get_geofence(
     geofence_id: int,
@@ -138,6 +169,7 @@ async def create_geofence(
     
     session.add(new_geofence)
     await session.commit()
+    get_geofence_cache().invalidate()
     await session.refresh(new_geofence)
     
     return GeofenceResponse(
@@ -190,6 +222,7 @@ async def update_geofence(
         geofence.is_active = update.is_active
     
     await session.commit()
+    get_geofence_cache().invalidate()
     await session.refresh(geofence)
     
     return GeofenceResponse(
@@ -234,42 +267,52 @@ async def validate_location(
     )
 
 
-@router.get("/nearby", response_model=List[NearbyGeofence])
-async def get_nearby_geofences(
-    latitude: float = Query(..., description="Current latitude"),
-    longitude: float = Query(..., description="Current longitude"),
-    max_distance: int = Query(5000, description="Maximum distance in meters"),
+async def _run_audit(job: GeofenceAuditJob) -> None:
+    """Run an audit on its own session once the response has been sent."""
+    async with async_session_maker() as session:
+        await run_geofence_audit(session, job)
+
+
+@router.post("/audit", response_model=GeofenceAuditJobResponse, status_code=202)
+async def start_geofence_audit(
+    request: GeofenceAuditRequest,
+    background_tasks: BackgroundTasks,
     current_user: Employee = Depends(get_current_employee),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_session),
 ):
-    """Get geofences near a location, sorted by distance."""
-    result = await session.execute(
-        select(Geofence).where(Geofence.is_active == True)
+    """Flag historical clock-ins outside their geofence (HR/Admin only).
+    
+    Poll GET /geofences/audit/{job_id} for progress. Flagged records can be
+    listed with GET /attendance/records?geofence_flagged=true.
+    """
+    if current_user.role not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Only HR/Admin can run geofence audits")
+    if request.end_date < request.start_date:
+        raise HTTPException(status_code=400, detail="end_date must be on or after start_date")
+    
+    job = await get_geofence_audit_jobs().create(
+        session, start_date=request.start_date, end_date=request.end_date, work_location=request.work_location
     )
-    geofences = result.scalars().all()
+    background_tasks.add_task(_run_audit, job)
     
-    nearby = []
-    for gf in geofences:
-        is_within, distance = is_within_geofence(
-            latitude, longitude,
-            float(gf.latitude), float(gf.longitude),
-            gf.radius_meters
-        )
-        
-        if distance <= max_distance:
-            nearby.append({
-                "name": gf.name,
-                "distance_meters": distance,
-                "within_radius": is_within,
-                "latitude": gf.latitude,
-                "longitude": gf.longitude,
-                "radius_meters": gf.radius_meters
-            })
+    return GeofenceAuditJobResponse(**job.as_dict())
+
+
+@router.get("/audit/{job_id}", response_model=GeofenceAuditJobResponse)
+async def get_geofence_audit(
+    job_id: str,
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session),
+):
+    """Get progress of a geofence audit job (HR/Admin only)."""
+    if current_user.role not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Only HR/Admin can view geofence audits")
     
-    # Sort by distance
-    nearby.sort(key=lambda x: x["distance_meters"])
+    job = await get_geofence_audit_jobs().get(session, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
     
-    return [NearbyGeofence(**g) for g in nearby]
+    return GeofenceAuditJobResponse(**job.as_dict())
 
 
 @router.post("/init")
@@ -307,6 +350,7 @@ async def initialize_default_geofences(
         created.append(gf_data["name"])
     
     await session.commit()
+    get_geofence_cache().invalidate()
     
     return {
         "status": "success",
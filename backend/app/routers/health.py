@@ -26,6 +26,50 @@ async def healthcheck():
     return {"status": "ok"}
 
 
+@router.get("/hashing", summary="Password hashing executor metrics")
+async def hashing_metrics():
+    """
+    Queue depth and latency of the password hashing pool.
+    A growing queue_depth or avg_wait_ms means login bursts are saturating
+    the workers and PASSWORD_HASH_WORKERS should be raised.
+    """
+    from app.core.hashing import get_hashing_executor
+
+    return get_hashing_executor().stats()
+
+
+@router.get("/clock-ingest", summary="Clock-in/out group-commit queue metrics")
+async def clock_ingest_metrics():
+    """
+    Batch size distribution, queue wait and flush latency of the clock
+    event queue. Counters stay at zero unless CLOCK_INGEST_BATCHING is on.
+    """
+    from app.services.clock_ingest import get_clock_ingest_queue
+
+    return get_clock_ingest_queue().stats()
+
+
+@router.get("/diagnostics", summary="Connection pool and cache diagnostics")
+async def diagnostics():
+    """
+    Per-engine connection pool gauges (checked out, overflow, checkout wait
+    histogram and timeouts) plus in-process cache and executor stats.
+    """
+    from app.auth.principal import get_principal_cache
+    from app.core.db_metrics import all_pool_stats
+    from app.core.hashing import get_hashing_executor
+    from app.services.clock_ingest import get_clock_ingest_queue
+    from app.services.feature_flags import get_feature_flags
+
+    return {
+        "db_pools": all_pool_stats(),
+        "password_hashing": get_hashing_executor().stats(),
+        "clock_ingest": get_clock_ingest_queue().stats(),
+        "principal_cache": get_principal_cache().stats(),
+        "feature_flags_version": get_feature_flags().version,
+    }
+
+
 @router.post("/reset-admin-password", summary="Reset admin password to default (emergency use)")
 async def reset_admin_password(
     secret_token: str = Header(..., alias="X-Admin-Secret"),
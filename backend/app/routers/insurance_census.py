@@ -10,7 +10,7 @@ import io
 import msoffcrypto
 import pandas as pd
 
-from app.database import get_session
+from app.database import get_read_session, get_session
 from app.models import InsuranceCensusRecord, InsuranceCensusImportBatch, Employee, MANDATORY_FIELDS, MANDATORY_FIELDS_FOR_RENEWAL
 from app.auth.dependencies import require_role
 
@@ -254,7 +254,7 @@ async def get_census_stats(db: AsyncSession = Depends(get_session)):
 
 @router.get("/export/excel")
 async def export_census_to_excel(
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_read_session),
     entity: Optional[str] = Query(None),
     insurance_type: Optional[str] = Query(None),
 ):
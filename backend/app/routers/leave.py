@@ -14,11 +14,18 @@ from app.models.employee import Employee
 from app.models.leave import LeaveRequest, LeaveBalance, LEAVE_TYPES
 from app.schemas.leave import (
     LeaveBalanceResponse, LeaveBalanceSummary, LeaveRequestCreate,
-    LeaveRequestResponse, LeaveApprovalRequest, LeaveCalendarEntry
+    LeaveRequestResponse, LeaveApprovalRequest, LeaveCalendarEntry, LeaveCalendarDay,
+    LeaveAvailabilityMatrix
 )
+from app.services.business_calendar import count_leave_days, get_business_calendar
+from app.services.leave_availability import GROUP_BY_OPTIONS, build_availability_matrix
+from app.services.leave_index import load_leave_index
 
 router = APIRouter(prefix="/leave", tags=["Leave Management"])
 
+# Longest range the day-by-day calendar views will expand
+MAX_CALENDAR_DAYS = 366
+
 
 async def get_current_employee(
     authorization: str = Header(...),
@@ -132,8 +139,6 @@ async def create_leave_request(
     session: AsyncSession = Depends(get_session)
 ):
     """Create a new leave request."""
-    from decimal import Decimal
-    
     if request.leave_type not in LEAVE_TYPES:
         raise HTTPException(status_code=400, detail=f"Invalid leave type. Must be one of: {LEAVE_TYPES}")
     
@@ -154,12 +159,14 @@ async def create_leave_request(
     if existing.scalar_one_or_none():
         raise HTTPException(status_code=400, detail="Overlapping leave request already exists")
     
-    # Calculate days
-    if request.is_half_day:
-        total_days = Decimal("0.5")
-    else:
-        delta = (request.end_date - request.start_date).days + 1
-        total_days = Decimal(str(delta))
+    # Calculate days (working days for the employee's schedule, net of public holidays)
+    calendar = await get_business_calendar(session)
+    total_days = count_leave_days(
+        calendar, request.leave_type, request.start_date, request.end_date,
+        request.is_half_day, current_user.work_schedule
+    )
+    if total_days <= 0:
+        raise HTTPException(status_code=400, detail="Leave period contains no working days")
     
     leave_request = LeaveRequest(
         employee_id=current_user.id,
@@ -323,28 +330,67 @@ async def get_leave_calendar(
     session: AsyncSession = Depends(get_session)
 ):
     """Get leave calendar for a date range (approved leaves only)."""
-    result = await session.execute(
-        select(LeaveRequest, Employee).join(
-            Employee, LeaveRequest.employee_id == Employee.id
-        ).where(
-            and_(
-                LeaveRequest.status == "approved",
-                LeaveRequest.start_date <= end_date,
-                LeaveRequest.end_date >= start_date
-            )
-        ).order_by(LeaveRequest.start_date)
-    )
-    leaves = result.all()
-    
+    leave_index = await load_leave_index(session, start_date, end_date)
     return [
         LeaveCalendarEntry(
             employee_id=leave.employee_id,
-            employee_name=emp.name,
+            employee_name=leave.employee_name,
             leave_type=leave.leave_type,
             start_date=leave.start_date,
             end_date=leave.end_date,
-            status=leave.status,
+            status="approved",
             is_half_day=leave.is_half_day
         )
-        for leave, emp in leaves
+        for leave in leave_index.intervals
+    ]
+
+
+@router.get("/calendar/daily", response_model=List[LeaveCalendarDay])
+async def get_leave_calendar_daily(
+    start_date: date = Query(..., description="Calendar start date"),
+    end_date: date = Query(..., description="Calendar end date"),
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session)
+):
+    """Get who is on approved leave for each day of a date range."""
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must be on or after start_date")
+    if (end_date - start_date).days >= MAX_CALENDAR_DAYS:
+        raise HTTPException(
+            status_code=400, detail=f"Date range cannot exceed {MAX_CALENDAR_DAYS} days"
+        )
+    leave_index = await load_leave_index(session, start_date, end_date)
+    return [
+        LeaveCalendarDay(
+            date=day,
+            on_leave_count=count,
+            employee_ids=sorted(leave_index.employees_on_leave(day))
+        )
+        for day, count in leave_index.daily_counts().items()
     ]
+
+
+@router.get("/availability", response_model=LeaveAvailabilityMatrix)
+async def get_team_availability(
+    start_date: date = Query(..., description="First day of the heatmap"),
+    end_date: date = Query(..., description="Last day of the heatmap"),
+    group_by: str = Query(default="department", description="department or manager"),
+    department: Optional[str] = Query(default=None, description="Only this department"),
+    manager_id: Optional[int] = Query(default=None, description="Only this manager's direct reports"),
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session)
+):
+    """Get per-day absence counts and percentages by department or manager."""
+    if group_by not in GROUP_BY_OPTIONS:
+        raise HTTPException(
+            status_code=400, detail=f"group_by must be one of: {', '.join(GROUP_BY_OPTIONS)}"
+        )
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must be on or after start_date")
+    if (end_date - start_date).days >= MAX_CALENDAR_DAYS:
+        raise HTTPException(
+            status_code=400, detail=f"Date range cannot exceed {MAX_CALENDAR_DAYS} days"
+        )
+    return await build_availability_matrix(
+        session, start_date, end_date, group_by, department, manager_id
+    )
@@ -15,6 +15,7 @@ from app.schemas.public_holiday import (
     PublicHolidayCreate, PublicHolidayUpdate, PublicHolidayResponse,
     HolidayCalendar, IsHolidayResponse
 )
+from app.services.business_calendar import get_business_calendar, get_calendar_cache
 
 router = APIRouter(prefix="/holidays", tags=["Public Holidays"])
 
@@ -98,16 +99,10 @@ async def check_if_holiday(
     session: AsyncSession = Depends(get_session)
 ):
     """Check if a specific date is a public holiday."""
-    result = await session.execute(
-        select(PublicHoliday).where(
-            and_(
-                PublicHoliday.is_active == True,
-                PublicHoliday.start_date <= check_date,
-                PublicHoliday.end_date >= check_date
-            )
-        )
-    )
-    holiday = result.scalar_one_or_none()
+    # The cached calendar answers the common "not a holiday" case without a query
+    calendar = await get_business_calendar(session)
+    holiday_id = calendar.holiday_id(check_date)
+    holiday = await session.get(PublicHoliday, holiday_id) if holiday_id else None
     
     if holiday:
         return IsHolidayResponse(
@@ -159,6 +154,7 @@ async def create_holiday(
     
     session.add(new_holiday)
     await session.commit()
+    get_calendar_cache().invalidate()
     await session.refresh(new_holiday)
     
     return PublicHolidayResponse(
@@ -214,6 +210,7 @@ async def update_holiday(
         holiday.is_active = update.is_active
     
     await session.commit()
+    get_calendar_cache().invalidate()
     await session.refresh(holiday)
     
     return PublicHolidayResponse(
@@ -271,6 +268,7 @@ async def initialize_default_holidays(
         created.append(h["name"])
     
     await session.commit()
+    get_calendar_cache().invalidate()
     
     return {
         "status": "success",
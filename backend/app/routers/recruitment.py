@@ -11,7 +11,7 @@ import os
 from pathlib import Path
 
 from app.auth.dependencies import require_role
-from app.database import get_session
+from app.database import get_read_session, get_session
 from app.routers.auth import get_current_employee_id
 from app.core.rate_limit import limiter
 from app.schemas.recruitment import (
@@ -1170,7 +1170,7 @@ async def bulk_reject_candidates(
 )
 async def get_recruitment_metrics(
     role: str = Depends(require_role(["admin", "hr"])),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
     Get detailed recruitment metrics for dashboard and analytics.
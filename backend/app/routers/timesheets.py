@@ -2,21 +2,30 @@
 from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 import jwt
 from jwt.exceptions import PyJWTError
-from sqlalchemy import and_, func, select
+from sqlalchemy import and_, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
-from app.database import get_session
+from app.database import async_session_maker, get_read_session, get_session
 from app.models.employee import Employee
 from app.models.timesheet import Timesheet, TIMESHEET_STATUSES
 from app.schemas.timesheet import (
     TimesheetSummary, TimesheetResponse, TimesheetSubmit,
-    TimesheetApproval, TimesheetList, MonthlyAttendanceAnalytics
+    TimesheetApproval, TimesheetList, TimesheetBulkJob, MonthlyAttendanceAnalytics, PayrollExportBatch,
+    TimesheetBulkApproval
 )
+from app.schemas.attendance import BulkApprovalResponse
 from app.services.attendance_service import AttendanceService
+from app.services.bulk_approval import approval_results, may_decide, triage, unique_ids
+from app.services.payroll_export import (
+    PAYROLL_MEDIA_TYPES, mark_month_exported, new_payroll_reference,
+    payroll_export_query, stream_payroll_rows
+)
+from app.services.timesheet_bulk import TimesheetJob, generate_timesheets_bulk, get_timesheet_jobs
 
 router = APIRouter(prefix="/timesheets", tags=["Timesheets"])
 
@@ -143,6 +152,55 @@ async def generate_timesheet(
     return build_timesheet_response(timesheet, employee.name)
 
 
+async def _run_bulk_generation(job: TimesheetJob) -> None:
+    """Run a bulk job on its own session once the response has been sent."""
+    async with async_session_maker() as session:
+        await generate_timesheets_bulk(session, job)
+
+
+@router.post("/generate-bulk", response_model=TimesheetBulkJob, status_code=202)
+async def generate_timesheets_for_month(
+    background_tasks: BackgroundTasks,
+    year: int = Query(..., description="Year"),
+    month: int = Query(..., ge=1, le=12, description="Month (1-12)"),
+    department: Optional[str] = Query(None, description="Only employees in this department"),
+    manager_id: Optional[int] = Query(None, description="Only direct reports of this manager"),
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session),
+):
+    """Generate draft timesheets for all active employees in one job (admin/HR only).
+    
+    Already submitted or approved timesheets are skipped. Poll
+    GET /timesheets/jobs/{job_id} for progress.
+    """
+    if current_user.role not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    job = await get_timesheet_jobs().create(
+        session, year=year, month=month, department=department, manager_id=manager_id
+    )
+    background_tasks.add_task(_run_bulk_generation, job)
+    
+    return TimesheetBulkJob(**job.as_dict())
+
+
+@router.get("/jobs/{job_id}", response_model=TimesheetBulkJob)
+async def get_timesheet_job(
+    job_id: str,
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session),
+):
+    """Get progress of a bulk timesheet generation job (admin/HR only)."""
+    if current_user.role not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    job = await get_timesheet_jobs().get(session, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return TimesheetBulkJob(**job.as_dict())
+
+
 @router.get("/{timesheet_id}", response_model=TimesheetResponse)
 async def get_timesheet(
     timesheet_id: int,
@@ -291,6 +349,93 @@ async def hr_approve_timesheet(
     return build_timesheet_response(timesheet)
 
 
+async def _bulk_decide_timesheets(
+    session: AsyncSession,
+    approval: TimesheetBulkApproval,
+    current_user: Employee,
+    pending_status: str,
+    approved_values: dict
+) -> BulkApprovalResponse:
+    """Move every timesheet in ``pending_status`` the caller may decide, in one UPDATE."""
+    ids = unique_ids(approval.timesheet_ids)
+    result = await session.execute(
+        select(Timesheet.id, Timesheet.status, Employee.line_manager_id)
+        .join(Employee, Timesheet.employee_id == Employee.id)
+        .where(Timesheet.id.in_(ids))
+    )
+    eligible, skipped = triage(ids, {
+        row.id: (may_decide(current_user.role, current_user.id, row.line_manager_id), row.status == pending_status)
+        for row in result.all()
+    })
+
+    decided = set()
+    if eligible:
+        if approval.approved:
+            values = approved_values
+        else:
+            values = {
+                "status": "rejected",
+                "rejected_by": current_user.id,
+                "rejected_at": datetime.now(timezone.utc),
+                "rejection_reason": approval.rejection_reason,
+            }
+        result = await session.execute(
+            update(Timesheet)
+            .where(Timesheet.id.in_(eligible), Timesheet.status == pending_status)
+            .values(**values)
+            .returning(Timesheet.id)
+            .execution_options(synchronize_session=False)
+        )
+        decided = set(result.scalars().all())
+        await session.commit()
+
+    return approval_results(ids, skipped, decided, approval.approved)
+
+
+@router.post("/manager-approve/bulk", response_model=BulkApprovalResponse)
+async def bulk_manager_approve_timesheets(
+    approval: TimesheetBulkApproval,
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session)
+):
+    """Manager approval of many submitted timesheets with one decision.
+
+    Managers can only decide for their direct reports. Each id gets an
+    outcome; ids that are missing, not allowed or not submitted are skipped.
+    """
+    if current_user.role not in ["admin", "hr", "manager"]:
+        raise HTTPException(status_code=403, detail="Only managers can approve timesheets")
+
+    return await _bulk_decide_timesheets(session, approval, current_user, "submitted", {
+        "status": "manager_approved",
+        "manager_approved_by": current_user.id,
+        "manager_approved_at": datetime.now(timezone.utc),
+        "manager_notes": approval.notes,
+    })
+
+
+@router.post("/hr-approve/bulk", response_model=BulkApprovalResponse)
+async def bulk_hr_approve_timesheets(
+    approval: TimesheetBulkApproval,
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session)
+):
+    """HR final approval of many manager-approved timesheets with one decision.
+
+    Each id gets an outcome; ids that are missing or not manager-approved
+    are skipped.
+    """
+    if current_user.role not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Only HR can give final approval")
+
+    return await _bulk_decide_timesheets(session, approval, current_user, "manager_approved", {
+        "status": "hr_approved",
+        "hr_approved_by": current_user.id,
+        "hr_approved_at": datetime.now(timezone.utc),
+        "hr_notes": approval.notes,
+    })
+
+
 @router.get("/list/{year}/{month}", response_model=TimesheetList)
 async def list_timesheets(
     year: int,
@@ -374,12 +519,88 @@ async def list_timesheets(
     )
 
 
+@router.post("/payroll-export/{year}/{month}", response_model=PayrollExportBatch)
+async def export_month_to_payroll(
+    year: int,
+    month: int,
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session)
+):
+    """Mark a month's HR-approved timesheets as exported under a new payroll reference (HR/Admin only).
+
+    Download the batch with GET /payroll-export/{year}/{month}?reference=...
+    """
+    if current_user.role not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Only HR can export to payroll")
+    if not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="Month must be between 1 and 12")
+
+    reference = new_payroll_reference(year, month)
+    now = datetime.now(timezone.utc)
+    exported = await mark_month_exported(session, year, month, reference, now)
+    if not exported:
+        raise HTTPException(status_code=404, detail="No HR-approved timesheets to export for this month")
+
+    return PayrollExportBatch(
+        payroll_reference=reference,
+        year=year,
+        month=month,
+        exported_count=exported,
+        exported_at=now
+    )
+
+
+@router.get("/payroll-export/{year}/{month}")
+async def download_payroll_export(
+    year: int,
+    month: int,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|xlsx)$"),
+    reference: Optional[str] = Query(None, description="Payroll reference of one export batch"),
+    after_id: Optional[int] = Query(None, ge=1, description="Resume after this timesheet_id"),
+    limit: Optional[int] = Query(None, ge=1, le=100000, description="Timesheets in this file"),
+    current_user: Employee = Depends(get_current_employee),
+    session: AsyncSession = Depends(get_session)
+):
+    """Stream a month's exported timesheets with compensation fields as CSV or XLSX (HR/Admin only).
+
+    With ``limit``, the X-Next-Cursor response header carries the after_id
+    for the next file, and is absent on the last one.
+    """
+    if current_user.role not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Only HR can download payroll exports")
+
+    query = payroll_export_query(year, month, reference, after_id)
+    if after_id is None:
+        exists = await session.execute(query.limit(1))
+        if exists.first() is None:
+            raise HTTPException(status_code=404, detail="No exported timesheets for this month")
+
+    headers = {}
+    if limit:
+        # The last id of this file, and whether any row follows it
+        boundary = await session.execute(query.offset(limit - 1).limit(2))
+        ids = boundary.scalars().all()
+        if len(ids) == 2:
+            headers["X-Next-Cursor"] = str(ids[0])
+        query = query.limit(limit)
+
+    name = f"payroll_{year}{month:02d}_{reference or 'all'}"
+    if after_id:
+        name += f"_after{after_id}"
+    headers["Content-Disposition"] = f"attachment; filename={name}.{export_format}"
+    return StreamingResponse(
+        stream_payroll_rows(query, export_format),
+        media_type=PAYROLL_MEDIA_TYPES[export_format],
+        headers=headers
+    )
+
+
 @router.get("/analytics/{year}/{month}")
 async def get_monthly_analytics(
     year: int,
     month: int,
     current_user: Employee = Depends(get_current_employee),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get monthly attendance analytics (HR/Admin only)."""
     if current_user.role not in ["admin", "hr"]:
@@ -1,6 +1,6 @@
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from pydantic import BaseModel, ConfigDict, Field
 
 
@@ -116,6 +116,9 @@ class AttendanceResponse(BaseModel):
     is_rest_day: bool = False
     exceeds_daily_limit: bool = False
     exceeds_overtime_limit: bool = False
+    # Geofence audit (None until audited)
+    geofence_flagged: Optional[bool] = None
+    geofence_distance_meters: Optional[Decimal] = None
     # Manual entry/correction info
     is_manual_entry: bool = False
     manual_entry_reason: Optional[str] = None
@@ -127,6 +130,12 @@ class AttendanceResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class AttendanceRecordPage(BaseModel):
+    """Newest-first page of attendance records."""
+    records: List[AttendanceResponse] = []
+    next_cursor: Optional[str] = None  # Pass as cursor to fetch the next page
+
+
 class AttendanceSummary(BaseModel):
     """Summary of attendance for a period."""
     employee_id: int
@@ -202,13 +211,34 @@ class ExceptionalOvertimeRequest(BaseModel):
     is_holiday_overtime: bool = Field(False, description="Is this holiday overtime? 150% rate")
 
 
-class OffsetDayRecord(BaseModel):
-    """Individual offset day record."""
-    attendance_date: date
-    hours_earned: Decimal
-    hours_used: Decimal = Decimal("0")
-    reference: Optional[str] = None  # e.g., "Used on 2026-01-15"
-    status: str = "available"  # available, used, expired
+class OffsetLedgerEntryResponse(BaseModel):
+    """One offset ledger entry."""
+    id: int
+    entry_type: str  # earn, use, expire, adjust
+    hours: Decimal  # Signed: negative for use/expire
+    entry_date: date
+    attendance_record_id: Optional[int] = None
+    reference: Optional[str] = None
+    balance_after: Decimal
+    created_by: Optional[int] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OffsetLedgerPage(BaseModel):
+    """Newest-first page of offset ledger entries."""
+    employee_id: int
+    entries: List[OffsetLedgerEntryResponse] = []
+    next_before_id: Optional[int] = None  # Pass as before_id to fetch the next page
+
+
+class OffsetUsageRequest(BaseModel):
+    """Record offset hours taken as time off, or forfeited."""
+    hours: Decimal = Field(..., gt=0, description="Hours to deduct from the balance")
+    entry_date: date = Field(..., description="Day the offset was taken or expired")
+    entry_type: str = Field("use", pattern="^(use|expire)$")
+    reference: Optional[str] = Field(None, max_length=200)
 
 
 class OffsetBalanceSummary(BaseModel):
@@ -217,9 +247,10 @@ class OffsetBalanceSummary(BaseModel):
     employee_name: str
     total_offset_hours_earned: Decimal = Decimal("0")  # Total offset hours accumulated
     total_offset_hours_used: Decimal = Decimal("0")  # Hours used as time-off
+    total_offset_hours_expired: Decimal = Decimal("0")  # Hours forfeited
     offset_hours_balance: Decimal = Decimal("0")  # Available balance
     offset_days_balance: Decimal = Decimal("0")  # Balance converted to days (balance / 8)
-    records: List[OffsetDayRecord] = []  # Detailed breakdown
+    offset_hours_deficit: Decimal = Decimal("0")  # Used hours later clawed back, owed from future earnings
 
 
 class PaidOvertimeRecord(BaseModel):
@@ -352,3 +383,98 @@ class WeeklyAttendanceSummary(BaseModel):
     exceeds_weekly_limit: bool = False  # More than 48 hours
     has_rest_day: bool = True  # At least one rest day per week required
     compliance_notes: Optional[str] = None
+
+
+class AttendanceSyncEventRequest(ClockInRequest):
+    """One offline attendance event. Clock-in fields are only read for clock_in events."""
+    idempotency_key: str = Field(
+        ..., min_length=1, max_length=100, description="Client-generated key, unique per event"
+    )
+    event_type: str = Field(..., pattern="^(clock_in|clock_out|break_start|break_end)$")
+    occurred_at: datetime = Field(..., description="When the event happened on the device, with timezone")
+
+
+class AttendanceSyncRequest(BaseModel):
+    """Offline events in the order they happened."""
+    events: List[AttendanceSyncEventRequest] = Field(..., min_length=1, max_length=200)
+
+
+class AttendanceSyncEventResult(BaseModel):
+    """Outcome of one synced event."""
+    idempotency_key: str
+    event_type: str
+    status: str  # applied, rejected, duplicate
+    detail: Optional[str] = None
+    record: Optional[AttendanceResponse] = None
+
+
+class AttendanceSyncResponse(BaseModel):
+    """Per-event outcomes of an offline sync, in request order."""
+    applied: int = 0
+    rejected: int = 0
+    duplicates: int = 0
+    results: List[AttendanceSyncEventResult] = []
+
+
+class OvertimeRecomputeRequest(BaseModel):
+    """Recompute hours and overtime for closed records after a policy change."""
+    start_date: date = Field(..., description="First attendance date to recompute")
+    end_date: date = Field(..., description="Last attendance date to recompute")
+    employee_id: Optional[int] = Field(default=None, description="Only this employee's records")
+    ramadan_start: Optional[date] = Field(default=None, description="First day of Ramadan hours in the range")
+    ramadan_end: Optional[date] = Field(default=None, description="Last day of Ramadan hours in the range")
+    include_decided: bool = Field(
+        default=False, description="Also recompute records whose overtime was already approved or rejected"
+    )
+    dry_run: bool = Field(default=True, description="Report what would change without writing")
+
+
+class OvertimeRecomputeChange(BaseModel):
+    """Fields of one record that differ, as [current, recomputed]."""
+    record_id: int
+    employee_id: int
+    attendance_date: date
+    changes: Dict[str, List[Any]]
+
+
+class OvertimeRecomputeJobResponse(BaseModel):
+    """Progress and diff of an overtime recompute job."""
+    id: str
+    start_date: date
+    end_date: date
+    employee_id: Optional[int] = None
+    ramadan_start: Optional[date] = None
+    ramadan_end: Optional[date] = None
+    include_decided: bool = False
+    dry_run: bool = True
+    status: str  # queued, running, completed, failed
+    total: int
+    processed: int
+    changed: int
+    changes: List[OvertimeRecomputeChange] = []  # First 500 changed records
+    regenerated_timesheets: List[int] = []  # Draft/rejected/submitted sheets refreshed (or to refresh on a dry run)
+    stale_timesheets: List[int] = []  # Sheets past review whose totals no longer match
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class BulkApprovalRequest(BaseModel):
+    """Approve or reject many attendance records with one decision."""
+    record_ids: List[int] = Field(..., min_length=1, max_length=500)
+    approved: bool
+    notes: Optional[str] = None
+
+
+class BulkApprovalResult(BaseModel):
+    """What happened to one id of a bulk approval."""
+    id: int
+    outcome: str  # approved, rejected, not_found, forbidden, not_pending
+
+
+class BulkApprovalResponse(BaseModel):
+    """Per-id outcomes of a bulk approval, in request order."""
+    approved: int
+    rejected: int
+    skipped: int
+    results: List[BulkApprovalResult]
@@ -1,5 +1,5 @@
 """Geofence schemas."""
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from typing import Optional
 
@@ -46,8 +46,8 @@ class GeofenceResponse(BaseModel):
 
 class GeofenceValidationRequest(BaseModel):
     """Request to validate GPS coordinates against geofences."""
-    latitude: Decimal = Field(..., description="User's latitude")
-    longitude: Decimal = Field(..., description="User's longitude")
+    latitude: Decimal = Field(..., ge=-90, le=90, description="User's latitude")
+    longitude: Decimal = Field(..., ge=-180, le=180, description="User's longitude")
     work_location: Optional[str] = Field(default=None, description="Expected work location")
 
 
@@ -70,3 +70,25 @@ class NearbyGeofence(BaseModel):
     latitude: Decimal
     longitude: Decimal
     radius_meters: int
+
+
+class GeofenceAuditRequest(BaseModel):
+    """Start a batch audit of clock-in coordinates."""
+    start_date: date = Field(..., description="First attendance date to audit")
+    end_date: date = Field(..., description="Last attendance date to audit")
+    work_location: Optional[str] = Field(default=None, description="Only records at this work location")
+
+
+class GeofenceAuditJobResponse(BaseModel):
+    """Progress of a geofence audit job."""
+    id: str
+    start_date: date
+    end_date: date
+    work_location: Optional[str] = None
+    status: str  # queued, running, completed, failed
+    total: int
+    processed: int
+    flagged: int
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
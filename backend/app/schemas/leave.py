@@ -83,3 +83,28 @@ class LeaveCalendarEntry(BaseModel):
     end_date: date
     status: str
     is_half_day: bool = False
+
+
+class LeaveCalendarDay(BaseModel):
+    """Employees on approved leave for one calendar day."""
+    date: date
+    on_leave_count: int
+    employee_ids: List[int] = []
+
+
+class LeaveAvailabilityGroup(BaseModel):
+    """Daily absence for one department or manager's team."""
+    key: str
+    label: str
+    headcount: int
+    absent: List[int] = Field(..., description="Employees on leave, one entry per day")
+    absent_pct: List[float] = Field(..., description="Percentage of headcount on leave, one entry per day")
+
+
+class LeaveAvailabilityMatrix(BaseModel):
+    """Team availability heatmap; day i of each array is start_date + i."""
+    start_date: date
+    end_date: date
+    group_by: str
+    holiday_offsets: List[int] = Field(default_factory=list, description="Day offsets that are public holidays")
+    groups: List[LeaveAvailabilityGroup] = []
@@ -92,6 +92,11 @@ class TimesheetApproval(BaseModel):
     rejection_reason: Optional[str] = Field(default=None, description="Reason for rejection")
 
 
+class TimesheetBulkApproval(TimesheetApproval):
+    """Approve or reject many timesheets with one decision."""
+    timesheet_ids: List[int] = Field(..., min_length=1, max_length=500)
+
+
 class TimesheetList(BaseModel):
     """List of timesheets."""
     year: int
@@ -103,6 +108,24 @@ class TimesheetList(BaseModel):
     timesheets: List[TimesheetSummary] = []
 
 
+class TimesheetBulkJob(BaseModel):
+    """Progress of a bulk timesheet generation job."""
+    id: str
+    year: int
+    month: int
+    department: Optional[str] = None
+    manager_id: Optional[int] = None
+    status: str  # queued, running, completed, failed
+    total: int
+    processed: int
+    created: int
+    updated: int
+    skipped: int
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
 class MonthlyAttendanceAnalytics(BaseModel):
     """Monthly attendance analytics."""
     year: int
@@ -130,3 +153,12 @@ class MonthlyAttendanceAnalytics(BaseModel):
     # Compliance
     employees_with_issues: int
     compliance_rate: Decimal  # Percentage
+
+
+class PayrollExportBatch(BaseModel):
+    """Timesheets moved to exported by one payroll export."""
+    payroll_reference: str
+    year: int
+    month: int
+    exported_count: int
+    exported_at: datetime
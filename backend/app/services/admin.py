@@ -13,6 +13,7 @@ from app.schemas.system_settings import (
     FeatureToggle,
     FeatureToggleUpdate,
 )
+from app.services.feature_flags import get_feature_flags
 
 
 class AdminService:
@@ -123,6 +124,7 @@ class AdminService:
         
         await self._settings.update_toggle(session, key, is_enabled)
         await session.commit()
+        get_feature_flags().invalidate()
         
         return FeatureToggle(
             key=setting.key,
@@ -146,6 +148,7 @@ class AdminService:
         await self._settings.initialize_defaults(session)
         disabled = await self._settings.disable_all(session)
         await session.commit()
+        get_feature_flags().invalidate()
         return {"disabled_features": disabled}
 
     async def enable_core_features(self, session: AsyncSession) -> Dict[str, int]:
@@ -153,11 +156,12 @@ class AdminService:
         await self._settings.initialize_defaults(session)
         enabled = await self._settings.enable_core_only(session)
         await session.commit()
+        get_feature_flags().invalidate()
         return {"enabled_features": enabled}
 
     async def is_feature_enabled(self, session: AsyncSession, key: str) -> bool:
         """Check if a specific feature is enabled."""
-        return await self._settings.is_feature_enabled(session, key)
+        return await get_feature_flags().is_enabled(session, key, default=False)
 
 
 # Example: Automated compliance report export (placeholder)
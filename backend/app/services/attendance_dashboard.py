@@ -0,0 +1,139 @@
+"""SQL-side aggregation for the HR attendance dashboard.
+
+The dashboard is two statements. The first is one aggregate over today's
+attendance records, using COUNT(...) FILTER (WHERE ...) for each headline
+number and location, with the active-employee count as a scalar subquery.
+The second is one combined count of pending approvals. The result is cached
+for a few seconds, so a room full of HR users refreshing the page shares a
+single computation.
+"""
+import asyncio
+import time
+from datetime import date
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.time import get_uae_today
+from app.models.attendance import AttendanceRecord
+from app.models.employee import Employee
+from app.schemas.attendance import AttendanceDashboard
+
+# Dashboard field -> work_location value
+LOCATION_FIELDS = {
+    "at_head_office": "Head Office",
+    "at_kezad": "KEZAD",
+    "at_safario": "Safario",
+    "at_sites": "Sites",
+    "at_meeting": "Meeting",
+    "at_event": "Event",
+    "at_wfh": "Work From Home",
+}
+
+
+def _count_if(condition):
+    return func.count(AttendanceRecord.id).filter(condition)
+
+
+async def compute_dashboard(session: AsyncSession, today: date) -> AttendanceDashboard:
+    """Compute the dashboard with one aggregate query plus one pending-approvals query."""
+    total_employees_sq = (
+        select(func.count(Employee.id))
+        .where(Employee.is_active == True)
+        .scalar_subquery()
+    )
+    location_counts = [
+        _count_if(AttendanceRecord.work_location == location).label(field)
+        for field, location in LOCATION_FIELDS.items()
+    ]
+    today_result = await session.execute(
+        select(
+            total_employees_sq.label("total_employees"),
+            _count_if(AttendanceRecord.clock_in.isnot(None)).label("clocked_in"),
+            _count_if(AttendanceRecord.is_late == True).label("late"),
+            _count_if(AttendanceRecord.status == "on-leave").label("on_leave"),
+            _count_if(AttendanceRecord.exceeds_daily_limit == True).label("exceeding_daily_limits"),
+            _count_if(AttendanceRecord.exceeds_overtime_limit == True).label("exceeding_overtime_limits"),
+            *location_counts,
+        ).where(AttendanceRecord.attendance_date == today)
+    )
+    today_row = today_result.one()._mapping
+
+    wfh_pending = and_(AttendanceRecord.work_type == "wfh", AttendanceRecord.wfh_approved == None)
+    overtime_pending = and_(AttendanceRecord.overtime_hours > 0, AttendanceRecord.overtime_approved == None)
+    correction_pending = and_(
+        AttendanceRecord.is_manual_entry == True, AttendanceRecord.correction_approved == None
+    )
+    pending_result = await session.execute(
+        select(
+            _count_if(wfh_pending).label("wfh"),
+            _count_if(overtime_pending).label("overtime"),
+            _count_if(correction_pending).label("corrections"),
+        ).where(or_(wfh_pending, overtime_pending, correction_pending))
+    )
+    pending = pending_result.one()._mapping
+
+    total_employees = today_row["total_employees"] or 0
+    clocked_in = today_row["clocked_in"]
+    on_leave = today_row["on_leave"]
+    return AttendanceDashboard(
+        total_employees=total_employees,
+        clocked_in_today=clocked_in,
+        wfh_today=today_row["at_wfh"],
+        absent_today=total_employees - clocked_in - on_leave,
+        late_today=today_row["late"],
+        pending_wfh_approvals=pending["wfh"],
+        pending_overtime_approvals=pending["overtime"],
+        pending_corrections=pending["corrections"],
+        on_leave_today=on_leave,
+        exceeding_daily_limits=today_row["exceeding_daily_limits"],
+        exceeding_overtime_limits=today_row["exceeding_overtime_limits"],
+        **{field: today_row[field] for field in LOCATION_FIELDS},
+    )
+
+
+class DashboardCache:
+    """Short-TTL snapshot of the dashboard shared across requests."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[Tuple[date, float, AttendanceDashboard]] = None
+        self._lock = asyncio.Lock()
+
+    def _fresh(self, today: date) -> Optional[AttendanceDashboard]:
+        if self._snapshot is None:
+            return None
+        snapshot_date, computed_at, dashboard = self._snapshot
+        if snapshot_date != today or time.monotonic() - computed_at >= self.ttl_seconds:
+            return None
+        return dashboard
+
+    async def get(self, session: AsyncSession) -> AttendanceDashboard:
+        today = get_uae_today()
+        dashboard = self._fresh(today)
+        if dashboard is not None:
+            return dashboard
+        async with self._lock:
+            # Concurrent requests wait here and reuse the first computation
+            dashboard = self._fresh(today)
+            if dashboard is None:
+                dashboard = await compute_dashboard(session, today)
+                self._snapshot = (today, time.monotonic(), dashboard)
+            return dashboard
+
+    def invalidate(self) -> None:
+        self._snapshot = None
+
+
+# Singleton instance
+_dashboard_cache: Optional[DashboardCache] = None
+
+
+def get_dashboard_cache() -> DashboardCache:
+    """Get or create the dashboard cache singleton."""
+    global _dashboard_cache
+    if _dashboard_cache is None:
+        _dashboard_cache = DashboardCache(get_settings().dashboard_cache_ttl_seconds)
+    return _dashboard_cache
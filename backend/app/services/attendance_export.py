@@ -0,0 +1,57 @@
+"""Streaming NDJSON/CSV export of attendance records.
+
+Rows come from a server-side cursor in batches of ``yield_per`` and each
+batch is serialized and sent before the next is fetched, so memory stays
+flat however long the date range is. The export opens its own read
+session because the response body is produced after the endpoint has
+returned.
+"""
+import csv
+import io
+from typing import AsyncIterator, Callable, Iterable
+
+from sqlalchemy import Select
+
+from app.database import read_session_scope
+from app.models.attendance import AttendanceRecord
+from app.schemas.attendance import AttendanceResponse
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+CSV_COLUMNS = list(AttendanceResponse.model_fields)
+
+# Builds the API shape of a record from the record and the employee's name
+ResponseBuilder = Callable[[AttendanceRecord, str], AttendanceResponse]
+
+
+def csv_header() -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(CSV_COLUMNS)
+    return buffer.getvalue()
+
+
+def serialize_batch(responses: Iterable[AttendanceResponse], export_format: str) -> str:
+    """One chunk of the export body for a batch of records."""
+    if export_format == "ndjson":
+        return "".join(response.model_dump_json() + "\n" for response in responses)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for response in responses:
+        values = response.model_dump(mode="json")
+        writer.writerow(["" if values[c] is None else values[c] for c in CSV_COLUMNS])
+    return buffer.getvalue()
+
+
+async def stream_attendance_records(
+    query: Select, export_format: str, build: ResponseBuilder, batch_size: int
+) -> AsyncIterator[str]:
+    """Yield the export body chunk by chunk for ``query`` (record, employee name) rows."""
+    async with read_session_scope() as session:
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+        if export_format == "csv":
+            yield csv_header()
+        async for rows in result.partitions():
+            yield serialize_batch((build(record, name) for record, name in rows), export_format)
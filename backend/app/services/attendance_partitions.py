@@ -0,0 +1,206 @@
+"""Monthly partitions and archival for attendance_records.
+
+On PostgreSQL, attendance_records is range-partitioned on attendance_date
+with one partition per month, named ``attendance_records_yYYYYmMM``, plus
+a default partition for dates no monthly partition covers (migration
+0030). Date-bounded queries are pruned by the planner to the partitions
+that overlap the range.
+
+The attendance scheduler runs maintenance nightly:
+
+- ensure_future_partitions() keeps the current month and the next
+  ``attendance_partition_months_ahead`` months created. Any rows that
+  landed in the default partition for such a month are moved into it.
+- archive_closed_months() takes months older than
+  ``attendance_archive_after_months`` in which every employee with records
+  has an HR-approved or exported timesheet, no other timesheet is open,
+  and no correction or overtime approval is pending.
+  Each such month is copied into attendance_records_archive as one JSONB
+  array per employee, then its partition is detached and dropped.
+
+On other databases the table is not partitioned and both are no-ops.
+"""
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import List
+
+from sqlalchemy import and_, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.time import get_uae_today
+from app.models.attendance import AttendanceRecord
+from app.models.timesheet import Timesheet
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARTITION = "attendance_records_default"
+
+# Timesheet statuses that mean the month is closed for that employee
+ARCHIVABLE_TIMESHEET_STATUSES = ("hr_approved", "exported")
+
+_PARTITION_NAME = re.compile(r"^attendance_records_y(\d{4})m(\d{2})$")
+
+
+def add_months(day: date, months: int) -> date:
+    """First day of the month ``months`` after the month of ``day``."""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"attendance_records_y{month.year}m{month.month:02d}"
+
+
+@dataclass
+class ArchivedMonth:
+    """What archive_closed_months() moved for one month."""
+
+    month: date
+    employees: int
+    records: int
+
+
+async def is_partitioned(session: AsyncSession) -> bool:
+    """Whether attendance_records is a partitioned table in this database."""
+    if session.bind.dialect.name != "postgresql":
+        return False
+    result = await session.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+        "WHERE partrelid = to_regclass('attendance_records'))"
+    ))
+    return bool(result.scalar())
+
+
+async def list_month_partitions(session: AsyncSession) -> List[date]:
+    """First day of each month that has an attached partition, oldest first."""
+    result = await session.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'attendance_records'::regclass"
+    ))
+    months = []
+    for name in result.scalars().all():
+        match = _PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+async def create_month_partition(session: AsyncSession, month: date) -> bool:
+    """Create the partition for ``month`` unless it exists. Does not commit.
+
+    Rows for the month already in the default partition would make the
+    CREATE fail, so they are moved out first and reinserted afterwards.
+    """
+    name = partition_name(month)
+    result = await session.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+    if result.scalar():
+        return False
+
+    bounds = {"start": month, "end": add_months(month, 1)}
+    in_month = "attendance_date >= :start AND attendance_date < :end"
+    result = await session.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_month})"), bounds
+    )
+    stranded = bool(result.scalar())
+    if stranded:
+        await session.execute(text(
+            "CREATE TEMP TABLE attendance_partition_move (LIKE attendance_records)"
+        ))
+        await session.execute(text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE {in_month} RETURNING *) "
+            f"INSERT INTO attendance_partition_move SELECT * FROM moved"
+        ), bounds)
+
+    await session.execute(text(
+        f"CREATE TABLE {name} PARTITION OF attendance_records "
+        f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+    ))
+
+    if stranded:
+        await session.execute(text("INSERT INTO attendance_records SELECT * FROM attendance_partition_move"))
+        await session.execute(text("DROP TABLE attendance_partition_move"))
+    return True
+
+
+async def ensure_future_partitions(session: AsyncSession) -> List[str]:
+    """Create any missing partitions from this month through the look-ahead window."""
+    if not await is_partitioned(session):
+        return []
+    current = get_uae_today().replace(day=1)
+    created = []
+    for offset in range(get_settings().attendance_partition_months_ahead + 1):
+        month = add_months(current, offset)
+        if await create_month_partition(session, month):
+            created.append(partition_name(month))
+    await session.commit()
+    return created
+
+
+async def month_is_closed(session: AsyncSession, month: date) -> bool:
+    """True when every employee with records in ``month`` has a final timesheet
+    for it, and nothing in the month is still waiting for approval."""
+    in_month = and_(
+        AttendanceRecord.attendance_date >= month,
+        AttendanceRecord.attendance_date < add_months(month, 1),
+    )
+    final_timesheet = select(Timesheet.id).where(
+        Timesheet.employee_id == AttendanceRecord.employee_id,
+        Timesheet.year == month.year,
+        Timesheet.month == month.month,
+        Timesheet.status.in_(ARCHIVABLE_TIMESHEET_STATUSES),
+    )
+    # Employees with records but no approved timesheet (including none at all)
+    unapproved_employee = select(AttendanceRecord.employee_id).where(
+        in_month, ~final_timesheet.exists()
+    )
+    open_timesheet = select(Timesheet.id).where(
+        Timesheet.year == month.year,
+        Timesheet.month == month.month,
+        Timesheet.status.notin_(ARCHIVABLE_TIMESHEET_STATUSES),
+    )
+    pending_record = select(AttendanceRecord.id).where(
+        in_month,
+        or_(
+            and_(AttendanceRecord.is_manual_entry == True, AttendanceRecord.correction_approved == None),
+            and_(AttendanceRecord.overtime_type == "auto-calculated", AttendanceRecord.overtime_approved == None),
+        ),
+    )
+    for query in (unapproved_employee, open_timesheet, pending_record):
+        if (await session.execute(query.limit(1))).first() is not None:
+            return False
+    return True
+
+
+async def archive_month(session: AsyncSession, month: date) -> ArchivedMonth:
+    """Copy one month into the archive, then detach and drop its partition. Does not commit."""
+    name = partition_name(month)
+    records = (await session.execute(text(f"SELECT count(*) FROM {name}"))).scalar() or 0
+    result = await session.execute(text(
+        f"INSERT INTO attendance_records_archive (archive_month, employee_id, record_count, records) "
+        f"SELECT :month, employee_id, count(*), jsonb_agg(to_jsonb(r) ORDER BY attendance_date, id) "
+        f"FROM {name} r GROUP BY employee_id"
+    ), {"month": month})
+    await session.execute(text(f"ALTER TABLE attendance_records DETACH PARTITION {name}"))
+    await session.execute(text(f"DROP TABLE {name}"))
+    return ArchivedMonth(month=month, employees=result.rowcount or 0, records=records)
+
+
+async def archive_closed_months(session: AsyncSession) -> List[ArchivedMonth]:
+    """Archive every closed month older than the retention window, one transaction per month."""
+    if not await is_partitioned(session):
+        return []
+    cutoff = add_months(get_uae_today(), -get_settings().attendance_archive_after_months)
+    archived = []
+    for month in await list_month_partitions(session):
+        if month >= cutoff or not await month_is_closed(session, month):
+            continue
+        try:
+            archived.append(await archive_month(session, month))
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            logger.exception("Attendance archival failed", extra={"month": month.isoformat()})
+    return archived
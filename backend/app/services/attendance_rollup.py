@@ -0,0 +1,233 @@
+"""Incremental maintenance of the attendance_daily_rollup table.
+
+Every attendance write path takes a snapshot of the record's contribution
+before it mutates the record. Just before commit, it calls
+``apply_rollup_change``. That call upserts the difference into the
+(date, location, department) bucket, inside the same transaction as the
+record change. So the rollup never drifts from the records it summarises,
+except for bulk writes that bypass the API. ``rebuild_rollup`` recomputes a
+date range from scratch for those cases and for the initial backfill.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Optional, Tuple, Union
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.time import get_utc_now
+from app.models.attendance import AttendanceRecord
+from app.models.attendance_rollup import ROLLUP_UNSPECIFIED, AttendanceDailyRollup
+from app.models.employee import Employee
+
+logger = logging.getLogger(__name__)
+
+PRESENT_STATUSES = ("present", "late")
+
+Number = Union[int, Decimal]
+
+
+@dataclass(frozen=True)
+class RollupContribution:
+    """What one attendance record adds to its rollup bucket."""
+
+    attendance_date: date
+    work_location: str
+    values: Dict[str, Number]
+
+    @property
+    def bucket(self) -> Tuple[date, str]:
+        return self.attendance_date, self.work_location
+
+
+def _dec(value: Optional[Decimal]) -> Decimal:
+    return Decimal(value) if value is not None else Decimal("0")
+
+
+def rollup_snapshot(record: Optional[AttendanceRecord]) -> Optional[RollupContribution]:
+    """Capture a record's current contribution. Take this before mutating it."""
+    if record is None:
+        return None
+    overtime = _dec(record.overtime_hours)
+    values: Dict[str, Number] = {
+        "record_count": 1,
+        "present_count": int(record.status in PRESENT_STATUSES),
+        "late_count": int(bool(record.is_late)),
+        "early_departure_count": int(bool(record.is_early_departure)),
+        "on_leave_count": int(record.status == "on-leave"),
+        "wfh_count": int(record.work_type == "wfh"),
+        "compliance_issue_count": int(bool(record.exceeds_daily_limit or record.exceeds_overtime_limit)),
+        "food_allowance_count": int(bool(record.food_allowance_eligible)),
+        "total_hours": _dec(record.total_hours),
+        "regular_hours": _dec(record.regular_hours),
+        "overtime_hours": overtime,
+        "night_overtime_hours": overtime if record.is_night_overtime else Decimal("0"),
+        "holiday_overtime_hours": overtime if record.is_holiday_overtime else Decimal("0"),
+        "overtime_amount": _dec(record.overtime_amount),
+        "food_allowance_amount": _dec(record.food_allowance_amount),
+    }
+    return RollupContribution(
+        attendance_date=record.attendance_date,
+        work_location=record.work_location or ROLLUP_UNSPECIFIED,
+        values=values,
+    )
+
+
+def _diff(after: Dict[str, Number], before: Dict[str, Number]) -> Dict[str, Number]:
+    return {key: after[key] - before[key] for key in after}
+
+
+def _negate(values: Dict[str, Number]) -> Dict[str, Number]:
+    return {key: -value for key, value in values.items()}
+
+
+def _dialect_insert(session: AsyncSession):
+    """INSERT construct with ON CONFLICT support for the session's dialect."""
+    if session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert
+
+
+async def _upsert(
+    session: AsyncSession,
+    bucket: Tuple[date, str],
+    department: str,
+    deltas: Dict[str, Number],
+) -> None:
+    attendance_date, work_location = bucket
+    table = AttendanceDailyRollup.__table__
+    stmt = _dialect_insert(session)(table).values(
+        attendance_date=attendance_date,
+        work_location=work_location,
+        department=department,
+        updated_at=get_utc_now(),
+        **deltas,
+    )
+    set_ = {key: table.c[key] + stmt.excluded[key] for key in deltas}
+    set_["updated_at"] = stmt.excluded.updated_at
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["attendance_date", "work_location", "department"],
+            set_=set_,
+        )
+    )
+
+
+async def apply_rollup_change(
+    session: AsyncSession,
+    record: AttendanceRecord,
+    before: Optional[RollupContribution],
+    department: Optional[str] = None,
+) -> None:
+    """Fold a record change into the rollup. Call this before the caller's commit.
+
+    ``before`` is the ``rollup_snapshot`` taken before the mutation, or None
+    for a newly created record. Changes that touch no rolled-up field issue
+    no SQL.
+    """
+    after = rollup_snapshot(record)
+    if before is not None and before.bucket == after.bucket:
+        deltas = _diff(after.values, before.values)
+        if not any(deltas.values()):
+            return
+        changes = [(after.bucket, deltas)]
+    elif before is not None:
+        # Date or location changed: move the record between buckets
+        changes = [(before.bucket, _negate(before.values)), (after.bucket, after.values)]
+    else:
+        changes = [(after.bucket, after.values)]
+
+    if department is None:
+        result = await session.execute(
+            select(Employee.department).where(Employee.id == record.employee_id)
+        )
+        department = result.scalar()
+    department = department or ROLLUP_UNSPECIFIED
+
+    for bucket, deltas in changes:
+        await _upsert(session, bucket, department, deltas)
+
+
+def _rollup_select(start_date: Optional[date], end_date: Optional[date]):
+    """GROUP BY over attendance_records producing rows shaped like the rollup table."""
+    record = AttendanceRecord
+    overtime = func.coalesce(record.overtime_hours, 0)
+
+    def count_if(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+    def sum_of(expr):
+        return func.coalesce(func.sum(expr), 0)
+
+    location = func.coalesce(record.work_location, ROLLUP_UNSPECIFIED)
+    department = func.coalesce(Employee.department, ROLLUP_UNSPECIFIED)
+    conditions = []
+    if start_date is not None:
+        conditions.append(record.attendance_date >= start_date)
+    if end_date is not None:
+        conditions.append(record.attendance_date <= end_date)
+
+    return (
+        select(
+            record.attendance_date,
+            location.label("work_location"),
+            department.label("department"),
+            func.count(record.id).label("record_count"),
+            count_if(record.status.in_(PRESENT_STATUSES)).label("present_count"),
+            count_if(record.is_late == True).label("late_count"),
+            count_if(record.is_early_departure == True).label("early_departure_count"),
+            count_if(record.status == "on-leave").label("on_leave_count"),
+            count_if(record.work_type == "wfh").label("wfh_count"),
+            count_if(
+                (record.exceeds_daily_limit == True) | (record.exceeds_overtime_limit == True)
+            ).label("compliance_issue_count"),
+            count_if(record.food_allowance_eligible == True).label("food_allowance_count"),
+            sum_of(record.total_hours).label("total_hours"),
+            sum_of(record.regular_hours).label("regular_hours"),
+            sum_of(overtime).label("overtime_hours"),
+            sum_of(case((record.is_night_overtime == True, overtime), else_=0)).label("night_overtime_hours"),
+            sum_of(case((record.is_holiday_overtime == True, overtime), else_=0)).label("holiday_overtime_hours"),
+            sum_of(record.overtime_amount).label("overtime_amount"),
+            sum_of(record.food_allowance_amount).label("food_allowance_amount"),
+            func.now().label("updated_at"),
+        )
+        .select_from(record)
+        .outerjoin(Employee, record.employee_id == Employee.id)
+        .where(*conditions)
+        .group_by(record.attendance_date, location, department)
+    )
+
+
+async def rebuild_rollup(
+    session: AsyncSession,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> int:
+    """Recompute rollup rows for a date range (all dates when unbounded).
+
+    Commits and returns the number of rollup rows written.
+    """
+    rollup = AttendanceDailyRollup
+    conditions = []
+    if start_date is not None:
+        conditions.append(rollup.attendance_date >= start_date)
+    if end_date is not None:
+        conditions.append(rollup.attendance_date <= end_date)
+    await session.execute(delete(rollup).where(*conditions))
+
+    source = _rollup_select(start_date, end_date)
+    columns = [column.name for column in source.selected_columns]
+    await session.execute(insert(rollup).from_select(columns, source))
+    await session.commit()
+
+    count_query = select(func.count(rollup.id)).where(*conditions)
+    written = (await session.execute(count_query)).scalar() or 0
+    logger.info(
+        "Attendance rollup rebuilt",
+        extra={"start_date": str(start_date), "end_date": str(end_date), "rows": written},
+    )
+    return written
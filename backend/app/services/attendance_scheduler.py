@@ -4,6 +4,8 @@ This module provides:
 - 10:00 AM daily manager email
 - 9:30 AM missing clock-in reminder
 - 5:30 PM missing clock-out reminder
+- 3:00 AM purge of expired idempotency keys
+- 2:30 AM attendance partition creation and archival
 
 Uses APScheduler for task scheduling.
 Install with: pip install apscheduler
@@ -20,11 +22,11 @@ except ImportError:
     AsyncIOScheduler = None
     CronTrigger = None
 
-from sqlalchemy import select
-
+from app.core.idempotency import get_idempotency_store
 from app.database import async_session_maker
-from app.models.employee import Employee
+from app.services.attendance_partitions import archive_closed_months, ensure_future_partitions
 from app.services.attendance_service import AttendanceService
+from app.services.manager_summary import send_manager_summary_emails
 
 logger = logging.getLogger(__name__)
 
@@ -73,6 +75,22 @@ class AttendanceScheduler:
             name="Clock-out Reminder"
         )
         
+        # 3:00 AM UAE (23:00 UTC) - Expired idempotency keys
+        self.scheduler.add_job(
+            self._purge_idempotency_keys,
+            CronTrigger(hour=23, minute=0, timezone="UTC"),  # 3:00 AM UAE
+            id="idempotency_purge",
+            name="Idempotency Key Purge"
+        )
+        
+        # 2:30 AM UAE (22:30 UTC) - Future partitions and archival of closed months
+        self.scheduler.add_job(
+            self._maintain_attendance_partitions,
+            CronTrigger(hour=22, minute=30, timezone="UTC"),  # 2:30 AM UAE
+            id="attendance_partitions",
+            name="Attendance Partition Maintenance"
+        )
+        
         self.scheduler.start()
         self.is_running = True
         logger.info("Attendance scheduler started")
@@ -111,40 +129,42 @@ class AttendanceScheduler:
         logger.info("Running manager summary email task")
         try:
             async with async_session_maker() as session:
-                # Get all managers
-                result = await session.execute(
-                    select(Employee).where(
-                        Employee.role.in_(["manager", "admin", "hr"])
-                    )
+                success_count = await send_manager_summary_emails(
+                    session, manager_roles=["manager", "admin", "hr"]
                 )
-                managers = result.scalars().all()
-                
-                service = AttendanceService(session)
-                success_count = 0
-                
-                for manager in managers:
-                    # Check if manager has team members
-                    team_result = await session.execute(
-                        select(Employee.id).where(
-                            Employee.line_manager_id == manager.id
-                        ).limit(1)
-                    )
-                    has_team = team_result.scalar_one_or_none()
-                    
-                    if has_team:
-                        success = await service.send_manager_daily_summary_email(manager.id)
-                        if success:
-                            success_count += 1
-                
                 logger.info(f"Sent {success_count} manager summary emails")
         except Exception as e:
             logger.error(f"Error sending manager summaries: {e}")
     
+    async def _purge_idempotency_keys(self):
+        """Delete stored idempotent responses past their TTL."""
+        logger.info("Running idempotency key purge task")
+        try:
+            count = await get_idempotency_store().purge_expired()
+            logger.info(f"Purged {count} expired idempotency keys")
+        except Exception as e:
+            logger.error(f"Error purging idempotency keys: {e}")
+    
+    async def _maintain_attendance_partitions(self):
+        """Create upcoming attendance partitions and archive closed months."""
+        logger.info("Running attendance partition maintenance task")
+        try:
+            async with async_session_maker() as session:
+                created = await ensure_future_partitions(session)
+                archived = await archive_closed_months(session)
+                logger.info(
+                    f"Created {len(created)} attendance partitions, "
+                    f"archived {len(archived)} months"
+                )
+        except Exception as e:
+            logger.error(f"Error maintaining attendance partitions: {e}")
+    
     async def trigger_now(self, task_name: str) -> dict:
         """Manually trigger a task immediately.
         
         Args:
-            task_name: One of "clockin_reminder", "clockout_reminder", "manager_summary"
+            task_name: One of "clockin_reminder", "clockout_reminder", "manager_summary",
+                "idempotency_purge", "attendance_partitions"
         
         Returns:
             Result dictionary with status
@@ -152,7 +172,9 @@ class AttendanceScheduler:
         tasks = {
             "clockin_reminder": self._send_clockin_reminders,
             "clockout_reminder": self._send_clockout_reminders,
-            "manager_summary": self._send_manager_summaries
+            "manager_summary": self._send_manager_summaries,
+            "idempotency_purge": self._purge_idempotency_keys,
+            "attendance_partitions": self._maintain_attendance_partitions
         }
         
         if task_name not in tasks:
@@ -0,0 +1,70 @@
+"""Set-based approval of many attendance records or timesheets at once.
+
+A bulk endpoint loads every requested row in one query, together with
+whether it is still pending and who the owner's line manager is. triage()
+then sorts the ids into those the caller may decide and the rest. The
+decision is applied with one UPDATE ... WHERE id IN, guarded by the same
+pending condition and returning the ids it changed. A row decided by
+someone else between the two statements is reported as not pending
+instead of being overwritten.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.schemas.attendance import BulkApprovalResponse, BulkApprovalResult
+
+OUTCOME_NOT_FOUND = "not_found"
+OUTCOME_FORBIDDEN = "forbidden"
+OUTCOME_NOT_PENDING = "not_pending"
+
+
+def unique_ids(ids: Iterable[int]) -> List[int]:
+    """``ids`` without repeats, in first-seen order."""
+    return list(dict.fromkeys(ids))
+
+
+def may_decide(role: str, approver_id: int, line_manager_id: Optional[int]) -> bool:
+    """HR and admins decide for anyone, managers only for their direct reports."""
+    return role in ("admin", "hr") or line_manager_id == approver_id
+
+
+def triage(
+    ids: Sequence[int], rows: Dict[int, Tuple[bool, bool]]
+) -> Tuple[List[int], Dict[int, str]]:
+    """Split ``ids`` into those to update and the outcome of every other id.
+
+    ``rows`` maps each id that exists to (caller may decide it, still pending).
+    """
+    eligible = []
+    skipped = {}
+    for item_id in ids:
+        if item_id not in rows:
+            skipped[item_id] = OUTCOME_NOT_FOUND
+            continue
+        allowed, pending = rows[item_id]
+        if not allowed:
+            skipped[item_id] = OUTCOME_FORBIDDEN
+        elif not pending:
+            skipped[item_id] = OUTCOME_NOT_PENDING
+        else:
+            eligible.append(item_id)
+    return eligible, skipped
+
+
+def approval_results(
+    ids: Sequence[int], skipped: Dict[int, str], decided: Set[int], approved: bool
+) -> BulkApprovalResponse:
+    """Per-id outcomes in request order. Eligible ids the UPDATE missed are not pending."""
+    decision = "approved" if approved else "rejected"
+    results = [
+        BulkApprovalResult(
+            id=item_id,
+            outcome=skipped.get(item_id) or (decision if item_id in decided else OUTCOME_NOT_PENDING),
+        )
+        for item_id in ids
+    ]
+    return BulkApprovalResponse(
+        approved=len(decided) if approved else 0,
+        rejected=0 if approved else len(decided),
+        skipped=len(ids) - len(decided),
+        results=results,
+    )
@@ -0,0 +1,161 @@
+"""Business-day calendar built from public holidays and work schedules.
+
+Active PublicHoliday rows are loaded once per worker into a date map. For
+each (year, work schedule) pair, a prefix-sum array of working days is built
+on first use. A holiday check is then a dict lookup, and a working-day count
+for any date range is two array reads per calendar year spanned. Holiday
+writes invalidate the local snapshot. Other workers pick the change up when
+their TTL expires.
+"""
+import asyncio
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.leave import CALENDAR_DAY_LEAVE_TYPES
+from app.models.public_holiday import PublicHoliday
+
+# Weekdays (Mon=0) that are rest days for each work schedule. 6-day staff
+# work a half day on Friday and rest on Saturday.
+REST_DAYS: Dict[str, Tuple[int, ...]] = {
+    "5 days": (4, 5),
+    "6 days": (5,),
+}
+
+
+def schedule_key(work_schedule: Optional[str]) -> str:
+    """Normalise Employee.work_schedule the same way get_standard_hours_for_day does."""
+    return "6 days" if work_schedule and "6" in work_schedule else "5 days"
+
+
+class BusinessCalendar:
+    """Immutable holiday map with lazily built per-year prefix sums."""
+
+    def __init__(self, holidays: Dict[date, int]):
+        # date -> PublicHoliday.id
+        self._holidays = holidays
+        self._prefix: Dict[Tuple[int, str], List[int]] = {}
+
+    def holiday_id(self, check_date: date) -> Optional[int]:
+        return self._holidays.get(check_date)
+
+    def is_holiday(self, check_date: date) -> bool:
+        return check_date in self._holidays
+
+    def is_working_day(self, check_date: date, work_schedule: Optional[str] = None) -> bool:
+        rest_days = REST_DAYS[schedule_key(work_schedule)]
+        return check_date.weekday() not in rest_days and check_date not in self._holidays
+
+    def _year_prefix(self, year: int, schedule: str) -> List[int]:
+        """prefix[i] is the number of working days among the first i days of ``year``."""
+        key = (year, schedule)
+        prefix = self._prefix.get(key)
+        if prefix is None:
+            rest_days = REST_DAYS[schedule]
+            first = date(year, 1, 1)
+            days = (date(year + 1, 1, 1) - first).days
+            flags = (
+                0 if (d := first + timedelta(days=i)).weekday() in rest_days or d in self._holidays else 1
+                for i in range(days)
+            )
+            prefix = [0, *accumulate(flags)]
+            self._prefix[key] = prefix
+        return prefix
+
+    def working_days(self, start_date: date, end_date: date, work_schedule: Optional[str] = None) -> int:
+        """Working days in the inclusive range, excluding rest days and public holidays."""
+        if end_date < start_date:
+            return 0
+        schedule = schedule_key(work_schedule)
+        total = 0
+        for year in range(start_date.year, end_date.year + 1):
+            prefix = self._year_prefix(year, schedule)
+            first = date(year, 1, 1)
+            lo = (start_date - first).days if year == start_date.year else 0
+            hi = (end_date - first).days + 1 if year == end_date.year else len(prefix) - 1
+            total += prefix[hi] - prefix[lo]
+        return total
+
+
+def count_leave_days(
+    calendar: BusinessCalendar,
+    leave_type: str,
+    start_date: date,
+    end_date: date,
+    is_half_day: bool,
+    work_schedule: Optional[str] = None,
+) -> Decimal:
+    """Days a leave request deducts from the balance."""
+    if is_half_day:
+        return Decimal("0.5")
+    if leave_type in CALENDAR_DAY_LEAVE_TYPES:
+        return Decimal((end_date - start_date).days + 1)
+    return Decimal(calendar.working_days(start_date, end_date, work_schedule))
+
+
+async def load_business_calendar(session: AsyncSession) -> BusinessCalendar:
+    """Build a calendar from all active public holidays."""
+    result = await session.execute(
+        select(PublicHoliday.id, PublicHoliday.start_date, PublicHoliday.end_date)
+        .where(PublicHoliday.is_active == True)
+        .order_by(PublicHoliday.start_date)
+    )
+    holidays: Dict[date, int] = {}
+    for holiday_id, start_date, end_date in result:
+        for offset in range((end_date - start_date).days + 1):
+            holidays.setdefault(start_date + timedelta(days=offset), holiday_id)
+    return BusinessCalendar(holidays)
+
+
+class BusinessCalendarCache:
+    """Per-worker calendar snapshot, reloaded on invalidate() or after the TTL."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._calendar: Optional[BusinessCalendar] = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> Optional[BusinessCalendar]:
+        if self._calendar is None or time.monotonic() - self._loaded_at >= self.ttl_seconds:
+            return None
+        return self._calendar
+
+    async def get(self, session: AsyncSession) -> BusinessCalendar:
+        calendar = self._fresh()
+        if calendar is not None:
+            return calendar
+        async with self._lock:
+            calendar = self._fresh()
+            if calendar is None:
+                calendar = await load_business_calendar(session)
+                self._calendar = calendar
+                self._loaded_at = time.monotonic()
+            return calendar
+
+    def invalidate(self) -> None:
+        """Drop the snapshot (call after committing holiday changes)."""
+        self._calendar = None
+
+
+# Singleton instance
+_calendar_cache: Optional[BusinessCalendarCache] = None
+
+
+def get_calendar_cache() -> BusinessCalendarCache:
+    """Get or create the business calendar cache singleton."""
+    global _calendar_cache
+    if _calendar_cache is None:
+        _calendar_cache = BusinessCalendarCache(get_settings().business_calendar_ttl_seconds)
+    return _calendar_cache
+
+
+async def get_business_calendar(session: AsyncSession) -> BusinessCalendar:
+    """Current business calendar, loading it on first use."""
+    return await get_calendar_cache().get(session)
@@ -0,0 +1,218 @@
+"""Group-commit queue for clock-in/out writes.
+
+At the 8 AM clock-in spike, each request's own SELECT, INSERT and COMMIT is
+dominated by commit latency and by row locks on the shared rollup bucket.
+With CLOCK_INGEST_BATCHING enabled, the endpoints hand their write to this
+queue instead. A single flusher per worker collects events for up to
+``clock_ingest_flush_ms`` or ``clock_ingest_max_batch`` events, then applies
+them in one session. Each event runs inside its own SAVEPOINT, so a
+duplicate or a validation error fails only that caller. The whole batch is
+made durable by one COMMIT. Each caller's future resolves to its own
+record, reloaded after the commit with server defaults populated.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.core.db_metrics import PoolWaitHistogram
+from app.models.attendance import AttendanceRecord
+
+logger = logging.getLogger(__name__)
+
+# Applies one clock event using the batch session and returns its record (no commit)
+ClockWork = Callable[[AsyncSession], Awaitable[AttendanceRecord]]
+
+# Upper bounds of the batch size histogram buckets
+BATCH_SIZE_BUCKETS: Tuple[int, ...] = (1, 2, 5, 10, 25, 50, 100, 250)
+
+
+@dataclass
+class _PendingEvent:
+    work: ClockWork
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class ClockIngestQueue:
+    """Single-flusher batching queue with batch size and latency counters."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        max_batch: int,
+        flush_interval_ms: float,
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max(max_batch, 1)
+        self.flush_interval = flush_interval_ms / 1000
+        self._queue: "asyncio.Queue[Optional[_PendingEvent]]" = asyncio.Queue()
+        self._runner: Optional[asyncio.Task] = None
+        self._batches = 0
+        self._events = 0
+        self._failed_events = 0
+        self._failed_batches = 0
+        self._max_batch_seen = 0
+        self._batch_sizes: List[int] = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self._total_wait_ms = 0.0
+        self._flush_latency = PoolWaitHistogram()
+
+    async def submit(self, work: ClockWork) -> AttendanceRecord:
+        """Queue a clock event and wait until its batch has committed.
+
+        Raises whatever ``work`` raised for this event, or the commit error
+        if the whole batch failed.
+        """
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_PendingEvent(work, future, time.perf_counter()))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            stopping = False
+            while len(batch) < self.max_batch:
+                try:
+                    if self._queue.empty():
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        event = await asyncio.wait_for(self._queue.get(), timeout)
+                    else:
+                        event = self._queue.get_nowait()
+                except asyncio.TimeoutError:
+                    break
+                if event is None:
+                    stopping = True
+                    break
+                batch.append(event)
+            try:
+                await self._flush(batch)
+            except Exception:
+                logger.exception("Clock ingest flush crashed")
+                for event in batch:
+                    if not event.future.done():
+                        event.future.set_exception(RuntimeError("Clock event was not saved"))
+            if stopping:
+                return
+
+    async def _flush(self, batch: List[_PendingEvent]) -> None:
+        started = time.perf_counter()
+        applied: List[Tuple[_PendingEvent, AttendanceRecord]] = []
+        failed = 0
+        async with self.session_factory() as session:
+            for event in batch:
+                try:
+                    async with session.begin_nested():
+                        record = await event.work(session)
+                    applied.append((event, record))
+                except Exception as e:
+                    failed += 1
+                    if not event.future.done():
+                        event.future.set_exception(e)
+
+            if applied:
+                try:
+                    await session.commit()
+                    # One SELECT refreshes server defaults for every record in the batch
+                    await session.execute(
+                        select(AttendanceRecord)
+                        .where(AttendanceRecord.id.in_([record.id for _, record in applied]))
+                        .execution_options(populate_existing=True)
+                    )
+                except Exception as e:
+                    await session.rollback()
+                    self._failed_batches += 1
+                    failed += len(applied)
+                    logger.exception("Clock ingest batch commit failed", extra={"events": len(applied)})
+                    for event, _ in applied:
+                        if not event.future.done():
+                            event.future.set_exception(e)
+                    applied = []
+
+        for event, record in applied:
+            if not event.future.done():
+                event.future.set_result(record)
+        self._record_batch(batch, failed, started)
+
+    def _record_batch(self, batch: List[_PendingEvent], failed: int, started: float) -> None:
+        size = len(batch)
+        self._batches += 1
+        self._events += size
+        self._failed_events += failed
+        self._max_batch_seen = max(self._max_batch_seen, size)
+        for i, bound in enumerate(BATCH_SIZE_BUCKETS):
+            if size <= bound:
+                self._batch_sizes[i] += 1
+                break
+        else:
+            self._batch_sizes[-1] += 1
+        self._total_wait_ms += sum((started - event.enqueued_at) * 1000 for event in batch)
+        self._flush_latency.observe((time.perf_counter() - started) * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch size and flush latency counters for the diagnostics endpoint."""
+        labels = [f"le_{b}" for b in BATCH_SIZE_BUCKETS] + [f"gt_{BATCH_SIZE_BUCKETS[-1]}"]
+        latency = self._flush_latency.as_dict()
+        latency.pop("timeouts", None)
+        return {
+            "enabled": get_settings().clock_ingest_batching,
+            "max_batch": self.max_batch,
+            "flush_interval_ms": self.flush_interval * 1000,
+            "queue_depth": self._queue.qsize(),
+            "batches": self._batches,
+            "events": self._events,
+            "failed_events": self._failed_events,
+            "failed_batches": self._failed_batches,
+            "avg_batch_size": round(self._events / self._batches, 2) if self._batches else 0.0,
+            "max_batch_size": self._max_batch_seen,
+            "batch_sizes": dict(zip(labels, self._batch_sizes)),
+            "avg_queue_wait_ms": round(self._total_wait_ms / self._events, 2) if self._events else 0.0,
+            "flush_latency": latency,
+        }
+
+    async def shutdown(self) -> None:
+        """Flush whatever is queued and stop the flusher."""
+        if self._runner is not None and not self._runner.done():
+            await self._queue.put(None)
+            await self._runner
+        self._runner = None
+
+
+# Singleton instance
+_clock_ingest_queue: Optional[ClockIngestQueue] = None
+
+
+def get_clock_ingest_queue() -> ClockIngestQueue:
+    """Get or create the clock ingest queue singleton."""
+    global _clock_ingest_queue
+    if _clock_ingest_queue is None:
+        from app.database import AsyncSessionLocal
+
+        settings = get_settings()
+        _clock_ingest_queue = ClockIngestQueue(
+            AsyncSessionLocal,
+            max_batch=settings.clock_ingest_max_batch,
+            flush_interval_ms=settings.clock_ingest_flush_ms,
+        )
+    return _clock_ingest_queue
+
+
+async def shutdown_clock_ingest_queue() -> None:
+    """Drain the clock ingest queue (call from app shutdown)."""
+    global _clock_ingest_queue
+    if _clock_ingest_queue is not None:
+        await _clock_ingest_queue.shutdown()
+        _clock_ingest_queue = None
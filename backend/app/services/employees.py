@@ -9,7 +9,9 @@ from fastapi import HTTPException, UploadFile, status
 import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.principal import invalidate_principal
 from app.core.config import get_settings
+from app.core.hashing import get_hashing_executor
 from app.models.employee import Employee
 from app.repositories.employees import EmployeeRepository
 from app.schemas.employee import (
@@ -52,6 +54,16 @@ def verify_password(password: str, hashed: str) -> bool:
         return False
 
 
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the bounded hashing executor."""
+    return await get_hashing_executor().run(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    """Verify a password on the bounded hashing executor."""
+    return await get_hashing_executor().run(verify_password, password, hashed)
+
+
 def dob_to_password(dob: date) -> str:
     """Convert DOB to initial password format DDMMYYYY."""
     return dob.strftime("%d%m%Y")
@@ -118,7 +130,7 @@ class EmployeeService:
                 detail="Account is deactivated",
             )
         
-        if not verify_password(request.password, employee.password_hash):
+        if not await verify_password_async(request.password, employee.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid employee ID or password",
@@ -151,13 +163,13 @@ class EmployeeService:
                 detail="Employee not found",
             )
         
-        if not verify_password(request.current_password, employee.password_hash):
+        if not await verify_password_async(request.current_password, employee.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Current password is incorrect",
             )
         
-        new_hash = hash_password(request.new_password)
+        new_hash = await hash_password_async(request.new_password)
         result = await self._repo.update_password(session, employee_id, new_hash)
         await session.commit()
         return result
@@ -175,7 +187,7 @@ class EmployeeService:
             )
         
         dob_password = dob_to_password(employee.date_of_birth)
-        dob_hash = hash_password(dob_password)
+        dob_hash = await hash_password_async(dob_password)
         result = await self._repo.reset_password_to_dob(session, employee_id, dob_hash)
         await session.commit()
         return result
@@ -191,7 +203,7 @@ class EmployeeService:
             )
         
         initial_password = dob_to_password(data.date_of_birth)
-        password_hash = hash_password(initial_password)
+        password_hash = await hash_password_async(initial_password)
         
         employee = await self._repo.create(
             session,
@@ -274,7 +286,7 @@ class EmployeeService:
                         continue
                     
                     # Create employee with all Baynunah fields
-                    password_hash = hash_password(dob.strftime("%d%m%Y"))
+                    password_hash = await hash_password_async(dob.strftime("%d%m%Y"))
                     
                     employee = Employee(
                         employee_id=employee_id,
@@ -489,6 +501,8 @@ class EmployeeService:
             )
         result = await self._repo.deactivate(session, employee_id)
         await session.commit()
+        # Again after commit, so a request that re-cached the old row is not kept
+        invalidate_principal(employee_id)
         return result
 
     async def get_employee(
@@ -529,6 +543,8 @@ class EmployeeService:
                 detail="Employee not found after update",
             )
         await session.commit()
+        # Again after commit, so a request that re-cached the old row is not kept
+        invalidate_principal(employee_id)
         await session.refresh(employee)
         return employee
 
@@ -621,6 +637,7 @@ class EmployeeService:
         not_found = 0
         skipped = 0
         errors = []
+        changed_employee_ids = []
         
         # Field mappings for each layer
         employee_fields = {
@@ -694,6 +711,7 @@ class EmployeeService:
                         if employee_data:
                             for field, value in employee_data.items():
                                 setattr(employee, field, value)
+                            changed_employee_ids.append(employee_id)
                             any_updated = True
                     
                     # Update compliance layer
@@ -758,6 +776,8 @@ class EmployeeService:
                 errors.append(f"Row {row_num}: {str(e)}")
         
         await session.commit()
+        for employee_id in changed_employee_ids:
+            invalidate_principal(employee_id)
         
         return {
             "updated": updated,
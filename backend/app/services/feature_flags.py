@@ -0,0 +1,79 @@
+"""Process-wide snapshot of feature toggles.
+
+Toggle checks sit on hot paths such as clock-in, which used to issue one
+SystemSetting query per flag per request. Each worker now keeps the whole
+toggle table in a dict and only re-reads it when the settings version row
+changes. Writes through SystemSettingsRepository bump that version in the
+same transaction. The writing worker refreshes right after commit, and
+other workers pick the change up on their next poll.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.repositories.system_settings import SystemSettingsRepository
+
+logger = logging.getLogger(__name__)
+
+
+class FeatureFlagSnapshot:
+    """Cached toggle map with cheap version polling."""
+
+    def __init__(self, repo: SystemSettingsRepository, poll_seconds: float):
+        self._repo = repo
+        self.poll_seconds = poll_seconds
+        self._flags: Dict[str, bool] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._version
+
+    def invalidate(self) -> None:
+        """Force a reload on the next lookup (call after committing toggle writes)."""
+        self._version = None
+        self._checked_at = 0.0
+
+    async def is_enabled(
+        self, session: AsyncSession, key: str, default: bool = True
+    ) -> bool:
+        """Look up a toggle, refreshing the snapshot only if the version moved."""
+        if self._version is None or time.monotonic() - self._checked_at >= self.poll_seconds:
+            await self._refresh(session)
+        return self._flags.get(key, default)
+
+    async def _refresh(self, session: AsyncSession) -> None:
+        async with self._lock:
+            # Another request may have refreshed while we waited for the lock
+            if self._version is not None and time.monotonic() - self._checked_at < self.poll_seconds:
+                return
+            version = await self._repo.get_version(session)
+            if version != self._version:
+                self._flags = await self._repo.get_toggle_map(session)
+                logger.debug(
+                    "Feature flag snapshot reloaded",
+                    extra={"version": version, "flags": len(self._flags)},
+                )
+            self._version = version
+            self._checked_at = time.monotonic()
+
+
+# Singleton instance
+_feature_flags: Optional[FeatureFlagSnapshot] = None
+
+
+def get_feature_flags() -> FeatureFlagSnapshot:
+    """Get or create the feature flag snapshot singleton."""
+    global _feature_flags
+    if _feature_flags is None:
+        _feature_flags = FeatureFlagSnapshot(
+            SystemSettingsRepository(),
+            poll_seconds=get_settings().feature_flag_poll_seconds,
+        )
+    return _feature_flags
@@ -0,0 +1,198 @@
+"""Batch geofence audit over historical clock-in coordinates.
+
+Records with clock-in GPS are read in id-ordered chunks. For each chunk,
+one vectorized haversine call gives a records x geofences distance matrix.
+A record whose work_location names a geofence is judged against that
+geofence. Any other record is judged against all of them, as
+validate_geofence does. Flags are written back with a single executemany
+UPDATE per chunk. Audits run in the background and report progress
+through the shared job store, like bulk timesheet jobs.
+"""
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.time import get_utc_now
+from app.models.attendance import AttendanceRecord
+from app.services.geofence_index import GeofenceEntry, get_geofence_index
+from app.services.job_store import JobStore
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_METERS = 6371000.0
+
+
+def haversine_matrix(
+    lats: np.ndarray, lons: np.ndarray, fence_lats: np.ndarray, fence_lons: np.ndarray
+) -> np.ndarray:
+    """Great-circle distances in metres, shape ``(len(lats), len(fence_lats))``."""
+    phi1 = np.radians(lats)[:, None]
+    phi2 = np.radians(fence_lats)[None, :]
+    d_phi = phi2 - phi1
+    d_lambda = np.radians(fence_lons)[None, :] - np.radians(lons)[:, None]
+    a = np.sin(d_phi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def audit_points(
+    lats: np.ndarray,
+    lons: np.ndarray,
+    locations: Sequence[Optional[str]],
+    fences: Sequence[GeofenceEntry],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Out-of-zone flags and the distance each judgement was based on.
+
+    A record whose location names a geofence is flagged when it is outside
+    that geofence, and the distance is to its centre. Any other record is
+    flagged when it is outside every geofence. Its distance is to the
+    nearest geofence that contains it, or to the nearest centre otherwise.
+    """
+    distances = haversine_matrix(
+        lats,
+        lons,
+        np.array([float(f.latitude) for f in fences]),
+        np.array([float(f.longitude) for f in fences]),
+    )
+    inside = distances <= np.array([f.radius_meters for f in fences], dtype=float)[None, :]
+
+    column_of = {f.name: j for j, f in enumerate(fences)}
+    named = np.array([column_of.get(location, -1) for location in locations], dtype=np.int64)
+    rows = np.arange(len(named))
+    has_named = named >= 0
+    target = np.where(has_named, named, 0)
+
+    any_inside = inside.any(axis=1)
+    contained = np.where(inside, distances, np.inf).min(axis=1)
+    nearest = np.where(any_inside, contained, distances.min(axis=1))
+
+    flagged = np.where(has_named, ~inside[rows, target], ~any_inside)
+    distance = np.where(has_named, distances[rows, target], nearest)
+    return flagged, distance
+
+
+@dataclass
+class GeofenceAuditJob:
+    """Progress of one audit run."""
+
+    id: str
+    start_date: date
+    end_date: date
+    work_location: Optional[str] = None
+    status: str = "queued"  # queued, running, completed, failed
+    total: int = 0
+    processed: int = 0
+    flagged: int = 0
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=get_utc_now)
+    finished_at: Optional[datetime] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# Singleton instance
+_audit_jobs: Optional[JobStore[GeofenceAuditJob]] = None
+
+
+def get_geofence_audit_jobs() -> JobStore[GeofenceAuditJob]:
+    """Get or create the geofence audit job store singleton."""
+    global _audit_jobs
+    if _audit_jobs is None:
+        _audit_jobs = JobStore("geofence_audit", GeofenceAuditJob)
+    return _audit_jobs
+
+
+async def run_geofence_audit(session: AsyncSession, job: GeofenceAuditJob) -> GeofenceAuditJob:
+    """Audit every clock-in with GPS coordinates in the job's date range.
+
+    Chunks of ``geofence_audit_chunk_size`` records are read by id and
+    flagged, and each chunk is committed on its own with the job's progress.
+    Fails the job if no active geofences exist.
+    """
+    started = time.perf_counter()
+    jobs = get_geofence_audit_jobs()
+    job.status = "running"
+    record = AttendanceRecord
+    try:
+        await jobs.save(session, job)
+        fences: List[GeofenceEntry] = (await get_geofence_index(session)).entries
+        if not fences:
+            raise ValueError("No active geofences configured")
+
+        conditions = [
+            record.attendance_date >= job.start_date,
+            record.attendance_date <= job.end_date,
+            record.clock_in_latitude.isnot(None),
+            record.clock_in_longitude.isnot(None),
+        ]
+        if job.work_location:
+            conditions.append(record.work_location == job.work_location)
+        job.total = (await session.execute(select(func.count(record.id)).where(*conditions))).scalar() or 0
+
+        chunk_size = get_settings().geofence_audit_chunk_size
+        last_id = 0
+        while True:
+            result = await session.execute(
+                select(record.id, record.clock_in_latitude, record.clock_in_longitude, record.work_location)
+                .where(*conditions, record.id > last_id)
+                .order_by(record.id)
+                .limit(chunk_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+
+            flagged, distance = audit_points(
+                np.array([float(r[1]) for r in rows]),
+                np.array([float(r[2]) for r in rows]),
+                [r[3] for r in rows],
+                fences,
+            )
+            audited_at = get_utc_now()
+            await session.execute(
+                update(AttendanceRecord),
+                [
+                    {
+                        "id": row[0],
+                        "geofence_flagged": bool(is_flagged),
+                        "geofence_distance_meters": Decimal(f"{meters:.1f}"),
+                        "geofence_audited_at": audited_at,
+                    }
+                    for row, is_flagged, meters in zip(rows, flagged, distance)
+                ],
+            )
+
+            last_id = rows[-1][0]
+            job.processed += len(rows)
+            job.flagged += int(flagged.sum())
+            await jobs.save(session, job)
+
+        job.status = "completed"
+    except Exception as e:
+        await session.rollback()
+        job.status = "failed"
+        job.error = str(e)
+        logger.exception("Geofence audit failed", extra={"job_id": job.id})
+    finally:
+        job.finished_at = get_utc_now()
+    await jobs.save(session, job)
+
+    logger.info(
+        "Geofence audit finished",
+        extra={
+            "job_id": job.id,
+            "status": job.status,
+            "processed": job.processed,
+            "flagged": job.flagged,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+    )
+    return job
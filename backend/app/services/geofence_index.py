@@ -0,0 +1,216 @@
+"""In-memory grid index over active geofences.
+
+Active geofences are loaded once per worker and bucketed into a lat/lon grid.
+Each geofence is added to every cell that its circle's bounding box
+overlaps. A containment check reads one cell. A radius query reads only
+the cells covering the search box, and a nearest query widens the radius
+until it finds a hit. Cell counts are worked out from the box corners
+before any cell is listed: a box larger than the populated grid, or one
+crossing the antimeridian, is answered by scanning the entries instead.
+Haversine runs only on those candidates. Geofence writes invalidate the
+local index, and other workers pick changes up when their TTL expires.
+"""
+import asyncio
+import math
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.geofence import Geofence, haversine_distance
+
+# Metres per degree of latitude (and of longitude at the equator)
+METERS_PER_DEGREE = 111_320.0
+
+# No two points on the haversine sphere are further apart than this
+MAX_SURFACE_DISTANCE = math.pi * 6_371_000
+
+# A geofence whose bounding box spans more cells than this is not bucketed
+MAX_CELLS_PER_GEOFENCE = 10_000
+
+Cell = Tuple[int, int]
+# (lat_lo, lon_lo, lat_hi, lon_hi) cell indices, inclusive
+CellBox = Tuple[int, int, int, int]
+
+
+@dataclass(frozen=True)
+class GeofenceEntry:
+    """The fields of an active geofence needed for validation."""
+
+    id: int
+    name: str
+    latitude: Decimal
+    longitude: Decimal
+    radius_meters: int
+    validation_required: bool
+
+    def distance_to(self, lat: float, lon: float) -> float:
+        return haversine_distance(lat, lon, float(self.latitude), float(self.longitude))
+
+
+def _degree_span(lat: float, meters: float) -> Tuple[float, float]:
+    """Half-widths in degrees (lat, lon) of a box ``meters`` around ``lat``."""
+    cos_lat = max(math.cos(math.radians(lat)), 0.01)
+    return meters / METERS_PER_DEGREE, meters / (METERS_PER_DEGREE * cos_lat)
+
+
+def _box_size(box: CellBox) -> int:
+    lat_lo, lon_lo, lat_hi, lon_hi = box
+    return (lat_hi - lat_lo + 1) * (lon_hi - lon_lo + 1)
+
+
+def _box_cells(box: CellBox) -> Iterator[Cell]:
+    lat_lo, lon_lo, lat_hi, lon_hi = box
+    return ((i, j) for i in range(lat_lo, lat_hi + 1) for j in range(lon_lo, lon_hi + 1))
+
+
+class GeofenceIndex:
+    """Grid bucket map from cell to the geofences whose circle may reach it."""
+
+    def __init__(self, entries: Iterable[GeofenceEntry], cell_degrees: float):
+        self.cell_degrees = cell_degrees
+        self.entries: List[GeofenceEntry] = list(entries)
+        self._by_name: Dict[str, GeofenceEntry] = {e.name: e for e in self.entries}
+        self._cells: Dict[Cell, List[GeofenceEntry]] = {}
+        # Circles too large to bucket, checked on every lookup
+        self._wide: List[GeofenceEntry] = []
+        for entry in self.entries:
+            lat, lon = float(entry.latitude), float(entry.longitude)
+            box = self._cell_box(lat, lon, entry.radius_meters)
+            if box is None or _box_size(box) > MAX_CELLS_PER_GEOFENCE:
+                self._wide.append(entry)
+                continue
+            for cell in _box_cells(box):
+                self._cells.setdefault(cell, []).append(entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _cell(self, lat: float, lon: float) -> Cell:
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def _cell_box(self, lat: float, lon: float, meters: float) -> Optional[CellBox]:
+        """Corner cells of a box ``meters`` around the point, or None if it crosses the antimeridian."""
+        d_lat, d_lon = _degree_span(lat, meters)
+        if lon - d_lon < -180.0 or lon + d_lon > 180.0:
+            return None
+        lat_lo, lon_lo = self._cell(max(lat - d_lat, -90.0), lon - d_lon)
+        lat_hi, lon_hi = self._cell(min(lat + d_lat, 90.0), lon + d_lon)
+        return lat_lo, lon_lo, lat_hi, lon_hi
+
+    def by_name(self, name: str) -> Optional[GeofenceEntry]:
+        return self._by_name.get(name)
+
+    def containing(self, lat: float, lon: float) -> List[Tuple[GeofenceEntry, float]]:
+        """Geofences whose radius covers the point, nearest first."""
+        matches = []
+        for entry in [*self._cells.get(self._cell(lat, lon), ()), *self._wide]:
+            distance = entry.distance_to(lat, lon)
+            if distance <= entry.radius_meters:
+                matches.append((entry, distance))
+        matches.sort(key=lambda m: m[1])
+        return matches
+
+    def within(self, lat: float, lon: float, max_distance: float) -> List[Tuple[GeofenceEntry, float]]:
+        """Geofences whose centre is within ``max_distance`` metres, nearest first."""
+        box = self._cell_box(lat, lon, max_distance)
+        if box is None or _box_size(box) > len(self._cells):
+            # Search box is wider than the populated grid; a scan is cheaper
+            candidates: Iterable[GeofenceEntry] = self.entries
+        else:
+            seen: Set[int] = set()
+            candidates = [
+                entry
+                for cell in _box_cells(box)
+                for entry in [*self._cells.get(cell, ()), *self._wide]
+                if not (entry.id in seen or seen.add(entry.id))
+            ]
+        matches = []
+        for entry in candidates:
+            distance = entry.distance_to(lat, lon)
+            if distance <= max_distance:
+                matches.append((entry, distance))
+        matches.sort(key=lambda m: m[1])
+        return matches
+
+    def nearest(self, lat: float, lon: float) -> Optional[Tuple[GeofenceEntry, float]]:
+        """Geofence with the closest centre, widening the search until one is found."""
+        if not self.entries:
+            return None
+        radius = self.cell_degrees * METERS_PER_DEGREE
+        while radius < MAX_SURFACE_DISTANCE:
+            matches = self.within(lat, lon, radius)
+            if matches:
+                return matches[0]
+            radius *= 4
+        return min(((e, e.distance_to(lat, lon)) for e in self.entries), key=lambda m: m[1])
+
+
+async def load_geofence_index(session: AsyncSession) -> GeofenceIndex:
+    """Build an index from all active geofences."""
+    result = await session.execute(
+        select(
+            Geofence.id,
+            Geofence.name,
+            Geofence.latitude,
+            Geofence.longitude,
+            Geofence.radius_meters,
+            Geofence.validation_required,
+        ).where(Geofence.is_active == True)
+    )
+    return GeofenceIndex(
+        (GeofenceEntry(*row) for row in result.all()),
+        get_settings().geofence_grid_cell_degrees,
+    )
+
+
+class GeofenceIndexCache:
+    """Per-worker index snapshot, reloaded on invalidate() or after the TTL."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._index: Optional[GeofenceIndex] = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> Optional[GeofenceIndex]:
+        if self._index is None or time.monotonic() - self._loaded_at >= self.ttl_seconds:
+            return None
+        return self._index
+
+    async def get(self, session: AsyncSession) -> GeofenceIndex:
+        index = self._fresh()
+        if index is not None:
+            return index
+        async with self._lock:
+            index = self._fresh()
+            if index is None:
+                index = await load_geofence_index(session)
+                self._index = index
+                self._loaded_at = time.monotonic()
+            return index
+
+    def invalidate(self) -> None:
+        """Drop the snapshot (call after committing geofence changes)."""
+        self._index = None
+
+
+# Singleton instance
+_geofence_cache: Optional[GeofenceIndexCache] = None
+
+
+def get_geofence_cache() -> GeofenceIndexCache:
+    """Get or create the geofence index cache singleton."""
+    global _geofence_cache
+    if _geofence_cache is None:
+        _geofence_cache = GeofenceIndexCache(get_settings().geofence_index_ttl_seconds)
+    return _geofence_cache
+
+
+async def get_geofence_index(session: AsyncSession) -> GeofenceIndex:
+    """Current geofence index, loading it on first use."""
+    return await get_geofence_cache().get(session)
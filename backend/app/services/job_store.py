@@ -0,0 +1,71 @@
+"""Background job progress shared by every worker process.
+
+The app runs under several gunicorn workers, so a job started by one
+worker is usually polled through another. Each job is a dataclass. Its
+fields are stored as JSON in ``background_jobs``, and that row is written
+when the job is created and again as it progresses. Reads always go
+through the database, never process memory. Only the newest ``max_jobs``
+of each kind are kept.
+"""
+import uuid
+from typing import Any, Generic, Optional, Type, TypeVar
+
+from pydantic import TypeAdapter
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.time import get_utc_now
+from app.models.background_job import BackgroundJob
+
+J = TypeVar("J")
+
+
+class JobStore(Generic[J]):
+    """Creates, saves and loads one kind of job dataclass."""
+
+    def __init__(self, kind: str, job_type: Type[J], max_jobs: int = 20):
+        self.kind = kind
+        self.job_type = job_type
+        self.max_jobs = max_jobs
+        self._adapter = TypeAdapter(job_type)
+
+    def _state(self, job: J) -> dict:
+        return self._adapter.dump_python(job, mode="json")
+
+    async def create(self, session: AsyncSession, **params: Any) -> J:
+        """Store a new queued job and drop the oldest beyond ``max_jobs``."""
+        job = self.job_type(id=uuid.uuid4().hex, **params)
+        session.add(BackgroundJob(
+            id=job.id, kind=self.kind, status=job.status, state=self._state(job), created_at=job.created_at
+        ))
+        await session.flush()
+        newest = (
+            select(BackgroundJob.id)
+            .where(BackgroundJob.kind == self.kind)
+            .order_by(BackgroundJob.created_at.desc(), BackgroundJob.id.desc())
+            .limit(self.max_jobs)
+        )
+        await session.execute(
+            delete(BackgroundJob)
+            .where(BackgroundJob.kind == self.kind, BackgroundJob.id.not_in(newest.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        return job
+
+    async def save(self, session: AsyncSession, job: J) -> None:
+        """Write the job's current fields and commit."""
+        await session.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job.id)
+            .values(status=job.status, state=self._state(job), updated_at=get_utc_now())
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+    async def get(self, session: AsyncSession, job_id: str) -> Optional[J]:
+        result = await session.execute(
+            select(BackgroundJob.state).where(BackgroundJob.id == job_id, BackgroundJob.kind == self.kind)
+        )
+        state = result.scalar_one_or_none()
+        return None if state is None else self._adapter.validate_python(state)
@@ -0,0 +1,139 @@
+"""Team availability matrix for the leave heatmap.
+
+Absence is computed from three small queries: employees in scope, their
+approved leave overlapping the window, and the cached holiday calendar.
+Leave intervals become day offsets. A difference array per employee is
+accumulated with ``np.add.at`` and prefix-summed, which gives an
+employee x day coverage matrix. Each employee is counted once even when
+their requests overlap. Rows are then summed into their department or
+manager group. No per-leave or per-day Python loop touches the intervals.
+"""
+from datetime import date, timedelta
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.employee import Employee
+from app.models.leave import LeaveRequest
+from app.schemas.leave import LeaveAvailabilityGroup, LeaveAvailabilityMatrix
+from app.services.business_calendar import get_business_calendar
+
+GROUP_BY_OPTIONS = ("department", "manager")
+
+# Group for employees with no department / line manager
+UNSPECIFIED_GROUP = "Unspecified"
+
+
+def absence_matrix(
+    num_days: int,
+    num_groups: int,
+    employee_groups: np.ndarray,
+    leave_rows: np.ndarray,
+    leave_starts: np.ndarray,
+    leave_ends: np.ndarray,
+) -> np.ndarray:
+    """Employees absent per group and day.
+
+    ``employee_groups[i]`` is the group index of employee row ``i``. Each
+    leave is given by the employee row it belongs to and inclusive start/end
+    day offsets into the window; offsets outside ``[0, num_days)`` are
+    clamped. Returns an int array of shape ``(num_groups, num_days)``.
+    """
+    diff = np.zeros((len(employee_groups), num_days + 1), dtype=np.int32)
+    starts = np.clip(leave_starts, 0, num_days - 1)
+    ends = np.clip(leave_ends, 0, num_days - 1) + 1
+    np.add.at(diff, (leave_rows, starts), 1)
+    np.add.at(diff, (leave_rows, ends), -1)
+    covered = np.cumsum(diff[:, :num_days], axis=1) > 0
+
+    counts = np.zeros((num_groups, num_days), dtype=np.int64)
+    np.add.at(counts, employee_groups, covered)
+    return counts
+
+
+def _day_offsets(values: List[date], start_date: date) -> np.ndarray:
+    days = np.array(values, dtype="datetime64[D]")
+    return (days - np.datetime64(start_date, "D")).astype(np.int64)
+
+
+async def build_availability_matrix(
+    session: AsyncSession,
+    start_date: date,
+    end_date: date,
+    group_by: str = "department",
+    department: Optional[str] = None,
+    manager_id: Optional[int] = None,
+) -> LeaveAvailabilityMatrix:
+    """Per-day absence counts and percentages for active employees, grouped."""
+    num_days = (end_date - start_date).days + 1
+
+    employees = select(Employee.id).where(Employee.is_active == True)
+    if department:
+        employees = employees.where(Employee.department == department)
+    if manager_id is not None:
+        employees = employees.where(Employee.line_manager_id == manager_id)
+    group_column = Employee.department if group_by == "department" else Employee.line_manager_id
+
+    employee_result = await session.execute(
+        employees.add_columns(group_column).order_by(Employee.id)
+    )
+    employee_rows = employee_result.all()
+    employee_ids = np.array([row[0] for row in employee_rows], dtype=np.int64)
+    group_keys = np.array(
+        [UNSPECIFIED_GROUP if row[1] is None else str(row[1]) for row in employee_rows], dtype=object
+    )
+    keys, employee_groups = np.unique(group_keys, return_inverse=True)
+
+    leave_result = await session.execute(
+        select(LeaveRequest.employee_id, LeaveRequest.start_date, LeaveRequest.end_date).where(
+            LeaveRequest.status == "approved",
+            LeaveRequest.start_date <= end_date,
+            LeaveRequest.end_date >= start_date,
+            LeaveRequest.employee_id.in_(employees),
+        )
+    )
+    leaves = leave_result.all()
+    counts = absence_matrix(
+        num_days,
+        len(keys),
+        employee_groups,
+        np.searchsorted(employee_ids, np.array([row[0] for row in leaves], dtype=np.int64)),
+        _day_offsets([row[1] for row in leaves], start_date),
+        _day_offsets([row[2] for row in leaves], start_date),
+    )
+    headcounts = np.bincount(employee_groups, minlength=len(keys))
+
+    labels = {key: key for key in keys}
+    if group_by == "manager":
+        manager_ids = [int(key) for key in keys if key != UNSPECIFIED_GROUP]
+        name_result = await session.execute(
+            select(Employee.id, Employee.name).where(Employee.id.in_(manager_ids))
+        )
+        labels.update({str(manager_id): name for manager_id, name in name_result})
+
+    percentages = np.round(counts * 100.0 / np.maximum(headcounts, 1)[:, None], 1)
+
+    calendar = await get_business_calendar(session)
+    holiday_offsets = [
+        offset for offset in range(num_days)
+        if calendar.is_holiday(start_date + timedelta(days=offset))
+    ]
+
+    return LeaveAvailabilityMatrix(
+        start_date=start_date,
+        end_date=end_date,
+        group_by=group_by,
+        holiday_offsets=holiday_offsets,
+        groups=[
+            LeaveAvailabilityGroup(
+                key=key,
+                label=labels[key],
+                headcount=int(headcounts[i]),
+                absent=counts[i].tolist(),
+                absent_pct=percentages[i].tolist(),
+            )
+            for i, key in enumerate(keys)
+        ],
+    )
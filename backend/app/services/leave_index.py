@@ -0,0 +1,110 @@
+"""Interval index over approved leave for bulk "who is on leave" lookups.
+
+Each request or job loads the approved leave overlapping its date window with
+one range query. One pass over the intervals, sorted by start date and
+clamped to the window, then builds per-day membership. After that, asking
+who is on leave on a day, whether a given employee is, or how many are, is
+a dict lookup. This replaces one range query per employee per date.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.employee import Employee
+from app.models.leave import LeaveRequest
+
+
+@dataclass(frozen=True)
+class LeaveInterval:
+    """One approved leave request, inclusive of both dates."""
+
+    employee_id: int
+    employee_name: str
+    leave_type: str
+    start_date: date
+    end_date: date
+    is_half_day: bool
+
+
+class LeaveIntervalIndex:
+    """Per-day view of approved leave inside a fixed date window."""
+
+    def __init__(self, intervals: Iterable[LeaveInterval], window_start: date, window_end: date):
+        self.window_start = window_start
+        self.window_end = window_end
+        self.intervals: List[LeaveInterval] = sorted(
+            intervals, key=lambda i: (i.start_date, i.employee_id)
+        )
+        self._by_day: Dict[date, Dict[int, LeaveInterval]] = {}
+        self._sweep()
+
+    def _sweep(self) -> None:
+        # Intervals are visited in start order, so when an employee has
+        # overlapping requests the earliest-starting one wins for each day.
+        for interval in self.intervals:
+            day = max(interval.start_date, self.window_start)
+            last = min(interval.end_date, self.window_end)
+            while day <= last:
+                self._by_day.setdefault(day, {}).setdefault(interval.employee_id, interval)
+                day += timedelta(days=1)
+
+    def _check_window(self, check_date: date) -> None:
+        if not self.window_start <= check_date <= self.window_end:
+            raise ValueError(f"{check_date} is outside the loaded window")
+
+    def employees_on_leave(self, check_date: date) -> FrozenSet[int]:
+        """Ids of employees on approved leave on ``check_date``."""
+        self._check_window(check_date)
+        return frozenset(self._by_day.get(check_date, ()))
+
+    def leave_for(self, employee_id: int, check_date: date) -> Optional[LeaveInterval]:
+        """The leave covering an employee on a day, if any."""
+        self._check_window(check_date)
+        return self._by_day.get(check_date, {}).get(employee_id)
+
+    def is_on_leave(self, employee_id: int, check_date: date) -> bool:
+        return self.leave_for(employee_id, check_date) is not None
+
+    def daily_counts(self) -> Dict[date, int]:
+        """Employees on leave for every day in the window (zero days included)."""
+        counts: Dict[date, int] = {}
+        day = self.window_start
+        while day <= self.window_end:
+            counts[day] = len(self._by_day.get(day, ()))
+            day += timedelta(days=1)
+        return counts
+
+
+async def load_leave_index(
+    session: AsyncSession,
+    window_start: date,
+    window_end: Optional[date] = None,
+    employee_ids: Optional[Iterable[int]] = None,
+) -> LeaveIntervalIndex:
+    """Load approved leave overlapping the window with a single query."""
+    window_end = window_end or window_start
+    query = (
+        select(
+            LeaveRequest.employee_id,
+            Employee.name,
+            LeaveRequest.leave_type,
+            LeaveRequest.start_date,
+            LeaveRequest.end_date,
+            LeaveRequest.is_half_day,
+        )
+        .join(Employee, LeaveRequest.employee_id == Employee.id)
+        .where(
+            LeaveRequest.status == "approved",
+            LeaveRequest.start_date <= window_end,
+            LeaveRequest.end_date >= window_start,
+        )
+    )
+    if employee_ids is not None:
+        query = query.where(LeaveRequest.employee_id.in_(list(employee_ids)))
+    result = await session.execute(query)
+    return LeaveIntervalIndex(
+        (LeaveInterval(*row) for row in result.all()), window_start, window_end
+    )
@@ -0,0 +1,336 @@
+"""Batch builder for the 10:00 AM manager attendance summary.
+
+All teams are summarised from one query, active employees LEFT JOIN today's
+attendance record, plus the day's leave interval index. Rows are grouped by
+line_manager_id in memory, and the managers themselves are loaded in a
+second query. The same core backs GET /attendance/manager-daily-summary, so
+the API and the email agree. The email HTML comes from templates compiled
+once at import time. Emails are sent concurrently, with a semaphore capping
+how many SMTP connections are open at once.
+"""
+import asyncio
+import html
+import logging
+import time
+from datetime import date
+from string import Template
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.time import get_uae_today, to_uae
+from app.models.attendance import AttendanceRecord
+from app.models.employee import Employee
+from app.schemas.attendance import ManagerDailySummary, ManagerDailySummaryRow
+from app.services.email_service import get_email_service
+from app.services.leave_index import load_leave_index
+
+logger = logging.getLogger(__name__)
+
+STATUS_PRESENT = "Present"
+STATUS_ON_LEAVE = "On Leave"
+STATUS_NOT_CHECKED_IN = "Not Checked In"
+
+STATUS_COLORS = {
+    STATUS_PRESENT: "#22c55e",
+    STATUS_ON_LEAVE: "#3b82f6",
+    STATUS_NOT_CHECKED_IN: "#ef4444",
+}
+
+
+def _summarise_member(
+    name: str,
+    clock_in,
+    record_status: Optional[str],
+    work_location: Optional[str],
+    location_remarks: Optional[str],
+    wfh_approval_confirmed: Optional[bool],
+    notes: Optional[str],
+    leave_type: Optional[str],
+) -> ManagerDailySummaryRow:
+    """Classify one team member from their joined attendance/leave columns."""
+    if leave_type:
+        return ManagerDailySummaryRow(
+            employee_name=name,
+            status=STATUS_ON_LEAVE,
+            remarks=leave_type.replace("_", " ").title(),
+        )
+    if clock_in is None:
+        return ManagerDailySummaryRow(
+            employee_name=name, status=STATUS_NOT_CHECKED_IN, remarks="—"
+        )
+    if record_status == "on-leave":
+        return ManagerDailySummaryRow(
+            employee_name=name, status=STATUS_ON_LEAVE, remarks=notes or "Leave"
+        )
+
+    remarks = location_remarks
+    if work_location == "Work From Home":
+        approval = "Approved" if wfh_approval_confirmed else "Not Approved"
+        remarks = f"{approval} - {remarks}" if remarks else approval
+    return ManagerDailySummaryRow(
+        employee_name=name,
+        status=STATUS_PRESENT,
+        work_location=work_location,
+        last_update=to_uae(clock_in).strftime("%H:%M"),
+        remarks=remarks or "—",
+    )
+
+
+async def load_team_rows(
+    session: AsyncSession,
+    summary_date: date,
+    manager_ids: Optional[Iterable[int]] = None,
+) -> Dict[int, List[ManagerDailySummaryRow]]:
+    """Classify every active direct report from one LEFT JOIN query.
+
+    Returns summary rows grouped by line_manager_id (restricted to
+    ``manager_ids`` when given).
+    """
+    conditions = [Employee.is_active == True, Employee.line_manager_id.isnot(None)]
+    if manager_ids is not None:
+        conditions.append(Employee.line_manager_id.in_(list(manager_ids)))
+
+    result = await session.execute(
+        select(
+            Employee.id,
+            Employee.line_manager_id,
+            Employee.name,
+            AttendanceRecord.clock_in,
+            AttendanceRecord.status,
+            AttendanceRecord.work_location,
+            AttendanceRecord.location_remarks,
+            AttendanceRecord.wfh_approval_confirmed,
+            AttendanceRecord.notes,
+        )
+        .outerjoin(
+            AttendanceRecord,
+            and_(
+                AttendanceRecord.employee_id == Employee.id,
+                AttendanceRecord.attendance_date == summary_date,
+            ),
+        )
+        .where(and_(*conditions))
+        .order_by(Employee.line_manager_id, Employee.name)
+    )
+
+    leave_index = await load_leave_index(session, summary_date)
+
+    rows_by_manager: Dict[int, List[ManagerDailySummaryRow]] = {}
+    for emp_id, line_manager_id, name, *columns in result.all():
+        leave = leave_index.leave_for(emp_id, summary_date)
+        rows_by_manager.setdefault(line_manager_id, []).append(
+            _summarise_member(name, *columns, leave.leave_type if leave else None)
+        )
+    return rows_by_manager
+
+
+def summarise_team(
+    manager_id: int,
+    manager_name: str,
+    summary_date: date,
+    rows: List[ManagerDailySummaryRow],
+) -> ManagerDailySummary:
+    """Wrap a team's rows with the headline counts."""
+    return ManagerDailySummary(
+        manager_id=manager_id,
+        manager_name=manager_name,
+        summary_date=summary_date,
+        team_size=len(rows),
+        present_count=sum(1 for r in rows if r.status == STATUS_PRESENT),
+        on_leave_count=sum(1 for r in rows if r.status == STATUS_ON_LEAVE),
+        not_checked_in_count=sum(1 for r in rows if r.status == STATUS_NOT_CHECKED_IN),
+        wfh_count=sum(1 for r in rows if r.work_location == "Work From Home"),
+        employees=rows,
+    )
+
+
+async def build_manager_summaries(
+    session: AsyncSession,
+    summary_date: Optional[date] = None,
+    manager_ids: Optional[Iterable[int]] = None,
+    manager_roles: Optional[List[str]] = None,
+) -> Dict[int, ManagerDailySummary]:
+    """Build daily summaries for every manager with an active team.
+
+    Args:
+        summary_date: Date to summarise (defaults to today in UAE).
+        manager_ids: Restrict to these managers (default: all).
+        manager_roles: Only include managers holding one of these roles.
+
+    Returns:
+        Mapping of manager id -> summary. Managers without active direct
+        reports are omitted.
+    """
+    today = summary_date or get_uae_today()
+    rows_by_manager = await load_team_rows(session, today, manager_ids)
+    if not rows_by_manager:
+        return {}
+
+    manager_conditions = [Employee.id.in_(list(rows_by_manager))]
+    if manager_roles:
+        manager_conditions.append(Employee.role.in_(manager_roles))
+    manager_result = await session.execute(
+        select(Employee.id, Employee.name).where(and_(*manager_conditions))
+    )
+
+    return {
+        manager_id: summarise_team(manager_id, manager_name, today, rows_by_manager[manager_id])
+        for manager_id, manager_name in manager_result.all()
+    }
+
+
+# ==================== EMAIL TEMPLATES ====================
+
+_ROW_TEMPLATE = Template("""
+                <tr>
+                    <td style="padding: 10px; border: 1px solid #e2e8f0;">$name</td>
+                    <td style="padding: 10px; border: 1px solid #e2e8f0; color: $status_color; font-weight: bold;">$status</td>
+                    <td style="padding: 10px; border: 1px solid #e2e8f0;">$location</td>
+                    <td style="padding: 10px; border: 1px solid #e2e8f0;">$last_update</td>
+                    <td style="padding: 10px; border: 1px solid #e2e8f0;">$remarks</td>
+                </tr>""")
+
+_EMAIL_TEMPLATE = Template("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <style>
+                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+                .container { max-width: 800px; margin: 0 auto; padding: 20px; }
+                .header { background-color: #1e293b; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }
+                .content { background-color: #f8fafc; padding: 20px; border: 1px solid #e2e8f0; }
+                .footer { background-color: #1e293b; color: #94a3b8; padding: 15px; text-align: center; border-radius: 0 0 8px 8px; font-size: 12px; }
+                .summary { display: flex; gap: 20px; margin-bottom: 20px; }
+                .stat { background: white; padding: 15px; border-radius: 8px; text-align: center; flex: 1; box-shadow: 0 1px 3px rgba(0,0,0,0.1); }
+                .stat-value { font-size: 24px; font-weight: bold; }
+                .stat-label { color: #6b7280; font-size: 12px; }
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>📋 Daily Attendance Summary</h1>
+                    <p>$long_date</p>
+                </div>
+                <div class="content">
+                    <p>Good morning $manager_name,</p>
+                    <p>Here's your team's attendance status as of 10:00 AM:</p>
+
+                    <div class="summary">
+                        <div class="stat">
+                            <div class="stat-value" style="color: #22c55e;">$present_count</div>
+                            <div class="stat-label">Present</div>
+                        </div>
+                        <div class="stat">
+                            <div class="stat-value" style="color: #3b82f6;">$leave_count</div>
+                            <div class="stat-label">On Leave</div>
+                        </div>
+                        <div class="stat">
+                            <div class="stat-value" style="color: #ef4444;">$not_in_count</div>
+                            <div class="stat-label">Not Checked In</div>
+                        </div>
+                        <div class="stat">
+                            <div class="stat-value">$team_size</div>
+                            <div class="stat-label">Total Team</div>
+                        </div>
+                    </div>
+
+        <table style="border-collapse: collapse; width: 100%; font-family: Arial, sans-serif;">
+            <thead>
+                <tr style="background-color: #1e293b; color: white;">
+                    <th style="padding: 12px; text-align: left; border: 1px solid #e2e8f0;">Employee</th>
+                    <th style="padding: 12px; text-align: left; border: 1px solid #e2e8f0;">Status</th>
+                    <th style="padding: 12px; text-align: left; border: 1px solid #e2e8f0;">Work Location</th>
+                    <th style="padding: 12px; text-align: left; border: 1px solid #e2e8f0;">Last Update</th>
+                    <th style="padding: 12px; text-align: left; border: 1px solid #e2e8f0;">Remarks</th>
+                </tr>
+            </thead>
+            <tbody>$rows
+            </tbody>
+        </table>
+
+                    <p style="margin-top: 20px; color: #6b7280; font-size: 12px;">
+                        This is an automated daily summary. For detailed attendance data, please log in to the HR Portal.
+                    </p>
+                </div>
+                <div class="footer">
+                    <p>This is an automated message from Baynunah HR Portal.<br>
+                    For questions, contact <a href="mailto:hr@baynunah.ae" style="color: #94a3b8;">hr@baynunah.ae</a></p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """)
+
+
+def render_manager_summary_email(summary: ManagerDailySummary) -> str:
+    """Render the HTML body for one manager's summary."""
+    rows = "".join(
+        _ROW_TEMPLATE.substitute(
+            name=html.escape(row.employee_name),
+            status_color=STATUS_COLORS.get(row.status, "#6b7280"),
+            status=row.status,
+            location=html.escape(row.work_location or "—"),
+            last_update=row.last_update or "—",
+            remarks=html.escape(row.remarks or "—"),
+        )
+        for row in summary.employees
+    )
+    return _EMAIL_TEMPLATE.substitute(
+        long_date=summary.summary_date.strftime("%A, %B %d, %Y"),
+        manager_name=html.escape(summary.manager_name),
+        present_count=summary.present_count,
+        leave_count=summary.on_leave_count,
+        not_in_count=summary.not_checked_in_count,
+        team_size=summary.team_size,
+        rows=rows,
+    )
+
+
+async def send_manager_summary_emails(
+    session: AsyncSession,
+    summary_date: Optional[date] = None,
+    manager_ids: Optional[Iterable[int]] = None,
+    manager_roles: Optional[List[str]] = None,
+) -> int:
+    """Build and email daily summaries to managers. Returns emails sent."""
+    started = time.perf_counter()
+    summaries = await build_manager_summaries(
+        session, summary_date, manager_ids=manager_ids, manager_roles=manager_roles
+    )
+    if not summaries:
+        return 0
+
+    email_result = await session.execute(
+        select(Employee.id, Employee.email).where(
+            and_(Employee.id.in_(list(summaries)), Employee.email.isnot(None))
+        )
+    )
+    emails = {manager_id: email for manager_id, email in email_result.all() if email}
+
+    email_service = get_email_service()
+    semaphore = asyncio.Semaphore(max(get_settings().manager_summary_email_concurrency, 1))
+
+    async def send_one(manager_id: int) -> bool:
+        summary = summaries[manager_id]
+        async with semaphore:
+            try:
+                return await email_service.send_email(
+                    to_email=emails[manager_id],
+                    subject=f"📋 Team Attendance Summary - {summary.summary_date.strftime('%B %d, %Y')}",
+                    html_body=render_manager_summary_email(summary),
+                )
+            except Exception as e:
+                logger.error(f"Failed to send manager summary to {manager_id}: {e}")
+                return False
+
+    results = await asyncio.gather(*(send_one(manager_id) for manager_id in emails))
+    sent = sum(1 for ok in results if ok)
+    logger.info(
+        f"Manager summaries: {sent}/{len(summaries)} sent in "
+        f"{(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+    return sent
@@ -0,0 +1,258 @@
+"""Offset hours ledger.
+
+Offset hours are recorded as ledger entries rather than re-derived from
+attendance history. Every entry stores the employee's running totals, so
+the balance is a single indexed lookup of the latest row. Appends lock the
+employee row first, which keeps the running totals consistent under
+concurrent approvals.
+
+Use and expire entries may not take the balance below zero. A claw-back
+(a negative adjust, when overtime is rejected or reduced) is always
+recorded, even if those hours were already taken as time off. The balance
+then goes negative, a warning is logged, and the shortfall is reported as
+a deficit that later earnings pay off first.
+"""
+import logging
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.employee import Employee
+from app.models.offset_ledger import OffsetLedgerEntry
+
+logger = logging.getLogger(__name__)
+
+HOURS_PER_OFFSET_DAY = Decimal("8")
+
+
+async def get_latest_entry(session: AsyncSession, employee_id: int) -> Optional[OffsetLedgerEntry]:
+    """The employee's most recent ledger row (their current totals)."""
+    result = await session.execute(
+        select(OffsetLedgerEntry)
+        .where(OffsetLedgerEntry.employee_id == employee_id)
+        .order_by(OffsetLedgerEntry.id.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+def _next_entry(
+    latest: Optional[OffsetLedgerEntry],
+    employee_id: int,
+    entry_type: str,
+    hours: Decimal,
+    entry_date: date,
+    attendance_record_id: Optional[int] = None,
+    reference: Optional[str] = None,
+    created_by: Optional[int] = None,
+) -> OffsetLedgerEntry:
+    """Build the entry that follows ``latest``, carrying the running totals forward."""
+    balance = latest.balance_after if latest else Decimal("0")
+    if entry_type in ("use", "expire") and balance + hours < 0:
+        raise ValueError(f"Insufficient offset balance: {balance} hours available")
+    if entry_type == "adjust" and hours < 0 and balance + hours < 0:
+        logger.warning(
+            "Offset claw-back leaves a deficit",
+            extra={
+                "employee_id": employee_id,
+                "attendance_record_id": attendance_record_id,
+                "balance_after": str(balance + hours),
+            },
+        )
+
+    earned = latest.earned_to_date if latest else Decimal("0")
+    used = latest.used_to_date if latest else Decimal("0")
+    expired = latest.expired_to_date if latest else Decimal("0")
+    if entry_type in ("earn", "adjust"):
+        earned += hours
+    elif entry_type == "use":
+        used -= hours
+    elif entry_type == "expire":
+        expired -= hours
+
+    return OffsetLedgerEntry(
+        employee_id=employee_id,
+        entry_type=entry_type,
+        hours=hours,
+        entry_date=entry_date,
+        attendance_record_id=attendance_record_id,
+        reference=reference,
+        balance_after=balance + hours,
+        earned_to_date=earned,
+        used_to_date=used,
+        expired_to_date=expired,
+        created_by=created_by,
+    )
+
+
+async def append_entry(
+    session: AsyncSession,
+    employee_id: int,
+    entry_type: str,
+    hours: Decimal,
+    entry_date: date,
+    attendance_record_id: Optional[int] = None,
+    reference: Optional[str] = None,
+    created_by: Optional[int] = None,
+) -> OffsetLedgerEntry:
+    """Append a signed entry and carry the running totals forward.
+
+    Raises ValueError if a use/expire entry would take the balance below
+    zero. Does not commit; the caller commits together with the change that
+    caused the entry.
+    """
+    await _lock_employees(session, [employee_id])
+    return await _append_locked(
+        session, employee_id, entry_type, hours, entry_date,
+        attendance_record_id=attendance_record_id, reference=reference, created_by=created_by,
+    )
+
+
+async def _lock_employees(session: AsyncSession, employee_ids: Sequence[int]) -> None:
+    """Lock the employee rows, in id order, until the caller's transaction ends.
+
+    Serialises ledger writers per employee so two of them cannot fork the
+    running totals or both credit the same record.
+    """
+    await session.execute(
+        select(Employee.id).where(Employee.id.in_(sorted(employee_ids))).order_by(Employee.id).with_for_update()
+    )
+
+
+async def _append_locked(
+    session: AsyncSession,
+    employee_id: int,
+    entry_type: str,
+    hours: Decimal,
+    entry_date: date,
+    attendance_record_id: Optional[int] = None,
+    reference: Optional[str] = None,
+    created_by: Optional[int] = None,
+) -> OffsetLedgerEntry:
+    """append_entry() for a caller that already holds the employee lock."""
+    latest = await get_latest_entry(session, employee_id)
+    entry = _next_entry(
+        latest, employee_id, entry_type, hours, entry_date,
+        attendance_record_id=attendance_record_id, reference=reference, created_by=created_by,
+    )
+    session.add(entry)
+    await session.flush()
+    return entry
+
+
+async def credited_hours_for_record(session: AsyncSession, attendance_record_id: int) -> Decimal:
+    """Net hours already credited to the ledger for one attendance record."""
+    result = await session.execute(
+        select(func.coalesce(func.sum(OffsetLedgerEntry.hours), 0)).where(
+            OffsetLedgerEntry.attendance_record_id == attendance_record_id,
+            OffsetLedgerEntry.entry_type.in_(("earn", "adjust")),
+        )
+    )
+    return Decimal(str(result.scalar() or 0))
+
+
+async def sync_record_credit(
+    session: AsyncSession,
+    employee_id: int,
+    attendance_record_id: int,
+    entry_date: date,
+    hours: Decimal,
+    created_by: Optional[int] = None,
+) -> Optional[OffsetLedgerEntry]:
+    """Make the ledger credit for an attendance record equal ``hours``.
+
+    The first approval writes an earn entry. A later re-approval with
+    different hours, or a rejection (``hours`` of 0), writes an adjust entry
+    for the difference. Nothing is written when the credit already matches.
+    The employee is locked before the credit is read, so two concurrent
+    approvals of one record cannot both see it uncredited.
+    """
+    await _lock_employees(session, [employee_id])
+    credited = await credited_hours_for_record(session, attendance_record_id)
+    delta = hours - credited
+    if delta == 0:
+        return None
+    return await _append_locked(
+        session,
+        employee_id,
+        "earn" if credited == 0 and delta > 0 else "adjust",
+        delta,
+        entry_date,
+        attendance_record_id=attendance_record_id,
+        reference=f"Overtime on {entry_date}",
+        created_by=created_by,
+    )
+
+
+async def sync_record_credits(
+    session: AsyncSession,
+    credits: Sequence[Tuple[int, int, date, Decimal]],
+    created_by: Optional[int] = None,
+) -> List[OffsetLedgerEntry]:
+    """sync_record_credit() for many records in a fixed number of queries.
+
+    ``credits`` holds (employee_id, attendance_record_id, entry_date, hours)
+    tuples. The employees are locked together, in id order, before the
+    existing credits and their latest entries are read. Does not commit.
+    """
+    if not credits:
+        return []
+    employee_ids = sorted({c[0] for c in credits})
+    # Locked before the credits are read, as in sync_record_credit()
+    await _lock_employees(session, employee_ids)
+    result = await session.execute(
+        select(OffsetLedgerEntry.attendance_record_id, func.sum(OffsetLedgerEntry.hours))
+        .where(
+            OffsetLedgerEntry.attendance_record_id.in_([c[1] for c in credits]),
+            OffsetLedgerEntry.entry_type.in_(("earn", "adjust")),
+        )
+        .group_by(OffsetLedgerEntry.attendance_record_id)
+    )
+    credited = {record_id: Decimal(str(total or 0)) for record_id, total in result.all()}
+
+    latest_ids = (
+        select(func.max(OffsetLedgerEntry.id))
+        .where(OffsetLedgerEntry.employee_id.in_(employee_ids))
+        .group_by(OffsetLedgerEntry.employee_id)
+    )
+    result = await session.execute(select(OffsetLedgerEntry).where(OffsetLedgerEntry.id.in_(latest_ids)))
+    latest: Dict[int, OffsetLedgerEntry] = {entry.employee_id: entry for entry in result.scalars().all()}
+
+    entries = []
+    for employee_id, record_id, entry_date, hours in credits:
+        already = credited.get(record_id, Decimal("0"))
+        delta = hours - already
+        if delta == 0:
+            continue
+        entry = _next_entry(
+            latest.get(employee_id),
+            employee_id,
+            "earn" if already == 0 and delta > 0 else "adjust",
+            delta,
+            entry_date,
+            attendance_record_id=record_id,
+            reference=f"Overtime on {entry_date}",
+            created_by=created_by,
+        )
+        latest[employee_id] = entry
+        entries.append(entry)
+    session.add_all(entries)
+    await session.flush()
+    return entries
+
+
+async def list_entries(
+    session: AsyncSession,
+    employee_id: int,
+    limit: int,
+    before_id: Optional[int] = None,
+) -> List[OffsetLedgerEntry]:
+    """Newest-first page of ledger entries, continuing below ``before_id``."""
+    query = select(OffsetLedgerEntry).where(OffsetLedgerEntry.employee_id == employee_id)
+    if before_id is not None:
+        query = query.where(OffsetLedgerEntry.id < before_id)
+    result = await session.execute(query.order_by(OffsetLedgerEntry.id.desc()).limit(limit))
+    return list(result.scalars().all())
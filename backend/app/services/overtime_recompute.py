@@ -0,0 +1,346 @@
+"""Batch recomputation of worked hours, overtime and payroll fields.
+
+Clock-out computes hours for one record at a time. When a policy changes
+(Ramadan hours, FRIDAY_WORK_HOURS, overtime rates), this engine
+recomputes history instead. Closed records in a date range are read in
+id-ordered chunks. Their timestamps and the employee's schedule, policy
+and salary are loaded into NumPy arrays. compute_hours() applies the same
+rules as calculate_hours_with_employee_settings to the whole chunk at
+once. Rate and amount are only recomputed for exceptional overtime, with
+exceptional_overtime_pay() and the night/holiday flags HR set, as clock-out
+leaves them alone on ordinary records. Only the rows that differ are
+written back, with one executemany UPDATE per chunk. The daily rollup is
+then rebuilt for the range, and the timesheets of every changed employee
+and month are regenerated while still draft, rejected or submitted. Sheets
+further along are listed as stale for HR to reopen.
+
+A dry run stops before writing and reports a per-record diff, together with
+the timesheets that would be regenerated or left stale. Records
+whose overtime a manager has already approved or rejected are skipped
+unless the request includes them.
+"""
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.time import get_utc_now
+from app.models.attendance import (
+    AttendanceRecord,
+    FRIDAY_WORK_HOURS, MAX_OVERTIME_HOURS_PER_DAY, RAMADAN_WORK_HOURS, STANDARD_WORK_HOURS_5_DAY,
+    exceptional_overtime_pay,
+)
+from app.models.employee import Employee
+from app.models.timesheet import Timesheet
+from app.services.attendance_rollup import rebuild_rollup
+from app.services.business_calendar import BusinessCalendar, get_business_calendar, schedule_key
+from app.services.job_store import JobStore
+from app.services.timesheet_bulk import (
+    REGENERATABLE_STATUSES, aggregate_month_totals, apply_month_totals, month_bounds,
+)
+
+logger = logging.getLogger(__name__)
+
+# Most changed records kept on a job for the diff report
+MAX_REPORTED_CHANGES = 500
+
+RECOMPUTED_FIELDS = (
+    "total_hours", "regular_hours", "overtime_hours",
+    "exceeds_daily_limit", "exceeds_overtime_limit",
+    "is_ramadan_hours", "offset_hours_earned", "overtime_type",
+)
+# Only recomputed on exceptional overtime, the one place they are set
+EXCEPTIONAL_FIELDS = ("overtime_rate", "overtime_amount")
+
+# A submitted sheet is still awaiting review, so its totals can be refreshed too
+REFRESHABLE_TIMESHEET_STATUSES = (*REGENERATABLE_STATUSES, "submitted")
+
+
+def _weekday(days: np.ndarray) -> np.ndarray:
+    """Monday=0 weekday of datetime64[D] values (1970-01-01 was a Thursday)."""
+    return (days.astype(np.int64) + 3) % 7
+
+
+def compute_hours(
+    clock_in: np.ndarray,
+    clock_out: np.ndarray,
+    break_minutes: np.ndarray,
+    days: np.ndarray,
+    six_day: np.ndarray,
+    ramadan: np.ndarray,
+    overtime_eligible: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Hours and limit flags for arrays of closed records.
+
+    ``clock_in`` and ``clock_out`` are epoch seconds and ``days`` is
+    datetime64[D]. Follows calculate_hours_with_employee_settings: 6-day
+    staff work FRIDAY_WORK_HOURS on Fridays, Ramadan days are
+    RAMADAN_WORK_HOURS, and overtime is zero for ineligible employees and
+    capped at MAX_OVERTIME_HOURS_PER_DAY. Hours are rounded to 2 places.
+    """
+    total = np.maximum((clock_out - clock_in) / 3600 - break_minutes / 60, 0.0)
+
+    standard = np.where(ramadan, RAMADAN_WORK_HOURS, STANDARD_WORK_HOURS_5_DAY).astype(float)
+    standard = np.where(six_day & (_weekday(days) == 4), FRIDAY_WORK_HOURS, standard)
+
+    regular = np.minimum(total, standard)
+    overtime = np.where(overtime_eligible, np.maximum(total - standard, 0.0), 0.0)
+    exceeds_daily = total > standard + MAX_OVERTIME_HOURS_PER_DAY
+    exceeds_overtime = overtime > MAX_OVERTIME_HOURS_PER_DAY
+    overtime = np.minimum(overtime, MAX_OVERTIME_HOURS_PER_DAY)
+
+    return {
+        "total_hours": np.round(total, 2),
+        "regular_hours": np.round(regular, 2),
+        "overtime_hours": np.round(overtime, 2),
+        "exceeds_daily_limit": exceeds_daily,
+        "exceeds_overtime_limit": exceeds_overtime,
+    }
+
+
+def _money(value: float) -> Decimal:
+    return Decimal(f"{value:.2f}")
+
+
+@dataclass
+class OvertimeRecomputeJob:
+    """Progress and diff of one recompute run."""
+
+    id: str
+    start_date: date
+    end_date: date
+    employee_id: Optional[int] = None
+    ramadan_start: Optional[date] = None
+    ramadan_end: Optional[date] = None
+    include_decided: bool = False
+    dry_run: bool = True
+    status: str = "queued"  # queued, running, completed, failed
+    total: int = 0
+    processed: int = 0
+    changed: int = 0
+    changes: List[Dict[str, Any]] = field(default_factory=list)
+    regenerated_timesheets: List[int] = field(default_factory=list)
+    stale_timesheets: List[int] = field(default_factory=list)
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=get_utc_now)
+    finished_at: Optional[datetime] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# Singleton instance
+_recompute_jobs: Optional[JobStore[OvertimeRecomputeJob]] = None
+
+
+def get_overtime_recompute_jobs() -> JobStore[OvertimeRecomputeJob]:
+    """Get or create the overtime recompute job store singleton."""
+    global _recompute_jobs
+    if _recompute_jobs is None:
+        _recompute_jobs = JobStore("overtime_recompute", OvertimeRecomputeJob)
+    return _recompute_jobs
+
+
+def _recompute_rows(rows: List[Any], job: OvertimeRecomputeJob) -> List[Dict[str, Any]]:
+    """New field values for every row of a chunk, in row order."""
+    days = np.array([r.attendance_date for r in rows], dtype="datetime64[D]")
+    schedules = [schedule_key(r.work_schedule) for r in rows]
+    policies = [(r.policy or "N/A").upper() for r in rows]
+    exceptional = np.array([bool(r.exceptional_overtime) for r in rows])
+
+    ramadan = np.array([bool(r.is_ramadan_hours) for r in rows])
+    if job.ramadan_start and job.ramadan_end:
+        ramadan |= (days >= np.datetime64(job.ramadan_start)) & (days <= np.datetime64(job.ramadan_end))
+
+    result = compute_hours(
+        np.array([r.clock_in.timestamp() for r in rows]),
+        np.array([r.clock_out.timestamp() for r in rows]),
+        np.array([r.break_duration_minutes or 0 for r in rows], dtype=float),
+        days,
+        np.array([s == "6 days" for s in schedules]),
+        ramadan,
+        np.array([p != "N/A" for p in policies]) | exceptional,
+    )
+
+    overtime = result["overtime_hours"]
+    values = []
+    for i, row in enumerate(rows):
+        has_overtime = overtime[i] > 0
+        overtime_type = row.overtime_type
+        if has_overtime and overtime_type == "none":
+            overtime_type = "auto-calculated"
+        elif not has_overtime and overtime_type == "auto-calculated":
+            overtime_type = "none"
+        offset = row.offset_hours_earned
+        # Approved offset hours are already credited to the ledger
+        if policies[i] == "OFFSET" and not exceptional[i] and row.overtime_approved is None:
+            offset = _money(overtime[i]) if has_overtime else None
+        row_values = {
+            "total_hours": _money(result["total_hours"][i]),
+            "regular_hours": _money(result["regular_hours"][i]),
+            "overtime_hours": _money(overtime[i]),
+            "exceeds_daily_limit": bool(result["exceeds_daily_limit"][i]),
+            "exceeds_overtime_limit": bool(result["exceeds_overtime_limit"][i]),
+            "is_ramadan_hours": bool(ramadan[i]),
+            "offset_hours_earned": offset,
+            "overtime_type": overtime_type,
+        }
+        if exceptional[i]:
+            rate, amount = exceptional_overtime_pay(
+                row_values["overtime_hours"], row.basic_salary,
+                bool(row.is_night_overtime), bool(row.is_holiday_overtime),
+            )
+            row_values["overtime_rate"] = rate
+            if amount is not None:
+                row_values["overtime_amount"] = amount.quantize(Decimal("0.01"))
+        values.append(row_values)
+    return values
+
+
+async def _refresh_timesheets(
+    session: AsyncSession,
+    job: OvertimeRecomputeJob,
+    affected: Set[Tuple[int, int, int]],
+    calendar: BusinessCalendar,
+) -> None:
+    """Regenerate or report the timesheets of changed (employee, year, month)s."""
+    months: Dict[Tuple[int, int], Set[int]] = {}
+    for employee_id, year, month in affected:
+        months.setdefault((year, month), set()).add(employee_id)
+
+    for (year, month), employee_ids in sorted(months.items()):
+        result = await session.execute(
+            select(Timesheet, Employee.work_schedule)
+            .join(Employee, Timesheet.employee_id == Employee.id)
+            .where(Timesheet.year == year, Timesheet.month == month, Timesheet.employee_id.in_(employee_ids))
+            .order_by(Timesheet.id)
+        )
+        refresh = []
+        for timesheet, work_schedule in result.all():
+            if timesheet.status in REFRESHABLE_TIMESHEET_STATUSES:
+                job.regenerated_timesheets.append(timesheet.id)
+                refresh.append((timesheet, work_schedule))
+            else:
+                job.stale_timesheets.append(timesheet.id)
+        if not refresh or job.dry_run:
+            continue
+
+        start_date, end_date = month_bounds(year, month)
+        totals = await aggregate_month_totals(
+            session, start_date, end_date, [timesheet.employee_id for timesheet, _ in refresh]
+        )
+        for timesheet, work_schedule in refresh:
+            working_days = calendar.working_days(start_date, end_date, work_schedule)
+            apply_month_totals(timesheet, totals.get(timesheet.employee_id), working_days)
+        await session.commit()
+
+
+def _jsonable(value: Any) -> Any:
+    return str(value) if isinstance(value, Decimal) else value
+
+
+async def run_overtime_recompute(session: AsyncSession, job: OvertimeRecomputeJob) -> OvertimeRecomputeJob:
+    """Recompute closed records in the job's range, or only diff them on a dry run."""
+    started = time.perf_counter()
+    jobs = get_overtime_recompute_jobs()
+    job.status = "running"
+    record = AttendanceRecord
+    try:
+        await jobs.save(session, job)
+        conditions = [
+            record.attendance_date >= job.start_date,
+            record.attendance_date <= job.end_date,
+            record.clock_in.isnot(None),
+            record.clock_out.isnot(None),
+        ]
+        if job.employee_id:
+            conditions.append(record.employee_id == job.employee_id)
+        if not job.include_decided:
+            conditions.append(record.overtime_approved.is_(None))
+
+        job.total = (await session.execute(select(func.count(record.id)).where(*conditions))).scalar() or 0
+        calendar = await get_business_calendar(session)
+        chunk_size = get_settings().overtime_recompute_chunk_size
+        last_id = 0
+        affected: Set[Tuple[int, int, int]] = set()
+        while True:
+            result = await session.execute(
+                select(
+                    record.id, record.employee_id, record.attendance_date,
+                    record.clock_in, record.clock_out, record.break_duration_minutes,
+                    record.exceptional_overtime, record.overtime_approved,
+                    record.is_night_overtime, record.is_holiday_overtime,
+                    *(getattr(record, name) for name in (*RECOMPUTED_FIELDS, *EXCEPTIONAL_FIELDS)),
+                    Employee.work_schedule, Employee.overtime_type.label("policy"), Employee.basic_salary,
+                )
+                .join(Employee, record.employee_id == Employee.id)
+                .where(*conditions, record.id > last_id)
+                .order_by(record.id)
+                .limit(chunk_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+
+            updates = []
+            for row, values in zip(rows, _recompute_rows(rows, job)):
+                diff = {
+                    name: [_jsonable(getattr(row, name)), _jsonable(value)]
+                    for name, value in values.items()
+                    if getattr(row, name) != value
+                }
+                if not diff:
+                    continue
+                updates.append({"id": row.id, **values})
+                affected.add((row.employee_id, row.attendance_date.year, row.attendance_date.month))
+                if len(job.changes) < MAX_REPORTED_CHANGES:
+                    job.changes.append({
+                        "record_id": row.id,
+                        "employee_id": row.employee_id,
+                        "attendance_date": row.attendance_date.isoformat(),
+                        "changes": diff,
+                    })
+
+            if updates and not job.dry_run:
+                await session.execute(update(AttendanceRecord), updates)
+
+            last_id = rows[-1].id
+            job.processed += len(rows)
+            job.changed += len(updates)
+            # Commits the chunk together with its progress
+            await jobs.save(session, job)
+
+        if job.changed and not job.dry_run:
+            await rebuild_rollup(session, job.start_date, job.end_date)
+        await _refresh_timesheets(session, job, affected, calendar)
+        job.status = "completed"
+    except Exception as e:
+        await session.rollback()
+        job.status = "failed"
+        job.error = str(e)
+        logger.exception("Overtime recompute failed", extra={"job_id": job.id})
+    finally:
+        job.finished_at = get_utc_now()
+    await jobs.save(session, job)
+
+    logger.info(
+        "Overtime recompute finished",
+        extra={
+            "job_id": job.id,
+            "status": job.status,
+            "dry_run": job.dry_run,
+            "processed": job.processed,
+            "changed": job.changed,
+            "regenerated_timesheets": len(job.regenerated_timesheets),
+            "stale_timesheets": len(job.stale_timesheets),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+    )
+    return job
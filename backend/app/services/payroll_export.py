@@ -0,0 +1,156 @@
+"""Payroll export of HR-approved timesheets.
+
+Exporting a month is two steps:
+
+- mark_month_exported() moves every ``hr_approved`` timesheet of the month
+  to ``exported`` in one UPDATE and stamps it with a new payroll reference.
+  The reference names the batch, so later approvals go into a new batch.
+- stream_payroll_rows() writes a batch's timesheets, joined to the
+  employee's compensation fields, as CSV or XLSX from a server-side cursor.
+
+Rows are ordered by timesheet id and the first column is that id. A
+download that breaks off can resume with ``after_id`` set to the last id
+received. With ``limit``, a large month can be fetched as several files.
+CSV chunks are sent as each batch is fetched. XLSX goes through openpyxl's
+write-only workbook, which spools rows to a temporary file, so memory stays
+flat there too. The file is sent once the workbook is closed.
+"""
+import csv
+import io
+import tempfile
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Iterable, Optional, Sequence
+
+from openpyxl import Workbook
+from sqlalchemy import Select, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.database import async_session_maker
+from app.models.employee import Employee
+from app.models.timesheet import Timesheet
+
+PAYROLL_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Rows fetched per round trip, and bytes per chunk when sending an XLSX file
+PAYROLL_EXPORT_BATCH_SIZE = 500
+XLSX_CHUNK_BYTES = 64 * 1024
+
+PAYROLL_COLUMNS = [
+    ("timesheet_id", Timesheet.id),
+    ("payroll_reference", Timesheet.payroll_reference),
+    ("employee_number", Employee.employee_id),
+    ("employee_name", Employee.name),
+    ("department", Employee.department),
+    ("year", Timesheet.year),
+    ("month", Timesheet.month),
+    ("basic_salary", Employee.basic_salary),
+    ("housing_allowance", Employee.housing_allowance),
+    ("transportation_allowance", Employee.transportation_allowance),
+    ("other_allowance", Employee.other_allowance),
+    ("net_salary", Employee.net_salary),
+    ("overtime_policy", Employee.overtime_type),
+    ("total_working_days", Timesheet.total_working_days),
+    ("total_present_days", Timesheet.total_present_days),
+    ("total_absent_days", Timesheet.total_absent_days),
+    ("total_leave_days", Timesheet.total_leave_days),
+    ("total_regular_hours", Timesheet.total_regular_hours),
+    ("total_overtime_hours", Timesheet.total_overtime_hours),
+    ("total_night_overtime_hours", Timesheet.total_night_overtime_hours),
+    ("total_holiday_overtime_hours", Timesheet.total_holiday_overtime_hours),
+    ("total_overtime_amount", Timesheet.total_overtime_amount),
+    ("offset_hours_earned", Timesheet.offset_hours_earned),
+    ("offset_hours_used", Timesheet.offset_hours_used),
+    ("food_allowance_days", Timesheet.food_allowance_days),
+    ("food_allowance_total", Timesheet.food_allowance_total),
+    ("exported_at", Timesheet.exported_at),
+]
+PAYROLL_HEADER = [name for name, _ in PAYROLL_COLUMNS]
+
+
+def new_payroll_reference(year: int, month: int) -> str:
+    return f"PAY-{year}{month:02d}-{uuid.uuid4().hex[:8].upper()}"
+
+
+async def mark_month_exported(
+    session: AsyncSession, year: int, month: int, reference: str, exported_at: datetime
+) -> int:
+    """Move the month's HR-approved timesheets to ``exported`` and return how many moved."""
+    result = await session.execute(
+        update(Timesheet)
+        .where(Timesheet.year == year, Timesheet.month == month, Timesheet.status == "hr_approved")
+        .values(status="exported", exported_at=exported_at, payroll_reference=reference)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    return result.rowcount or 0
+
+
+def payroll_export_query(
+    year: int, month: int, reference: Optional[str] = None, after_id: Optional[int] = None
+) -> Select:
+    """Exported timesheets of a month (optionally one batch), after ``after_id``, by id."""
+    query = (
+        select(Timesheet.id)
+        .join(Employee, Timesheet.employee_id == Employee.id)
+        .where(Timesheet.year == year, Timesheet.month == month, Timesheet.status == "exported")
+        .order_by(Timesheet.id)
+    )
+    if reference:
+        query = query.where(Timesheet.payroll_reference == reference)
+    if after_id:
+        query = query.where(Timesheet.id > after_id)
+    return query
+
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def serialize_csv_rows(rows: Iterable[Sequence[Any]]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if value is None else _cell(value) for value in row])
+    return buffer.getvalue()
+
+
+def _xlsx_row(row: Sequence[Any]) -> list:
+    # Excel cells hold floats; Decimal would be written as text by some readers
+    return [float(value) if isinstance(value, Decimal) else _cell(value) for value in row]
+
+
+async def stream_payroll_rows(query: Select, export_format: str) -> AsyncIterator[bytes]:
+    """Yield the export file chunk by chunk for ``query``.
+
+    Reads from the primary, because the batch was usually marked exported
+    moments before and a replica may not have it yet.
+    """
+    query = query.with_only_columns(*(column for _, column in PAYROLL_COLUMNS))
+    async with async_session_maker() as session:
+        result = await session.stream(query.execution_options(yield_per=PAYROLL_EXPORT_BATCH_SIZE))
+        if export_format == "csv":
+            yield serialize_csv_rows([PAYROLL_HEADER]).encode()
+            async for rows in result.partitions():
+                yield serialize_csv_rows(rows).encode()
+            return
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Payroll")
+        sheet.append(PAYROLL_HEADER)
+        async for rows in result.partitions():
+            for row in rows:
+                sheet.append(_xlsx_row(row))
+
+    with tempfile.TemporaryFile() as output:
+        await run_in_threadpool(workbook.save, output)
+        output.seek(0)
+        while chunk := output.read(XLSX_CHUNK_BYTES):
+            yield chunk
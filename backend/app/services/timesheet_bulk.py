@@ -0,0 +1,301 @@
+"""Set-based monthly timesheet generation.
+
+Timesheet totals for a month come from one GROUP BY over attendance records
+and one over overlapping approved leave. The same aggregation serves both
+single-employee generation and the month-end bulk job, so the two cannot
+drift apart. Bulk jobs run in the background and report progress through
+the shared job store, so any worker can answer a status poll.
+"""
+import itertools
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.time import get_utc_now
+from app.models.attendance import AttendanceRecord
+from app.models.employee import Employee
+from app.models.leave import LeaveRequest
+from app.models.timesheet import Timesheet
+from app.services.business_calendar import get_business_calendar
+from app.services.job_store import JobStore
+
+logger = logging.getLogger(__name__)
+
+# Statuses that may still be (re)generated; anything else is left untouched
+REGENERATABLE_STATUSES = ("draft", "rejected")
+
+# Timesheet field -> work_location value
+LOCATION_FIELDS = {
+    "days_at_head_office": "Head Office",
+    "days_at_kezad": "KEZAD",
+    "days_at_safario": "Safario",
+    "days_at_sites": "Sites",
+    "days_at_meeting": "Meeting",
+    "days_at_event": "Event",
+}
+
+# Timesheet field -> aggregate label, for the attendance-derived totals
+_COUNT_FIELDS = (
+    "total_present_days", "total_absent_days", "total_wfh_days", "total_late_arrivals",
+    "total_early_departures", "food_allowance_days", *LOCATION_FIELDS,
+)
+_SUM_FIELDS = (
+    "total_regular_hours", "total_overtime_hours", "total_night_overtime_hours",
+    "total_holiday_overtime_hours", "total_overtime_amount", "offset_hours_earned",
+    "food_allowance_total",
+)
+
+
+def month_bounds(year: int, month: int) -> Tuple[date, date]:
+    """First and last day of a month."""
+    start_date = date(year, month, 1)
+    if month == 12:
+        end_date = date(year + 1, 1, 1) - timedelta(days=1)
+    else:
+        end_date = date(year, month + 1, 1) - timedelta(days=1)
+    return start_date, end_date
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _sum_if(condition, column):
+    return func.coalesce(func.sum(case((condition, column), else_=0)), 0)
+
+
+def _sum(column):
+    return func.coalesce(func.sum(column), 0)
+
+
+@dataclass
+class MonthTotals:
+    """Timesheet figures for one employee and month."""
+
+    values: Dict[str, Any] = field(default_factory=dict)
+    leave_days: Decimal = Decimal("0")
+    issue_dates: List[date] = field(default_factory=list)
+
+
+async def aggregate_month_totals(
+    session: AsyncSession,
+    start_date: date,
+    end_date: date,
+    employee_ids,
+) -> Dict[int, MonthTotals]:
+    """Aggregate attendance and leave per employee for the period.
+
+    ``employee_ids`` is a list of ids or a SELECT of Employee.id. Employees
+    with no attendance and no leave in the period are absent from the result.
+    """
+    record = AttendanceRecord
+    in_period = (
+        record.attendance_date >= start_date,
+        record.attendance_date <= end_date,
+        record.employee_id.in_(employee_ids),
+    )
+    location_counts = [
+        _count_if(record.work_location == location).label(field_name)
+        for field_name, location in LOCATION_FIELDS.items()
+    ]
+    attendance_result = await session.execute(
+        select(
+            record.employee_id,
+            _count_if(record.status.in_(("present", "late"))).label("total_present_days"),
+            _count_if(record.status == "absent").label("total_absent_days"),
+            _count_if(record.work_location == "Work From Home").label("total_wfh_days"),
+            _count_if(record.is_late == True).label("total_late_arrivals"),
+            _count_if(record.is_early_departure == True).label("total_early_departures"),
+            _count_if(record.food_allowance_eligible == True).label("food_allowance_days"),
+            *location_counts,
+            _sum(record.regular_hours).label("total_regular_hours"),
+            _sum(record.overtime_hours).label("total_overtime_hours"),
+            _sum_if(record.is_night_overtime == True, record.overtime_hours).label("total_night_overtime_hours"),
+            _sum_if(record.is_holiday_overtime == True, record.overtime_hours).label("total_holiday_overtime_hours"),
+            _sum(record.overtime_amount).label("total_overtime_amount"),
+            _sum(record.offset_hours_earned).label("offset_hours_earned"),
+            _sum_if(record.food_allowance_eligible == True, record.food_allowance_amount).label("food_allowance_total"),
+        )
+        .where(*in_period)
+        .group_by(record.employee_id)
+    )
+    totals: Dict[int, MonthTotals] = {}
+    for row in attendance_result:
+        mapping = row._mapping
+        values = {name: int(mapping[name]) for name in _COUNT_FIELDS}
+        values.update({name: Decimal(str(mapping[name])) for name in _SUM_FIELDS})
+        totals[row.employee_id] = MonthTotals(values=values)
+
+    # Flagged days are rare, so listing them separately keeps the aggregate simple
+    issues_result = await session.execute(
+        select(record.employee_id, record.attendance_date)
+        .where(
+            *in_period,
+            or_(record.exceeds_daily_limit == True, record.exceeds_overtime_limit == True),
+        )
+        .order_by(record.employee_id, record.attendance_date)
+    )
+    for employee_id, attendance_date in issues_result:
+        totals.setdefault(employee_id, MonthTotals()).issue_dates.append(attendance_date)
+
+    leave_result = await session.execute(
+        select(LeaveRequest.employee_id, func.sum(LeaveRequest.total_days))
+        .where(
+            LeaveRequest.employee_id.in_(employee_ids),
+            LeaveRequest.status == "approved",
+            LeaveRequest.start_date <= end_date,
+            LeaveRequest.end_date >= start_date,
+        )
+        .group_by(LeaveRequest.employee_id)
+    )
+    for employee_id, leave_days in leave_result:
+        totals.setdefault(employee_id, MonthTotals()).leave_days = Decimal(str(leave_days or 0))
+
+    return totals
+
+
+def apply_month_totals(timesheet: Timesheet, totals: Optional[MonthTotals], working_days: int) -> None:
+    """Write aggregated figures onto a timesheet (zeros when there is no data)."""
+    totals = totals or MonthTotals()
+    for name in _COUNT_FIELDS:
+        setattr(timesheet, name, totals.values.get(name, 0))
+    for name in _SUM_FIELDS:
+        setattr(timesheet, name, totals.values.get(name, Decimal("0")))
+    timesheet.total_working_days = working_days
+    timesheet.total_leave_days = totals.leave_days
+    timesheet.has_compliance_issues = bool(totals.issue_dates)
+    timesheet.compliance_notes = (
+        "; ".join(f"{d}: Exceeded limits" for d in totals.issue_dates) if totals.issue_dates else None
+    )
+
+
+@dataclass
+class TimesheetJob:
+    """Progress of one bulk generation run."""
+
+    id: str
+    year: int
+    month: int
+    department: Optional[str] = None
+    manager_id: Optional[int] = None
+    status: str = "queued"  # queued, running, completed, failed
+    total: int = 0
+    processed: int = 0
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=get_utc_now)
+    finished_at: Optional[datetime] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# Singleton instance
+_timesheet_jobs: Optional[JobStore[TimesheetJob]] = None
+
+
+def get_timesheet_jobs() -> JobStore[TimesheetJob]:
+    """Get or create the timesheet job store singleton."""
+    global _timesheet_jobs
+    if _timesheet_jobs is None:
+        _timesheet_jobs = JobStore("timesheet_bulk", TimesheetJob, max_jobs=50)
+    return _timesheet_jobs
+
+
+def _chunks(items: List[int], size: int) -> Iterable[List[int]]:
+    iterator = iter(items)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+async def generate_timesheets_bulk(session: AsyncSession, job: TimesheetJob) -> TimesheetJob:
+    """Generate draft timesheets for every matching active employee.
+
+    Submitted and approved sheets are skipped. Rows are written and committed
+    in batches of ``timesheet_bulk_batch_size``, and job progress is saved
+    after each batch.
+    """
+    started = time.perf_counter()
+    jobs = get_timesheet_jobs()
+    job.status = "running"
+    try:
+        await jobs.save(session, job)
+        start_date, end_date = month_bounds(job.year, job.month)
+        calendar = await get_business_calendar(session)
+
+        employees = select(Employee.id).where(Employee.is_active == True)
+        if job.department:
+            employees = employees.where(Employee.department == job.department)
+        if job.manager_id is not None:
+            employees = employees.where(Employee.line_manager_id == job.manager_id)
+
+        schedule_result = await session.execute(
+            employees.add_columns(Employee.work_schedule).order_by(Employee.id)
+        )
+        schedules = dict(schedule_result.all())
+        employee_ids = list(schedules)
+        job.total = len(employee_ids)
+        totals = await aggregate_month_totals(session, start_date, end_date, employees)
+
+        for batch in _chunks(employee_ids, get_settings().timesheet_bulk_batch_size):
+            existing_result = await session.execute(
+                select(Timesheet).where(
+                    Timesheet.year == job.year,
+                    Timesheet.month == job.month,
+                    Timesheet.employee_id.in_(batch),
+                )
+            )
+            existing = {timesheet.employee_id: timesheet for timesheet in existing_result.scalars()}
+
+            for employee_id in batch:
+                timesheet = existing.get(employee_id)
+                if timesheet is not None and timesheet.status not in REGENERATABLE_STATUSES:
+                    job.skipped += 1
+                    continue
+                if timesheet is None:
+                    timesheet = Timesheet(
+                        employee_id=employee_id, year=job.year, month=job.month, status="draft"
+                    )
+                    session.add(timesheet)
+                    job.created += 1
+                else:
+                    job.updated += 1
+                working_days = calendar.working_days(start_date, end_date, schedules[employee_id])
+                apply_month_totals(timesheet, totals.get(employee_id), working_days)
+
+            job.processed += len(batch)
+            # Commits the batch together with its progress
+            await jobs.save(session, job)
+
+        job.status = "completed"
+    except Exception as e:
+        await session.rollback()
+        job.status = "failed"
+        job.error = str(e)
+        logger.exception("Bulk timesheet generation failed", extra={"job_id": job.id})
+    finally:
+        job.finished_at = get_utc_now()
+    await jobs.save(session, job)
+
+    logger.info(
+        "Bulk timesheet generation finished",
+        extra={
+            "job_id": job.id,
+            "status": job.status,
+            "total": job.total,
+            "created": job.created,
+            "updated": job.updated,
+            "skipped": job.skipped,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+    )
+    return job
@@ -0,0 +1,132 @@
+import asyncio
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models.recruitment  # Registers the recruitment tables employees refer to
+import app.services.attendance_dashboard as dashboard_module
+from app.models import AttendanceRecord, Base, Employee
+from app.schemas.attendance import AttendanceDashboard
+from app.services.attendance_dashboard import DashboardCache, compute_dashboard
+
+TODAY = date(2026, 10, 12)
+
+
+def _record(employee_id, attendance_date=TODAY, **fields):
+    values = dict(
+        employee_id=employee_id, attendance_date=attendance_date, work_type="office",
+        status="present", overtime_type="none", is_late=False, is_early_departure=False,
+    )
+    values.update(fields)
+    return AttendanceRecord(**values)
+
+
+@pytest.mark.anyio
+async def test_compute_dashboard_counts_today_and_pending():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    clock_in = datetime(2026, 10, 12, 4, 0, tzinfo=timezone.utc)
+
+    async with sessions() as session:
+        employees = [
+            Employee(
+                employee_id=f"E{i}", name=f"E{i}", password_hash="x",
+                date_of_birth=date(1990, 1, 1), is_active=i < 4,
+            )
+            for i in range(5)
+        ]
+        session.add_all(employees)
+        await session.flush()
+        ids = [employee.id for employee in employees]
+        session.add_all([
+            _record(ids[0], clock_in=clock_in, is_late=True, work_location="Head Office", exceeds_daily_limit=True),
+            _record(ids[1], clock_in=clock_in, work_type="wfh", work_location="Work From Home"),
+            _record(ids[2], clock_in=clock_in, work_location="Sites", exceeds_overtime_limit=True),
+            _record(ids[3], status="on-leave"),
+            # Earlier days only count towards pending approvals
+            _record(ids[0], date(2026, 10, 11), clock_in=clock_in, work_location="KEZAD",
+                    overtime_hours=Decimal("2.00")),
+            _record(ids[1], date(2026, 10, 11), is_manual_entry=True),
+            _record(ids[2], date(2026, 10, 11), overtime_hours=Decimal("1.00"), overtime_approved=True),
+        ])
+        await session.commit()
+
+        dashboard = await compute_dashboard(session, TODAY)
+    await engine.dispose()
+
+    assert dashboard == AttendanceDashboard(
+        total_employees=4,
+        clocked_in_today=3,
+        wfh_today=1,
+        absent_today=0,
+        late_today=1,
+        pending_wfh_approvals=1,
+        pending_overtime_approvals=1,
+        pending_corrections=1,
+        on_leave_today=1,
+        at_head_office=1,
+        at_sites=1,
+        at_wfh=1,
+        exceeding_daily_limits=1,
+        exceeding_overtime_limits=1,
+    )
+
+
+def _dashboard(total_employees):
+    return AttendanceDashboard(
+        total_employees=total_employees, clocked_in_today=0, wfh_today=0, absent_today=total_employees,
+        late_today=0, pending_wfh_approvals=0, pending_overtime_approvals=0, on_leave_today=0,
+    )
+
+
+@pytest.fixture
+def fake_compute(monkeypatch):
+    clock = {"now": 100.0, "today": TODAY}
+    calls = []
+
+    async def compute(session, today):
+        calls.append(today)
+        await asyncio.sleep(0)
+        return _dashboard(len(calls))
+
+    monkeypatch.setattr(dashboard_module, "compute_dashboard", compute)
+    monkeypatch.setattr(dashboard_module.time, "monotonic", lambda: clock["now"])
+    monkeypatch.setattr(dashboard_module, "get_uae_today", lambda: clock["today"])
+    return clock, calls
+
+
+@pytest.mark.anyio
+async def test_dashboard_cache_reuses_snapshot_until_ttl(fake_compute):
+    clock, calls = fake_compute
+    cache = DashboardCache(ttl_seconds=5)
+
+    first = await cache.get(None)
+    clock["now"] += 4.9
+    assert await cache.get(None) is first
+    assert len(calls) == 1
+
+    clock["now"] += 0.1
+    assert (await cache.get(None)).total_employees == 2
+
+    # A new UAE day never reuses yesterday's snapshot
+    clock["today"] = date(2026, 10, 13)
+    assert (await cache.get(None)).total_employees == 3
+
+    cache.invalidate()
+    assert (await cache.get(None)).total_employees == 4
+    assert calls == [TODAY, TODAY, date(2026, 10, 13), date(2026, 10, 13)]
+
+
+@pytest.mark.anyio
+async def test_concurrent_refresh_computes_once(fake_compute):
+    _, calls = fake_compute
+    cache = DashboardCache(ttl_seconds=5)
+
+    results = await asyncio.gather(*(cache.get(None) for _ in range(10)))
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
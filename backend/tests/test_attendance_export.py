@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+
+from app.routers.attendance import decode_records_cursor, encode_records_cursor
+from app.models.attendance import AttendanceRecord
+from app.schemas.attendance import AttendanceResponse
+from app.services.attendance_export import CSV_COLUMNS, csv_header, serialize_batch
+
+
+def _response(record_id: int) -> AttendanceResponse:
+    now = datetime(2026, 10, 1, 4, 0, tzinfo=timezone.utc)
+    return AttendanceResponse(
+        id=record_id,
+        employee_id=3,
+        employee_name="Employee, Three",
+        attendance_date=date(2026, 10, 1),
+        clock_in=now,
+        total_hours=Decimal("8.50"),
+        work_type="office",
+        overtime_type="none",
+        status="present",
+        is_late=False,
+        is_early_departure=False,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def test_csv_and_ndjson_batches_round_trip():
+    responses = [_response(1), _response(2)]
+
+    rows = list(csv.DictReader(io.StringIO(csv_header() + serialize_batch(responses, "csv"))))
+    assert [row["id"] for row in rows] == ["1", "2"]
+    assert rows[0]["employee_name"] == "Employee, Three"
+    assert rows[0]["total_hours"] == "8.50"
+    assert rows[0]["clock_out"] == ""
+    assert list(rows[0]) == CSV_COLUMNS
+
+    lines = serialize_batch(responses, "ndjson").splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2]
+
+
+def test_records_cursor_round_trip():
+    record = AttendanceRecord(id=42, attendance_date=date(2026, 10, 17))
+
+    assert decode_records_cursor(encode_records_cursor(record)) == (date(2026, 10, 17), 42)
+    with pytest.raises(HTTPException) as exc:
+        decode_records_cursor("yesterday")
+    assert exc.value.status_code == 400
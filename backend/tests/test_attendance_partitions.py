@@ -0,0 +1,61 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models.recruitment  # Registers the recruitment tables employees refer to
+from app.models import AttendanceRecord, Base, Employee
+from app.models.timesheet import Timesheet
+from app.services.attendance_partitions import add_months, month_is_closed, partition_name
+
+
+def test_add_months_crosses_year_boundaries():
+    assert add_months(date(2026, 11, 17), 1) == date(2026, 12, 1)
+    assert add_months(date(2026, 11, 17), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 31), -1) == date(2025, 12, 1)
+    assert add_months(date(2026, 10, 17), -24) == date(2024, 10, 1)
+
+
+def test_partition_names_sort_by_month():
+    names = [partition_name(add_months(date(2025, 11, 1), i)) for i in range(4)]
+    assert names == [
+        "attendance_records_y2025m11",
+        "attendance_records_y2025m12",
+        "attendance_records_y2026m01",
+        "attendance_records_y2026m02",
+    ]
+
+
+@pytest.mark.anyio
+async def test_month_without_timesheets_is_not_closed():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    month = date(2024, 3, 1)
+
+    async with sessions() as session:
+        employees = [
+            Employee(employee_id=f"E{i}", name=f"E{i}", password_hash="x", date_of_birth=date(1990, 1, 1))
+            for i in range(2)
+        ]
+        session.add_all(employees)
+        await session.flush()
+        for employee in employees:
+            session.add(AttendanceRecord(
+                employee_id=employee.id, attendance_date=date(2024, 3, 5), work_type="office",
+                status="present", overtime_type="none", is_late=False, is_early_departure=False,
+            ))
+        await session.commit()
+
+        assert not await month_is_closed(session, month)
+
+        # One employee approved, the other still has no timesheet
+        session.add(Timesheet(employee_id=employees[0].id, year=2024, month=3, status="hr_approved"))
+        await session.commit()
+        assert not await month_is_closed(session, month)
+
+        session.add(Timesheet(employee_id=employees[1].id, year=2024, month=3, status="exported"))
+        await session.commit()
+        assert await month_is_closed(session, month)
+    await engine.dispose()
@@ -0,0 +1,110 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models.recruitment  # Registers the recruitment tables employees refer to
+import app.services.attendance_service as attendance_service
+from app.models import AttendanceRecord, Base, Employee
+from app.models.leave import LeaveRequest
+from app.models.notification import Notification
+from app.services.attendance_service import AttendanceService
+from app.services.business_calendar import BusinessCalendar
+
+TODAY = date(2026, 10, 12)
+CLOCK_IN = datetime(2026, 10, 12, 4, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def reminder_db(monkeypatch):
+    """Five employees: clocked in and out, clocked in only, on leave, absent, inactive."""
+    holidays = {}
+    monkeypatch.setattr(attendance_service, "get_uae_today", lambda: TODAY)
+
+    async def calendar(session):
+        return BusinessCalendar(holidays)
+
+    monkeypatch.setattr(attendance_service, "get_business_calendar", calendar)
+
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    inserts = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def record_insert(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO notifications"):
+            inserts.append(len(parameters) if executemany else 1)
+
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessions() as session:
+        employees = [
+            Employee(
+                employee_id=f"E{i}", name=f"E{i}", password_hash="x",
+                date_of_birth=date(1990, 1, 1), is_active=i < 4,
+            )
+            for i in range(5)
+        ]
+        session.add_all(employees)
+        await session.flush()
+        ids = [employee.id for employee in employees]
+        for employee_id, clock_out in ((ids[0], CLOCK_IN.replace(hour=13)), (ids[1], None)):
+            session.add(AttendanceRecord(
+                employee_id=employee_id, attendance_date=TODAY, work_type="office", status="present",
+                overtime_type="none", is_late=False, is_early_departure=False,
+                clock_in=CLOCK_IN, clock_out=clock_out,
+            ))
+        session.add(LeaveRequest(
+            employee_id=ids[2], leave_type="annual", start_date=date(2026, 10, 11),
+            end_date=date(2026, 10, 13), total_days=Decimal("3"), status="approved",
+        ))
+        await session.commit()
+
+    async with sessions() as session:
+        yield session, ids, holidays, inserts
+    await engine.dispose()
+
+
+async def _notified(session):
+    result = await session.execute(select(Notification.user_id, Notification.title).order_by(Notification.id))
+    return result.all()
+
+
+@pytest.mark.anyio
+async def test_clockin_reminders_skip_clocked_in_on_leave_and_inactive(reminder_db):
+    session, ids, _, inserts = reminder_db
+
+    assert await AttendanceService(session).send_missing_clockin_reminders() == 1
+
+    assert await _notified(session) == [(str(ids[3]), "Clock-in Reminder")]
+    assert inserts == [1]
+
+
+@pytest.mark.anyio
+async def test_no_clockin_reminders_on_public_holiday(reminder_db):
+    session, _, holidays, inserts = reminder_db
+    holidays[TODAY] = 1
+
+    assert await AttendanceService(session).send_missing_clockin_reminders() == 0
+
+    assert await _notified(session) == []
+    assert inserts == []
+
+
+@pytest.mark.anyio
+async def test_clockout_reminders_only_for_open_records(reminder_db):
+    session, ids, _, inserts = reminder_db
+    session.add(AttendanceRecord(
+        employee_id=ids[3], attendance_date=TODAY, work_type="office", status="present",
+        overtime_type="none", is_late=False, is_early_departure=False, clock_in=CLOCK_IN,
+    ))
+    await session.commit()
+
+    assert await AttendanceService(session).send_missing_clockout_reminders() == 2
+
+    assert sorted(await _notified(session)) == [
+        (str(ids[1]), "Clock-out Reminder"), (str(ids[3]), "Clock-out Reminder"),
+    ]
+    assert inserts == [2]
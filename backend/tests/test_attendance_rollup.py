@@ -0,0 +1,46 @@
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.models.attendance import AttendanceRecord
+from app.services.attendance_rollup import apply_rollup_change, rollup_snapshot
+
+
+def _record(**overrides) -> AttendanceRecord:
+    fields = dict(
+        employee_id=10,
+        attendance_date=date(2026, 10, 1),
+        work_type="office",
+        work_location="Head Office",
+        status="late",
+        is_late=True,
+        overtime_hours=Decimal("1.5"),
+        is_night_overtime=True,
+    )
+    fields.update(overrides)
+    return AttendanceRecord(**fields)
+
+
+def test_rollup_snapshot_counts_record():
+    snapshot = rollup_snapshot(_record(work_location=None))
+
+    assert snapshot.bucket == (date(2026, 10, 1), "Unspecified")
+    assert snapshot.values["record_count"] == 1
+    assert snapshot.values["present_count"] == 1
+    assert snapshot.values["late_count"] == 1
+    assert snapshot.values["night_overtime_hours"] == Decimal("1.5")
+    assert snapshot.values["holiday_overtime_hours"] == Decimal("0")
+
+
+@pytest.mark.anyio
+async def test_apply_rollup_change_skips_untouched_fields():
+    record = _record()
+    before = rollup_snapshot(record)
+    record.notes = "approved"
+    session = AsyncMock()
+
+    await apply_rollup_change(session, record, before, department="Ops")
+
+    session.execute.assert_not_awaited()
@@ -1,13 +1,32 @@
-from datetime import date, datetime, timezone
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
 from types import SimpleNamespace
 from unittest.mock import AsyncMock
 
 import pytest
 from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
+import app.models.recruitment  # Registers the recruitment tables employees refer to
+from app.models import Base, Employee
 from app.models.attendance import AttendanceRecord
+from app.models.attendance_sync import AttendanceSyncEvent
+from app.models.leave import LeaveRequest
 from app.routers import attendance as attendance_router
-from app.schemas.attendance import ExceptionalOvertimeRequest, WFHApprovalRequest
+from app.schemas.attendance import (
+    AttendanceSyncRequest,
+    ExceptionalOvertimeRequest,
+    WFHApprovalRequest,
+)
+
+
+class DummyScalars:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
 
 
 class DummyResult:
@@ -17,6 +36,9 @@ class DummyResult:
     def first(self):
         return self._row
 
+    def scalars(self):
+        return DummyScalars(self._row)
+
 
 @pytest.mark.anyio
 async def test_exceptional_overtime_blocks_when_feature_disabled(monkeypatch):
@@ -115,3 +137,103 @@ async def test_wfh_approval_allows_manager_for_direct_report(monkeypatch):
 
     assert response.wfh_approved is True
     assert record.wfh_approved_by == current_user.id
+
+
+class SyncSession:
+    def __init__(self, stored, records):
+        self.results = [DummyResult(stored), DummyResult(records)]
+        self.added = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        return self.results.pop(0)
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        yield
+
+    def add(self, row):
+        self.added.append(row)
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.mark.anyio
+async def test_sync_applies_in_order_and_skips_known_keys(monkeypatch):
+    monkeypatch.setattr(
+        attendance_router,
+        "check_feature_enabled",
+        AsyncMock(return_value=True),
+    )
+    now = datetime.now(timezone.utc)
+    record = SimpleNamespace(id=7)
+    monkeypatch.setattr(attendance_router, "_apply_sync_event", AsyncMock(return_value=record))
+    monkeypatch.setattr(attendance_router, "build_response", lambda r, name: None)
+    stored = AttendanceSyncEvent(
+        employee_id=10, idempotency_key="a", event_type="clock_in", status="applied", attendance_record_id=7
+    )
+    session = SyncSession([stored], [record])
+    request = AttendanceSyncRequest(events=[
+        {"idempotency_key": "a", "event_type": "clock_in", "occurred_at": now - timedelta(hours=3)},
+        {"idempotency_key": "b", "event_type": "break_start", "occurred_at": now - timedelta(hours=2)},
+        {"idempotency_key": "c", "event_type": "break_end", "occurred_at": now - timedelta(hours=4)},
+        {"idempotency_key": "b", "event_type": "break_start", "occurred_at": now - timedelta(hours=2)},
+        {"idempotency_key": "d", "event_type": "clock_out", "occurred_at": now + timedelta(hours=1)},
+    ])
+    current_user = SimpleNamespace(id=10, name="Employee")
+
+    response = await attendance_router.sync_offline_events(request, current_user, session)
+
+    assert [r.status for r in response.results] == ["duplicate", "applied", "rejected", "duplicate", "rejected"]
+    assert (response.applied, response.rejected, response.duplicates) == (1, 2, 2)
+    assert response.results[2].detail == "Event is earlier than the previous synced event"
+    assert response.results[4].detail == "Event time is in the future"
+    assert [row.idempotency_key for row in session.added] == ["b", "c", "d"]
+    assert session.commits == 1
+
+
+@pytest.mark.anyio
+async def test_manager_daily_summary_shows_only_direct_reports():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    day = date(2026, 10, 12)
+
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        def employee(number, name, **fields):
+            return Employee(
+                employee_id=number, name=name, password_hash="x", date_of_birth=date(1990, 1, 1), **fields
+            )
+
+        manager, other_manager = employee("M1", "Alice", role="manager"), employee("M2", "Bob", role="manager")
+        session.add_all([manager, other_manager])
+        await session.flush()
+        present = employee("R1", "Dana", line_manager_id=manager.id)
+        on_leave = employee("R2", "Eve", line_manager_id=manager.id)
+        elsewhere = employee("R3", "Finn", line_manager_id=other_manager.id)
+        session.add_all([present, on_leave, elsewhere])
+        await session.flush()
+        for report in (present, elsewhere):
+            session.add(AttendanceRecord(
+                employee_id=report.id, attendance_date=day, work_type="office", status="present",
+                overtime_type="none", is_late=False, is_early_departure=False, work_location="Head Office",
+                clock_in=datetime(2026, 10, 12, 4, 30, tzinfo=timezone.utc),
+            ))
+        session.add(LeaveRequest(
+            employee_id=on_leave.id, leave_type="annual", start_date=day - timedelta(days=1),
+            end_date=day + timedelta(days=1), total_days=Decimal("3"), status="approved",
+        ))
+        await session.commit()
+
+        summary = await attendance_router.get_manager_daily_summary(manager.id, day, manager, session)
+
+        assert [(row.employee_name, row.status) for row in summary.employees] == [
+            ("Dana", "Present"), ("Eve", "On Leave"),
+        ]
+        assert (summary.team_size, summary.present_count, summary.on_leave_count) == (2, 1, 1)
+
+        with pytest.raises(HTTPException) as exc:
+            await attendance_router.get_manager_daily_summary(other_manager.id, day, manager, session)
+        assert exc.value.status_code == 403
+    await engine.dispose()
@@ -0,0 +1,56 @@
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.idempotency import IDEMPOTENT_ROUTES
+from app.services import offset_ledger
+from app.services.bulk_approval import approval_results, may_decide, triage, unique_ids
+
+
+def test_triage_and_outcomes_follow_request_order():
+    ids = unique_ids([4, 1, 4, 2, 3, 9])
+    rows = {
+        1: (True, True),
+        2: (True, False),  # already decided
+        3: (False, True),  # someone else's report
+        4: (True, True),
+    }
+
+    eligible, skipped = triage(ids, rows)
+    # Record 1 was decided by someone else between the SELECT and the UPDATE
+    response = approval_results(ids, skipped, decided={4}, approved=False)
+
+    assert ids == [4, 1, 2, 3, 9]
+    assert eligible == [4, 1]
+    assert [(r.id, r.outcome) for r in response.results] == [
+        (4, "rejected"), (1, "not_pending"), (2, "not_pending"), (3, "forbidden"), (9, "not_found"),
+    ]
+    assert (response.approved, response.rejected, response.skipped) == (0, 1, 4)
+
+
+def test_authority_and_idempotent_routes():
+    assert may_decide("hr", 1, None)
+    assert may_decide("manager", 7, 7)
+    assert not may_decide("manager", 7, 8)
+    for path in ("/api/attendance/approve-wfh/bulk", "/api/timesheets/hr-approve/bulk"):
+        assert any(route.search(path) for route in IDEMPOTENT_ROUTES)
+
+
+@pytest.mark.anyio
+async def test_bulk_credits_lock_before_reading_credits():
+    calls = []
+
+    async def execute(statement):
+        calls.append("lock" if statement._for_update_arg is not None else "query")
+        return MagicMock(all=lambda: [], scalars=lambda: MagicMock(all=lambda: []))
+
+    session = MagicMock(execute=execute, flush=AsyncMock())
+
+    entries = await offset_ledger.sync_record_credits(
+        session, [(5, 40, date(2026, 10, 2), Decimal("2")), (5, 41, date(2026, 10, 3), Decimal("1"))]
+    )
+
+    assert calls[0] == "lock"
+    assert [(e.entry_type, e.balance_after) for e in entries] == [("earn", Decimal("2")), ("earn", Decimal("3"))]
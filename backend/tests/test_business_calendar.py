@@ -0,0 +1,43 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from app.services.business_calendar import BusinessCalendar, count_leave_days
+
+
+def _brute_force(calendar: BusinessCalendar, start_date: date, end_date: date, schedule: str) -> int:
+    days = (end_date - start_date).days + 1
+    return sum(
+        calendar.is_working_day(start_date + timedelta(days=i), schedule) for i in range(max(days, 0))
+    )
+
+
+def test_working_days_excludes_rest_days_and_holidays():
+    calendar = BusinessCalendar({date(2026, 12, 2): 1, date(2026, 12, 3): 1})
+
+    # September 2026: 30 days, 8 Fridays/Saturdays, 4 Saturdays
+    assert calendar.working_days(date(2026, 9, 1), date(2026, 9, 30)) == 22
+    assert calendar.working_days(date(2026, 9, 1), date(2026, 9, 30), "6 days") == 26
+    # National Day falls on Wednesday/Thursday in 2026
+    assert calendar.is_holiday(date(2026, 12, 2))
+    assert calendar.working_days(date(2026, 11, 29), date(2026, 12, 3)) == 3
+    assert calendar.working_days(date(2026, 9, 2), date(2026, 9, 1)) == 0
+
+
+def test_working_days_matches_day_by_day_count_across_years():
+    calendar = BusinessCalendar({date(2026, 12, 31): 1, date(2027, 1, 1): 2})
+    start_date, end_date = date(2026, 11, 17), date(2028, 3, 2)
+
+    for schedule in ("5 days", "6 days"):
+        assert calendar.working_days(start_date, end_date, schedule) == _brute_force(
+            calendar, start_date, end_date, schedule
+        )
+
+
+def test_count_leave_days_by_type():
+    calendar = BusinessCalendar({})
+    # Thursday to Sunday: Friday and Saturday are rest days
+    start_date, end_date = date(2026, 10, 1), date(2026, 10, 4)
+
+    assert count_leave_days(calendar, "annual", start_date, end_date, False) == Decimal("2")
+    assert count_leave_days(calendar, "sick", start_date, end_date, False) == Decimal("4")
+    assert count_leave_days(calendar, "annual", start_date, start_date, True) == Decimal("0.5")
@@ -0,0 +1,84 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.clock_ingest import ClockIngestQueue
+
+
+class FakeSession:
+    def __init__(self):
+        self.commits = 0
+        self.savepoints = 0
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        self.savepoints += 1
+        yield
+
+    async def execute(self, statement):
+        return None
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+class FakeSessionFactory:
+    def __init__(self):
+        self.sessions = []
+
+    @asynccontextmanager
+    async def __call__(self):
+        session = FakeSession()
+        self.sessions.append(session)
+        yield session
+
+
+def _work(record_id: int, fail: bool = False):
+    async def work(session):
+        if fail:
+            raise HTTPException(status_code=400, detail="Already clocked in today")
+        return SimpleNamespace(id=record_id)
+
+    return work
+
+
+@pytest.mark.anyio
+async def test_events_share_one_commit_and_fail_individually():
+    factory = FakeSessionFactory()
+    queue = ClockIngestQueue(factory, max_batch=10, flush_interval_ms=20)
+
+    results = await asyncio.gather(
+        *(queue.submit(_work(i, fail=(i == 2))) for i in range(5)),
+        return_exceptions=True,
+    )
+    await queue.shutdown()
+
+    assert [r.id for i, r in enumerate(results) if i != 2] == [0, 1, 3, 4]
+    assert isinstance(results[2], HTTPException)
+    assert len(factory.sessions) == 1
+    assert factory.sessions[0].commits == 1
+    assert factory.sessions[0].savepoints == 5
+
+    stats = queue.stats()
+    assert stats["batches"] == 1
+    assert stats["events"] == 5
+    assert stats["failed_events"] == 1
+    assert stats["batch_sizes"]["le_5"] == 1
+
+
+@pytest.mark.anyio
+async def test_batches_are_capped_at_max_batch():
+    factory = FakeSessionFactory()
+    queue = ClockIngestQueue(factory, max_batch=2, flush_interval_ms=20)
+
+    await asyncio.gather(*(queue.submit(_work(i)) for i in range(5)))
+    await queue.shutdown()
+
+    assert queue.stats()["max_batch_size"] == 2
+    assert sum(session.commits for session in factory.sessions) == 3
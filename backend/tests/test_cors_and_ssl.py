@@ -23,8 +23,16 @@ def test_cors_configuration_in_code():
         "CORS middleware should restrict methods to GET, POST, PUT, DELETE, PATCH"
     
     # Check that allow_headers is restricted
-    assert 'allow_headers=["Content-Type", "Authorization"]' in content, \
-        "CORS middleware should restrict headers to Content-Type and Authorization"
+    assert 'allow_headers=["Content-Type", "Authorization", "Idempotency-Key"]' in content, \
+        "CORS middleware should restrict headers to Content-Type, Authorization and Idempotency-Key"
+
+    # Browser clients need to read the replay marker on idempotent retries
+    assert '"Idempotent-Replayed"' in content and "expose_headers=" in content, \
+        "CORS middleware should expose the Idempotent-Replayed header"
+
+    # Resumable payroll downloads read the next cursor from a response header
+    assert '"X-Next-Cursor"' in content, \
+        "CORS middleware should expose the X-Next-Cursor header"
     
     # Make sure we're not using wildcards
     lines = content.split('\n')
@@ -49,6 +57,26 @@ def test_cors_configuration_in_code():
     print("✓ CORS configuration in main.py is correct")
 
 
+def test_preflight_allows_idempotency_key():
+    """A browser on an allowed origin may send Idempotency-Key."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app, settings
+
+    origin = settings.get_allowed_origins_list()[0]
+    response = TestClient(app).options(
+        f"{settings.api_prefix}/attendance/clock-in",
+        headers={
+            "Origin": origin,
+            "Access-Control-Request-Method": "POST",
+            "Access-Control-Request-Headers": "content-type, idempotency-key",
+        },
+    )
+
+    assert response.status_code == 200
+    assert "Idempotency-Key" in response.headers["access-control-allow-headers"]
+
+
 def test_ssl_configuration_in_database():
     """Test that SSL configuration is properly handled in database.py."""
     database_py = ROOT / "app" / "database.py"
@@ -0,0 +1,33 @@
+import pytest
+
+from app.services.feature_flags import FeatureFlagSnapshot
+
+
+class FakeSettingsRepo:
+    def __init__(self):
+        self.version = 1
+        self.flags = {"feature_attendance": True, "feature_attendance_gps": False}
+        self.map_loads = 0
+
+    async def get_version(self, session):
+        return self.version
+
+    async def get_toggle_map(self, session):
+        self.map_loads += 1
+        return dict(self.flags)
+
+
+@pytest.mark.anyio
+async def test_snapshot_reloads_only_on_version_change():
+    repo = FakeSettingsRepo()
+    flags = FeatureFlagSnapshot(repo, poll_seconds=0)
+
+    assert await flags.is_enabled(None, "feature_attendance")
+    assert not await flags.is_enabled(None, "feature_attendance_gps")
+    assert await flags.is_enabled(None, "missing_key", default=True)
+    assert repo.map_loads == 1
+
+    repo.flags["feature_attendance_gps"] = True
+    repo.version = 2
+    assert await flags.is_enabled(None, "feature_attendance_gps")
+    assert repo.map_loads == 2
@@ -0,0 +1,34 @@
+from decimal import Decimal
+
+import numpy as np
+
+from app.models.geofence import haversine_distance
+from app.services.geofence_audit import audit_points, haversine_matrix
+from app.services.geofence_index import GeofenceEntry
+
+FENCES = [
+    GeofenceEntry(1, "Head Office", Decimal("24.4539"), Decimal("54.3773"), 200, True),
+    GeofenceEntry(2, "KEZAD", Decimal("24.6400"), Decimal("54.6350"), 500, True),
+]
+
+
+def test_haversine_matrix_matches_scalar_formula():
+    lats, lons = np.array([24.45, 24.7, 25.2]), np.array([54.37, 54.6, 55.3])
+    matrix = haversine_matrix(lats, lons, np.array([24.4539, 24.64]), np.array([54.3773, 54.635]))
+
+    assert matrix.shape == (3, 2)
+    for i in range(3):
+        for j, (lat, lon) in enumerate(((24.4539, 54.3773), (24.64, 54.635))):
+            assert abs(matrix[i, j] - haversine_distance(lats[i], lons[i], lat, lon)) < 1e-6
+
+
+def test_audit_points_uses_named_geofence_or_any_geofence():
+    # At Head Office, declared Head Office / declared KEZAD / no fixed geofence / nowhere
+    lats = np.array([24.4540, 24.4540, 24.6401, 25.0])
+    lons = np.array([54.3774, 54.3774, 54.6351, 55.0])
+    flagged, distance = audit_points(lats, lons, ["Head Office", "KEZAD", "Sites", None], FENCES)
+
+    assert flagged.tolist() == [False, True, False, True]
+    assert distance[0] < 200
+    assert distance[1] > 20000
+    assert distance[2] < 500
@@ -0,0 +1,62 @@
+import random
+from decimal import Decimal
+
+from app.models.geofence import haversine_distance
+from app.services.geofence_index import GeofenceEntry, GeofenceIndex
+
+
+def _entry(id: int, lat: float, lon: float, radius: int) -> GeofenceEntry:
+    return GeofenceEntry(id, f"Site {id}", Decimal(str(lat)), Decimal(str(lon)), radius, True)
+
+
+def test_index_matches_linear_scan():
+    rng = random.Random(7)
+    entries = [
+        _entry(i, 24.0 + rng.random(), 54.0 + rng.random(), rng.choice((100, 300, 2000, 8000)))
+        for i in range(200)
+    ]
+    index = GeofenceIndex(entries, cell_degrees=0.05)
+
+    for _ in range(300):
+        lat, lon = 23.9 + rng.random() * 1.2, 53.9 + rng.random() * 1.2
+        distances = {e.id: haversine_distance(lat, lon, float(e.latitude), float(e.longitude)) for e in entries}
+
+        expected_inside = {e.id for e in entries if distances[e.id] <= e.radius_meters}
+        assert {e.id for e, _ in index.containing(lat, lon)} == expected_inside
+
+        expected_near = {i for i, d in distances.items() if d <= 5000}
+        assert {e.id for e, _ in index.within(lat, lon, 5000)} == expected_near
+
+        nearest, distance = index.nearest(lat, lon)
+        assert distance == min(distances.values())
+
+
+def test_nearest_far_from_everything_and_empty_index():
+    index = GeofenceIndex([_entry(1, 24.45, 54.38, 200)], cell_degrees=0.05)
+
+    nearest, distance = index.nearest(25.3, 55.4)
+    assert nearest.id == 1
+    assert distance > 100_000
+    assert index.containing(25.3, 55.4) == []
+    assert GeofenceIndex([], cell_degrees=0.05).nearest(24.45, 54.38) is None
+
+
+def test_far_away_and_antimeridian_points_fall_back_to_a_scan():
+    index = GeofenceIndex([_entry(1, 24.45, 54.38, 200), _entry(2, 25.2, 55.27, 500)], cell_degrees=0.01)
+
+    # A bad GPS fix at (0, 0) is thousands of kilometres from every fence
+    nearest, distance = index.nearest(0.0, 0.0)
+    assert nearest.id == 1
+    assert distance > 5_000_000
+    assert [e.id for e, _ in index.within(0.0, 0.0, 20_000_000)] == [1, 2]
+
+    nearest, _ = index.nearest(-60.0, 179.99)
+    assert nearest.id in (1, 2)
+    assert index.nearest(89.99, 0.0)[0].id == 2
+
+
+def test_oversized_geofence_is_checked_without_bucketing():
+    index = GeofenceIndex([_entry(1, 24.45, 54.38, 3_000_000)], cell_degrees=0.001)
+
+    assert [e.id for e, _ in index.containing(30.0, 60.0)] == [1]
+    assert [e.id for e, _ in index.within(24.46, 54.39, 2000)] == [1]
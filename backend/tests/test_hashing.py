@@ -0,0 +1,21 @@
+import pytest
+
+from app.core.hashing import HashingExecutor
+from app.services.employees import hash_password, verify_password
+
+
+@pytest.mark.anyio
+async def test_hashing_executor_round_trip_and_stats():
+    executor = HashingExecutor(max_workers=2)
+    try:
+        hashed = await executor.run(hash_password, "s3cret-pass")
+        assert await executor.run(verify_password, "s3cret-pass", hashed)
+        assert not await executor.run(verify_password, "wrong", hashed)
+
+        stats = executor.stats()
+        assert stats["completed"] == 3
+        assert stats["queue_depth"] == 0
+        assert stats["in_flight"] == 0
+        assert stats["avg_run_ms"] > 0
+    finally:
+        executor.shutdown()
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+import httpx
+import jwt
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from app.core.config import get_settings
+from app.core.idempotency import IdempotencyMiddleware, request_fingerprint
+
+
+class FakeStore:
+    def __init__(self):
+        self.rows = {}
+
+    async def claim(self, scope, key, request_hash):
+        existing = self.rows.get((scope, key))
+        if existing is None:
+            self.rows[(scope, key)] = SimpleNamespace(request_hash=request_hash, status_code=None)
+        return existing
+
+    async def complete(self, scope, key, status_code, content_type, body):
+        row = self.rows[(scope, key)]
+        row.status_code, row.content_type, row.response_body = status_code, content_type, body
+
+    async def release(self, scope, key):
+        if self.rows.get((scope, key)) and self.rows[(scope, key)].status_code is None:
+            del self.rows[(scope, key)]
+
+
+def _client(store):
+    app = FastAPI()
+    calls = []
+
+    @app.post("/api/attendance/clock-in")
+    async def clock_in(body: dict):
+        calls.append(body)
+        if len(calls) > 1:
+            raise HTTPException(status_code=400, detail="Already clocked in today")
+        return {"id": len(calls)}
+
+    @app.post("/api/attendance/clock-out")
+    async def clock_out():
+        raise RuntimeError("boom")
+
+    app.add_middleware(IdempotencyMiddleware, store=store)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url="http://test"), calls
+
+
+def _headers(employee_id: str, key: str):
+    token = jwt.encode({"sub": employee_id}, get_settings().auth_secret_key, algorithm="HS256")
+    return {"Authorization": f"Bearer {token}", "Idempotency-Key": key}
+
+
+@pytest.mark.anyio
+async def test_retry_replays_stored_response_without_calling_endpoint():
+    store = FakeStore()
+    client, calls = _client(store)
+    async with client:
+        first = await client.post("/api/attendance/clock-in", json={"a": 1}, headers=_headers("7", "k1"))
+        retry = await client.post("/api/attendance/clock-in", json={"a": 1}, headers=_headers("7", "k1"))
+        reused = await client.post("/api/attendance/clock-in", json={"a": 2}, headers=_headers("7", "k1"))
+        other_user = await client.post("/api/attendance/clock-in", json={"a": 1}, headers=_headers("8", "k1"))
+
+    assert first.status_code == 200 and first.json() == {"id": 1}
+    assert retry.status_code == 200 and retry.json() == {"id": 1}
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert reused.status_code == 422
+    assert other_user.status_code == 400
+    assert len(calls) == 2
+
+
+@pytest.mark.anyio
+async def test_in_flight_key_conflicts_and_server_errors_are_not_stored():
+    store = FakeStore()
+    store.rows[("7", "busy")] = SimpleNamespace(
+        request_hash=request_fingerprint("POST", "/api/attendance/clock-out", b""), status_code=None
+    )
+    client, _ = _client(store)
+    async with client:
+        busy = await client.post("/api/attendance/clock-out", headers=_headers("7", "busy"))
+        failed = await client.post("/api/attendance/clock-out", headers=_headers("7", "k2"))
+
+    assert busy.status_code == 409
+    assert failed.status_code == 500
+    assert ("7", "k2") not in store.rows
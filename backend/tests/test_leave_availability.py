@@ -0,0 +1,33 @@
+import numpy as np
+
+from app.services.leave_availability import absence_matrix
+
+
+def test_absence_matrix_groups_and_dedupes_overlapping_leave():
+    # Employees 0 and 1 are in group 0, employee 2 in group 1; 5-day window
+    counts = absence_matrix(
+        num_days=5,
+        num_groups=2,
+        employee_groups=np.array([0, 0, 1]),
+        leave_rows=np.array([0, 0, 1, 2]),
+        leave_starts=np.array([-3, 1, 3, 4]),
+        leave_ends=np.array([1, 2, 9, 4]),
+    )
+
+    assert counts.tolist() == [
+        [1, 1, 1, 1, 1],
+        [0, 0, 0, 0, 1],
+    ]
+
+
+def test_absence_matrix_without_leave():
+    counts = absence_matrix(
+        num_days=3,
+        num_groups=1,
+        employee_groups=np.array([0, 0]),
+        leave_rows=np.array([], dtype=np.int64),
+        leave_starts=np.array([], dtype=np.int64),
+        leave_ends=np.array([], dtype=np.int64),
+    )
+
+    assert counts.tolist() == [[0, 0, 0]]
@@ -0,0 +1,81 @@
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app.routers import leave as leave_router
+from app.schemas.leave import LeaveCalendarDay
+from app.services.leave_index import LeaveInterval, LeaveIntervalIndex
+
+
+def _leave(employee_id: int, start_date: date, end_date: date, leave_type: str = "annual") -> LeaveInterval:
+    return LeaveInterval(employee_id, f"Employee {employee_id}", leave_type, start_date, end_date, False)
+
+
+def test_membership_and_counts_clamped_to_window():
+    index = LeaveIntervalIndex(
+        [
+            _leave(2, date(2026, 10, 5), date(2026, 10, 7)),
+            _leave(1, date(2026, 9, 28), date(2026, 10, 2)),
+            _leave(3, date(2026, 10, 7), date(2026, 10, 20)),
+        ],
+        date(2026, 10, 1),
+        date(2026, 10, 10),
+    )
+
+    assert [i.employee_id for i in index.intervals] == [1, 2, 3]
+    assert index.employees_on_leave(date(2026, 10, 1)) == {1}
+    assert index.employees_on_leave(date(2026, 10, 3)) == set()
+    assert index.employees_on_leave(date(2026, 10, 7)) == {2, 3}
+    assert index.is_on_leave(3, date(2026, 10, 10))
+    assert not index.is_on_leave(2, date(2026, 10, 8))
+
+    counts = index.daily_counts()
+    assert len(counts) == 10
+    assert counts[date(2026, 10, 2)] == 1
+    assert counts[date(2026, 10, 4)] == 0
+    assert counts[date(2026, 10, 7)] == 2
+
+    with pytest.raises(ValueError):
+        index.employees_on_leave(date(2026, 10, 11))
+
+
+def test_overlapping_requests_count_employee_once():
+    index = LeaveIntervalIndex(
+        [
+            _leave(1, date(2026, 10, 3), date(2026, 10, 6), "sick"),
+            _leave(1, date(2026, 10, 1), date(2026, 10, 4)),
+        ],
+        date(2026, 10, 1),
+        date(2026, 10, 6),
+    )
+
+    assert index.daily_counts()[date(2026, 10, 4)] == 1
+    # The earlier-starting request is reported where the two overlap
+    assert index.leave_for(1, date(2026, 10, 4)).leave_type == "annual"
+    assert index.leave_for(1, date(2026, 10, 5)).leave_type == "sick"
+
+
+@pytest.mark.anyio
+async def test_daily_calendar_lists_employees_per_day(monkeypatch):
+    intervals = [
+        _leave(9, date(2026, 10, 2), date(2026, 10, 5)),
+        _leave(4, date(2026, 9, 30), date(2026, 10, 2)),
+        _leave(4, date(2026, 10, 3), date(2026, 10, 3), "sick"),
+    ]
+
+    async def load(session, window_start, window_end):
+        return LeaveIntervalIndex(intervals, window_start, window_end)
+
+    monkeypatch.setattr(leave_router, "load_leave_index", load)
+
+    days = await leave_router.get_leave_calendar_daily(
+        date(2026, 10, 1), date(2026, 10, 4), SimpleNamespace(role="viewer", id=1), None
+    )
+
+    assert days == [
+        LeaveCalendarDay(date=date(2026, 10, 1), on_leave_count=1, employee_ids=[4]),
+        LeaveCalendarDay(date=date(2026, 10, 2), on_leave_count=2, employee_ids=[4, 9]),
+        LeaveCalendarDay(date=date(2026, 10, 3), on_leave_count=2, employee_ids=[4, 9]),
+        LeaveCalendarDay(date=date(2026, 10, 4), on_leave_count=1, employee_ids=[9]),
+    ]
@@ -0,0 +1,122 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models.recruitment  # Registers the recruitment tables employees refer to
+import app.services.manager_summary as manager_summary
+from app.models import AttendanceRecord, Base, Employee
+from app.models.leave import LeaveRequest
+from app.services.manager_summary import (
+    STATUS_NOT_CHECKED_IN, STATUS_ON_LEAVE, STATUS_PRESENT,
+    build_manager_summaries, send_manager_summary_emails,
+)
+
+TODAY = date(2026, 10, 12)
+CLOCK_IN = datetime(2026, 10, 12, 4, 0, tzinfo=timezone.utc)
+
+
+def _employee(number, name, **fields):
+    return Employee(
+        employee_id=number, name=name, password_hash="x", date_of_birth=date(1990, 1, 1), **fields
+    )
+
+
+def _record(employee_id, **fields):
+    values = dict(
+        employee_id=employee_id, attendance_date=TODAY, work_type="office", status="present",
+        overtime_type="none", is_late=False, is_early_departure=False, clock_in=CLOCK_IN,
+    )
+    values.update(fields)
+    return AttendanceRecord(**values)
+
+
+@pytest.fixture
+async def team_db():
+    """Three managers: Alice with a mixed team, Bob with one report, Carol without an email."""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with sessions() as session:
+        managers = [
+            _employee("M1", "Alice", email="alice@example.com"),
+            _employee("M2", "Bob", email="bob@example.com"),
+            _employee("M3", "Carol"),
+        ]
+        session.add_all(managers)
+        await session.flush()
+        alice, bob, carol = (manager.id for manager in managers)
+        reports = {
+            name: _employee(f"R{i}", name, line_manager_id=manager_id, is_active=name != "Zed")
+            for i, (name, manager_id) in enumerate([
+                ("Dana", alice), ("Eve", alice), ("Finn", alice), ("Gus", alice), ("Zed", alice),
+                ("Hana", bob), ("Ivy", carol),
+            ])
+        }
+        session.add_all(reports.values())
+        await session.flush()
+        session.add_all([
+            _record(reports["Dana"].id, work_location="Head Office"),
+            _record(
+                reports["Eve"].id, work_type="wfh", work_location="Work From Home",
+                location_remarks="Plumber visit", wfh_approval_confirmed=True,
+            ),
+            # Clocked in by mistake, but approved leave wins
+            _record(reports["Finn"].id, work_location="Head Office"),
+            _record(reports["Hana"].id, work_location="KEZAD"),
+            _record(reports["Ivy"].id, work_location="Sites"),
+        ])
+        session.add(LeaveRequest(
+            employee_id=reports["Finn"].id, leave_type="sick_leave", start_date=TODAY,
+            end_date=TODAY, total_days=Decimal("1"), status="approved",
+        ))
+        await session.commit()
+
+    async with sessions() as session:
+        yield session, (alice, bob, carol)
+    await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_summaries_group_direct_reports_and_classify_them(team_db):
+    session, (alice, bob, carol) = team_db
+
+    summaries = await build_manager_summaries(session, TODAY)
+
+    assert set(summaries) == {alice, bob, carol}
+    team = summaries[alice]
+    rows = {row.employee_name: row for row in team.employees}
+    assert list(rows) == ["Dana", "Eve", "Finn", "Gus"]
+    assert (rows["Dana"].status, rows["Dana"].work_location) == (STATUS_PRESENT, "Head Office")
+    assert rows["Dana"].last_update is not None
+    assert (rows["Eve"].status, rows["Eve"].remarks) == (STATUS_PRESENT, "Approved - Plumber visit")
+    assert (rows["Finn"].status, rows["Finn"].remarks, rows["Finn"].work_location) == (
+        STATUS_ON_LEAVE, "Sick Leave", None,
+    )
+    assert (rows["Gus"].status, rows["Gus"].remarks) == (STATUS_NOT_CHECKED_IN, "—")
+    assert (team.team_size, team.present_count, team.on_leave_count, team.not_checked_in_count, team.wfh_count) == (
+        4, 2, 1, 1, 1,
+    )
+    assert [row.employee_name for row in summaries[bob].employees] == ["Hana"]
+
+
+@pytest.mark.anyio
+async def test_one_failed_send_does_not_stop_the_batch(team_db, monkeypatch):
+    session, _ = team_db
+    sent_to = []
+
+    class FakeEmailService:
+        async def send_email(self, to_email, subject, html_body):
+            sent_to.append(to_email)
+            if to_email == "alice@example.com":
+                raise ConnectionError("SMTP down")
+            return True
+
+    monkeypatch.setattr(manager_summary, "get_email_service", FakeEmailService)
+
+    assert await send_manager_summary_emails(session, TODAY) == 1
+    # Carol has no email address, so only two sends are attempted
+    assert sorted(sent_to) == ["alice@example.com", "bob@example.com"]
@@ -0,0 +1,92 @@
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.models.offset_ledger import OffsetLedgerEntry
+from app.routers import attendance as attendance_router
+from app.services import offset_ledger
+
+
+def _latest(balance: str, earned: str, used: str) -> OffsetLedgerEntry:
+    return OffsetLedgerEntry(
+        employee_id=5,
+        entry_type="earn",
+        hours=Decimal("1"),
+        entry_date=date(2026, 10, 1),
+        balance_after=Decimal(balance),
+        earned_to_date=Decimal(earned),
+        used_to_date=Decimal(used),
+        expired_to_date=Decimal("0"),
+    )
+
+
+@pytest.mark.anyio
+async def test_append_entry_carries_running_totals(monkeypatch):
+    monkeypatch.setattr(offset_ledger, "get_latest_entry", AsyncMock(return_value=_latest("6", "8", "2")))
+    session = MagicMock(execute=AsyncMock(), flush=AsyncMock())
+
+    entry = await offset_ledger.append_entry(session, 5, "use", Decimal("-4"), date(2026, 10, 2))
+
+    assert entry.balance_after == Decimal("2")
+    assert entry.earned_to_date == Decimal("8")
+    assert entry.used_to_date == Decimal("6")
+    session.add.assert_called_once_with(entry)
+
+
+@pytest.mark.anyio
+async def test_append_entry_rejects_overdraw(monkeypatch):
+    monkeypatch.setattr(offset_ledger, "get_latest_entry", AsyncMock(return_value=_latest("3", "3", "0")))
+    session = MagicMock(execute=AsyncMock(), flush=AsyncMock())
+
+    with pytest.raises(ValueError):
+        await offset_ledger.append_entry(session, 5, "expire", Decimal("-4"), date(2026, 10, 2))
+
+    session.add.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_sync_record_credit_locks_before_reading_credit(monkeypatch):
+    calls = []
+
+    async def execute(statement):
+        calls.append("lock" if statement._for_update_arg is not None else "query")
+
+    async def credited(session, record_id):
+        calls.append("credited")
+        return Decimal("0")
+
+    monkeypatch.setattr(offset_ledger, "credited_hours_for_record", credited)
+    monkeypatch.setattr(offset_ledger, "get_latest_entry", AsyncMock(return_value=None))
+    session = MagicMock(execute=execute, flush=AsyncMock())
+
+    entry = await offset_ledger.sync_record_credit(session, 5, 40, date(2026, 10, 2), Decimal("2"))
+
+    assert calls == ["lock", "credited"]
+    assert entry.entry_type == "earn"
+    assert entry.balance_after == Decimal("2")
+
+
+@pytest.mark.anyio
+async def test_claw_back_of_used_hours_records_a_deficit(monkeypatch, caplog):
+    # 4 hours earned on the record, 3 of them already taken as time off
+    monkeypatch.setattr(offset_ledger, "credited_hours_for_record", AsyncMock(return_value=Decimal("4")))
+    monkeypatch.setattr(offset_ledger, "get_latest_entry", AsyncMock(return_value=_latest("1", "4", "3")))
+    session = MagicMock(execute=AsyncMock(), flush=AsyncMock())
+
+    with caplog.at_level("WARNING", logger=offset_ledger.__name__):
+        entry = await offset_ledger.sync_record_credit(session, 5, 42, date(2026, 10, 1), Decimal("0"))
+
+    assert (entry.entry_type, entry.hours, entry.balance_after) == ("adjust", Decimal("-4"), Decimal("-3"))
+    assert "deficit" in caplog.text
+
+    offset_ledger.get_latest_entry.return_value = entry
+    with pytest.raises(ValueError):
+        await offset_ledger.append_entry(session, 5, "use", Decimal("-1"), date(2026, 10, 3))
+
+    monkeypatch.setattr(attendance_router, "get_latest_entry", AsyncMock(return_value=entry))
+    summary = await attendance_router.build_offset_summary(session, 5, "Dana")
+    assert summary.offset_hours_balance == Decimal("0")
+    assert summary.offset_days_balance == Decimal("0")
+    assert summary.offset_hours_deficit == Decimal("3")
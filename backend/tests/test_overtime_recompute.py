@@ -0,0 +1,76 @@
+import random
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.models.attendance import OVERTIME_RATE_HOLIDAY, OVERTIME_RATE_REGULAR, exceptional_overtime_pay
+from app.routers.attendance import calculate_hours_with_employee_settings
+from app.services.overtime_recompute import (
+    RECOMPUTED_FIELDS, OvertimeRecomputeJob, _recompute_rows, compute_hours,
+)
+
+
+def test_vectorized_hours_match_clock_out_calculation():
+    rng = random.Random(11)
+    cases = []
+    for _ in range(500):
+        day = date(2026, 9, 1) + timedelta(days=rng.randrange(60))
+        clock_in = datetime(day.year, day.month, day.day, 4, 0, tzinfo=timezone.utc) + timedelta(
+            minutes=rng.randrange(180)
+        )
+        clock_out = clock_in + timedelta(minutes=rng.randrange(0, 14 * 60))
+        employee = SimpleNamespace(
+            work_schedule=rng.choice(["5 days", "6 days", None]),
+            overtime_type=rng.choice(["Paid", "Offset", "N/A", None]),
+        )
+        cases.append((day, clock_in, clock_out, rng.choice([0, 30, 60, 95]), employee, rng.random() < 0.2))
+
+    result = compute_hours(
+        np.array([c[1].timestamp() for c in cases]),
+        np.array([c[2].timestamp() for c in cases]),
+        np.array([c[3] for c in cases], dtype=float),
+        np.array([c[0] for c in cases], dtype="datetime64[D]"),
+        np.array([bool(c[4].work_schedule and "6" in c[4].work_schedule) for c in cases]),
+        np.array([c[5] for c in cases]),
+        np.array([(c[4].overtime_type or "N/A").upper() != "N/A" for c in cases]),
+    )
+
+    for i, (day, clock_in, clock_out, break_minutes, employee, ramadan) in enumerate(cases):
+        total, regular, overtime, exceeds_daily, exceeds_overtime = calculate_hours_with_employee_settings(
+            clock_in, clock_out, break_minutes, employee, day, ramadan
+        )
+        assert Decimal(f"{result['total_hours'][i]:.2f}") == total
+        assert Decimal(f"{result['regular_hours'][i]:.2f}") == regular
+        assert Decimal(f"{result['overtime_hours'][i]:.2f}") == overtime
+        assert bool(result["exceeds_daily_limit"][i]) == exceeds_daily
+        assert bool(result["exceeds_overtime_limit"][i]) == exceeds_overtime
+
+
+def test_exceptional_overtime_pay_matches_hr_rates():
+    assert exceptional_overtime_pay(Decimal("2"), Decimal("7200"), False, False) == (
+        OVERTIME_RATE_REGULAR, Decimal("75.0"),
+    )
+    rate, amount = exceptional_overtime_pay(Decimal("2"), Decimal("7200"), True, False)
+    assert (rate, amount) == (OVERTIME_RATE_HOLIDAY, Decimal("90.0"))
+    assert exceptional_overtime_pay(Decimal("2"), None, False, True) == (OVERTIME_RATE_HOLIDAY, None)
+
+
+def test_ordinary_overtime_keeps_clock_out_fields():
+    clock_in = datetime(2026, 10, 12, 8, 0, tzinfo=timezone.utc)
+    # Paid overtime ending at 22:00 UAE, stored as clock-out leaves it
+    row = SimpleNamespace(
+        attendance_date=date(2026, 10, 12), clock_in=clock_in, clock_out=clock_in + timedelta(hours=10),
+        break_duration_minutes=0, work_schedule="5 days", policy="Paid", basic_salary=Decimal("7200"),
+        exceptional_overtime=False, overtime_approved=None, is_night_overtime=False, is_holiday_overtime=False,
+        total_hours=Decimal("10.00"), regular_hours=Decimal("8.00"), overtime_hours=Decimal("2.00"),
+        exceeds_daily_limit=False, exceeds_overtime_limit=False, is_ramadan_hours=False,
+        offset_hours_earned=None, overtime_type="auto-calculated",
+    )
+    job = OvertimeRecomputeJob(id="job", start_date=row.attendance_date, end_date=row.attendance_date)
+
+    values = _recompute_rows([row], job)[0]
+
+    assert set(values) == set(RECOMPUTED_FIELDS)
+    assert all(getattr(row, name) == value for name, value in values.items())
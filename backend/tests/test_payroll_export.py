@@ -0,0 +1,35 @@
+import csv
+import io
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from app.core.idempotency import IDEMPOTENT_ROUTES
+from app.services.payroll_export import (
+    PAYROLL_HEADER, _xlsx_row, new_payroll_reference, payroll_export_query, serialize_csv_rows
+)
+
+
+def test_csv_rows_keep_header_order_and_blank_nulls():
+    exported_at = datetime(2026, 10, 1, 8, 0, tzinfo=timezone.utc)
+    row = [7, "PAY-202609-AB12CD34", "E7", "Doe, Jane", None, 2026, 9, Decimal("12000.00")]
+    row += [None] * (len(PAYROLL_HEADER) - len(row) - 1) + [exported_at]
+
+    rows = list(csv.DictReader(io.StringIO(serialize_csv_rows([PAYROLL_HEADER, row]))))
+
+    assert list(rows[0]) == PAYROLL_HEADER
+    assert rows[0]["timesheet_id"] == "7"
+    assert rows[0]["employee_name"] == "Doe, Jane"
+    assert rows[0]["department"] == ""
+    assert rows[0]["basic_salary"] == "12000.00"
+    assert rows[0]["exported_at"] == "2026-10-01T08:00:00+00:00"
+    assert _xlsx_row(row)[7] == 12000.0
+
+
+def test_resume_query_and_reference():
+    query = payroll_export_query(2026, 9, "PAY-202609-AB12CD34", after_id=40)
+    sql = str(query.compile(compile_kwargs={"literal_binds": True}))
+
+    assert "timesheets.id > 40" in sql
+    assert "ORDER BY timesheets.id" in sql
+    assert new_payroll_reference(2026, 9).startswith("PAY-202609-")
+    assert any(route.search("/api/timesheets/payroll-export/2026/9") for route in IDEMPOTENT_ROUTES)
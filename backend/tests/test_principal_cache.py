@@ -0,0 +1,108 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.auth import principal as principal_module
+from app.auth.principal import Principal, PrincipalCache, resolve_principal
+from app.repositories.employees import EmployeeRepository
+from app.schemas.employee import EmployeeUpdate
+from app.services.employees import EmployeeService
+
+
+def _principal(employee_id: str, role: str = "viewer") -> Principal:
+    return Principal(
+        id=1,
+        employee_id=employee_id,
+        name="Test",
+        role=role,
+        is_active=True,
+        line_manager_id=None,
+        location=None,
+        work_schedule=None,
+        overtime_type=None,
+    )
+
+
+def test_principal_cache_lru_and_invalidate():
+    cache = PrincipalCache(max_size=2, ttl_seconds=60)
+    cache.put(("E1", 100), _principal("E1"))
+    cache.put(("E1", 200), _principal("E1"))
+    cache.put(("E2", 100), _principal("E2"))
+
+    # Oldest entry evicted once the cache is full
+    assert cache.get(("E1", 100)) is None
+    assert cache.get(("E1", 200)).employee_id == "E1"
+
+    cache.invalidate("E1")
+    assert cache.get(("E1", 200)) is None
+    assert cache.get(("E2", 100)) is not None
+
+
+def test_principal_cache_expires_entries(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(principal_module.time, "monotonic", lambda: clock[0])
+    cache = PrincipalCache(max_size=10, ttl_seconds=30)
+    cache.put(("E1", 100), _principal("E1"))
+    assert cache.get(("E1", 100)) is not None
+
+    clock[0] += 31
+    assert cache.get(("E1", 100)) is None
+
+
+class _EmployeeSession:
+    """Fake session that serves one employee to the repository and to resolve_principal."""
+
+    def __init__(self, employee, on_commit=None):
+        self.employee = employee
+        self.on_commit = on_commit
+
+    async def execute(self, query):
+        employee = self.employee
+        columns = (
+            employee.id, employee.employee_id, employee.name, employee.role, employee.is_active,
+            employee.line_manager_id, employee.location, employee.work_schedule,
+            employee.overtime_type, employee.department,
+        )
+        return SimpleNamespace(
+            scalar_one_or_none=lambda: employee,
+            first=lambda: columns,
+        )
+
+    async def flush(self):
+        pass
+
+    async def refresh(self, obj):
+        pass
+
+    async def commit(self):
+        if self.on_commit:
+            await self.on_commit()
+
+
+async def _exists(*args):
+    return True
+
+
+@pytest.mark.anyio
+async def test_employee_update_drops_cached_principal(monkeypatch):
+    monkeypatch.setattr(principal_module, "_principal_cache", PrincipalCache(max_size=10, ttl_seconds=300))
+    employee = SimpleNamespace(
+        id=1, employee_id="E1", name="Test", role="hr", is_active=True, line_manager_id=None,
+        location=None, work_schedule=None, overtime_type=None, department=None,
+    )
+    session = _EmployeeSession(employee)
+    assert (await resolve_principal(session, "E1", 100)).role == "hr"
+
+    await EmployeeRepository().update(session, "E1", {"role": "viewer"})
+    assert (await resolve_principal(session, "E1", 100)).role == "viewer"
+
+    # A request resolving between flush and commit must not keep the old row cached
+    async def concurrent_resolve():
+        await resolve_principal(session, "E1", 100)
+        employee.line_manager_id = 7
+
+    session.on_commit = concurrent_resolve
+    service = EmployeeService(EmployeeRepository())
+    monkeypatch.setattr(service._repo, "exists", _exists)
+    await service.update_employee(session, "E1", EmployeeUpdate(line_manager_id=7))
+    assert (await resolve_principal(session, "E1", 100)).line_manager_id == 7
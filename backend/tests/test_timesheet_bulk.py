@@ -0,0 +1,72 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.models.recruitment  # Registers the recruitment tables employees refer to
+from app.models import Base
+from app.models.timesheet import Timesheet
+from app.services.job_store import JobStore
+from app.services.timesheet_bulk import (
+    MonthTotals,
+    TimesheetJob,
+    apply_month_totals,
+    month_bounds,
+)
+
+
+def test_month_bounds():
+    assert month_bounds(2026, 12) == (date(2026, 12, 1), date(2026, 12, 31))
+    assert month_bounds(2028, 2) == (date(2028, 2, 1), date(2028, 2, 29))
+
+
+def test_apply_month_totals_defaults_to_zero():
+    timesheet = Timesheet(employee_id=1, year=2026, month=9, status="draft")
+    totals = MonthTotals(leave_days=Decimal("2"), issue_dates=[date(2026, 9, 3)])
+
+    apply_month_totals(timesheet, totals, 22)
+
+    assert timesheet.total_present_days == 0
+    assert timesheet.total_overtime_hours == Decimal("0")
+    assert timesheet.total_leave_days == Decimal("2")
+    assert timesheet.has_compliance_issues is True
+    assert timesheet.compliance_notes == "2026-09-03: Exceeded limits"
+
+
+@pytest.mark.anyio
+async def test_job_progress_is_read_from_the_database():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with sessions() as session:
+        job = await JobStore("timesheet_bulk", TimesheetJob).create(session, year=2026, month=9, department="Ops")
+        job.status, job.total, job.processed = "running", 40, 25
+        await JobStore("timesheet_bulk", TimesheetJob).save(session, job)
+
+    # Another worker has its own store and session, and still finds the job
+    async with sessions() as session:
+        polled = await JobStore("timesheet_bulk", TimesheetJob).get(session, job.id)
+        assert polled == job
+        assert await JobStore("geofence_audit", TimesheetJob).get(session, job.id) is None
+    await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_job_store_drops_oldest():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    store = JobStore("timesheet_bulk", TimesheetJob, max_jobs=2)
+
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        first = await store.create(session, year=2026, month=9)
+        second = await store.create(session, year=2026, month=9, department="Ops")
+        third = await store.create(session, year=2026, month=9, manager_id=7)
+
+        assert await store.get(session, first.id) is None
+        assert (await store.get(session, second.id)).department == "Ops"
+        assert (await store.get(session, third.id)).manager_id == 7
+    await engine.dispose()
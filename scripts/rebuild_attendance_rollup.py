@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Rebuild the attendance_daily_rollup table from attendance_records.
+
+Usage:
+    cd backend
+    uv run python ../scripts/rebuild_attendance_rollup.py
+    uv run python ../scripts/rebuild_attendance_rollup.py --start 2026-01-01 --end 2026-01-31
+
+The rollup is kept up to date by the attendance endpoints. Run this after
+bulk imports or direct SQL edits to attendance records, or after moving
+employees between departments, so the affected dates are recomputed.
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+# Add parent to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.database import AsyncSessionLocal
+from app.services.attendance_rollup import rebuild_rollup
+
+
+async def main(start_date: Optional[date], end_date: Optional[date]) -> None:
+    async with AsyncSessionLocal() as session:
+        rows = await rebuild_rollup(session, start_date, end_date)
+    span = f"{start_date or 'beginning'} to {end_date or 'today'}"
+    print(f"Rebuilt attendance rollup for {span}: {rows} rows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the attendance daily rollup")
+    parser.add_argument("--start", type=date.fromisoformat, help="First date (YYYY-MM-DD), inclusive")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last date (YYYY-MM-DD), inclusive")
+    args = parser.parse_args()
+
+    if args.start and args.end and args.start > args.end:
+        print("Error: --start must not be after --end")
+        sys.exit(1)
+
+    asyncio.run(main(args.start, args.end))